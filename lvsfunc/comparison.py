@@ -6,13 +6,23 @@ import warnings
 from abc import ABC, abstractmethod
 from collections.abc import Iterable, Iterator, Sequence
 from itertools import zip_longest
-from typing import Any
-
-from jetpytools import CustomIntEnum, CustomNotImplementedError, CustomTypeError, CustomValueError, mod2
+from typing import Any, Literal
+
+from jetpytools import (
+    CustomIntEnum,
+    CustomNotImplementedError,
+    CustomTypeError,
+    CustomValueError,
+    FuncExceptT,
+    SPath,
+    SPathLike,
+    mod2,
+)
 from typing_extensions import deprecated
-from vskernels import Catrom, Kernel, KernelLike, Point
+from vskernels import Bilinear, Catrom, Kernel, KernelLike, Point
 from vstools import (
     FormatsMismatchError,
+    Keyframes,
     LengthMismatchError,
     Matrix,
     MismatchRefError,
@@ -25,7 +35,11 @@ from vstools import (
     vs,
 )
 
+from .diff.types import RectangleT
 from .exceptions import ClipsAndNamedClipsError
+from .export import write_images
+from .random import get_diff_frame_nums, get_random_frame_nums
+from .util import cache_frames
 
 __all__ = [
     "Comparer",
@@ -36,6 +50,7 @@ __all__ = [
     "Tile",
     "compare",
     "comparison_shots",
+    "contact_sheet",
     "diff_between_clips_stack",
     "stack_compare",
 ]
@@ -86,6 +101,10 @@ class Comparer(ABC):
             Only used if ``clips`` is a dict.
             Determines where to place clip names using :py:func:`vapoursynth.core.text.Text`.
             Default: 7.
+        cache_mb: Wrap every input clip in its own LRU frame cache of this many MiB
+            using :py:func:`lvsfunc.cache_frames`, so seeking back to recently viewed frames
+            doesn't re-render the upstream filter chains. Useful for interactive previewing.
+            Default: ``None`` (no cache).
 
     Raises:
         ValueError: Fewer than two clips were passed, or ``label_alignment`` is not between 1–9.
@@ -98,6 +117,7 @@ class Comparer(ABC):
         /,
         *,
         label_alignment: int = 7,
+        cache_mb: float | None = None,
     ) -> None:
         if len(clips) < 2:
             raise CustomValueError("Compare functions must be used on at least 2 clips!", self.__class__)
@@ -111,6 +131,9 @@ class Comparer(ABC):
         self.clips = list(clips.values()) if isinstance(clips, dict) else list(clips)
         self.names = list(clips.keys()) if isinstance(clips, dict) else None
 
+        if cache_mb is not None:
+            self.clips = [cache_frames(clip, cache_mb) for clip in self.clips]
+
         self.label_alignment = label_alignment
 
         self.num_clips = len(clips)
@@ -148,6 +171,99 @@ class Comparer(ABC):
 
         return self._compare()
 
+    def export(
+        self,
+        frames: Iterable[int],
+        out_dir: SPathLike,
+        fmt: str = "png",
+        overwrite: bool = False,
+        workers: int | None = None,
+        effort: int | None = None,
+    ) -> list[SPath]:
+        """
+        Export screenshots of the given frames of every input clip.
+
+        The selected frames of all clips are rendered in a single concurrent pass
+        and encoded in a thread pool using :py:func:`lvsfunc.write_images`.
+        Clips are resampled to RGB24 the same way :py:func:`compare` does, and are not labeled.
+
+        Images are named ``{frame}_{name}.{fmt}``, with the frame number zero-padded to six digits.
+        If the clips were not given names, ``Clip 1``, ``Clip 2``, etc. are used instead.
+        Characters that aren't safe in file names are replaced with ``_``, and names that collide
+        after that get a ``_2``, ``_3``, etc. suffix.
+
+        Example usage:
+
+        .. code-block:: python
+
+            from lvsfunc import Stack
+
+            Stack({"BD": bd, "WEB": web, "Filtered": flt}).export([100, 2500, 12000], "screens")
+
+        Dependencies:
+
+            - Pillow (https://python-pillow.github.io/)
+
+        Args:
+            frames: Frame numbers to export.
+            out_dir: Directory to write the images to. Created if it does not exist.
+            fmt: Image format, given as a file extension. Default: ``"png"``.
+            overwrite: Overwrite images that already exist. If ``False``, existing images are skipped.
+                Default: ``False``.
+            workers: Number of encoder threads. Default: See :py:func:`lvsfunc.write_images`.
+            effort: Compression effort. See :py:func:`lvsfunc.write_images`.
+
+        Returns:
+            Paths to the images of every clip for every frame, including skipped ones,
+            ordered by frame, then by clip.
+
+        Raises:
+            ValueError: A frame number is out of range for one of the clips.
+        """
+
+        frames = list(frames)
+        out_path = SPath(out_dir)
+
+        for clip in self.clips:
+            if any(not 0 <= f < clip.num_frames for f in frames):
+                raise CustomValueError(
+                    "Frame numbers must be within the length of every clip!",
+                    self.export,
+                    reason=f"{[f for f in frames if not 0 <= f < clip.num_frames]}",
+                )
+
+        names = self.names or [f"Clip {i}" for i in range(1, self.num_clips + 1)]
+        names = ["".join(c if c.isalnum() or c in " -_." else "_" for c in name).strip() for name in names]
+
+        # Names that end up the same after sanitizing would overwrite each other's images.
+        # Compared case-insensitively, since that's how most filesystems on Windows and macOS compare them.
+        seen = set[str]()
+
+        for i, name in enumerate(names):
+            unique, k = name, 2
+
+            while unique.casefold() in seen:
+                unique, k = f"{name}_{k}", k + 1
+
+            seen.add(unique.casefold())
+            names[i] = unique
+
+        jobs = [(i, f, out_path / f"{f:06d}_{name}.{fmt.lstrip('.')}") for f in frames for i, name in enumerate(names)]
+        todo = [job for job in jobs if overwrite or not job[2].exists()]
+
+        if todo:
+            resampled = [_resample_rgb24(clip) for clip in self.clips]
+
+            write_images(
+                core.std.Splice([resampled[i][f] for i, f, _ in todo], mismatch=True),
+                [path for _, _, path in todo],
+                workers,
+                effort,
+                func_except=self.export,
+            )
+
+        return [path for _, _, path in jobs]
+
 
 class Stack(Comparer):
     """
@@ -161,6 +277,7 @@ class Stack(Comparer):
         clips: See :class:`Comparer`.
         direction: Stack direction. Default: ``Direction.HORIZONTAL``.
         label_alignment: See :class:`Comparer`.
+        cache_mb: See :class:`Comparer`.
 
     Raises:
         ValueError: Clips lack a common height (horizontal stack) or width (vertical stack).
@@ -173,10 +290,11 @@ class Stack(Comparer):
         *,
         direction: Direction = Direction.HORIZONTAL,
         label_alignment: int = 7,
+        cache_mb: float | None = None,
     ) -> None:
         self.direction = direction
 
-        super().__init__(clips, label_alignment=label_alignment)
+        super().__init__(clips, label_alignment=label_alignment, cache_mb=cache_mb)
 
     def _compare(self) -> vs.VideoNode:
         if self.direction == Direction.HORIZONTAL:
@@ -258,6 +376,7 @@ class Interleave(Comparer):
         label_alignment: An integer from 1–9, corresponding to the positions of the keys on a numpad.
             Only used if ``clips`` is a dict. Determines where to place clip name using
             :py:func:`vapoursynth.core.text.Text`. Default: ``7``.
+        cache_mb: See :class:`Comparer`.
     """
 
     def __init__(
@@ -266,8 +385,9 @@ class Interleave(Comparer):
         /,
         *,
         label_alignment: int = 7,
+        cache_mb: float | None = None,
     ) -> None:
-        super().__init__(clips, label_alignment=label_alignment)
+        super().__init__(clips, label_alignment=label_alignment, cache_mb=cache_mb)
 
     def _compare(self) -> vs.VideoNode:
         return core.std.Interleave(self._marked_clips(), extend=True, mismatch=True)
@@ -315,11 +435,18 @@ class Tile(Comparer):
         arrangement: 2D array of ``0`` and ``1`` values representing blank spaces and clips per row.
             Default: ``None`` (auto-square layout).
         label_alignment: See :class:`Comparer`.
+        cache_mb: See :class:`Comparer`.
+        canvas: Fit the whole mosaic into a ``(width, height)`` canvas.
+            Every clip is scaled down once to the largest size that fits its slot while keeping its aspect ratio,
+            before labels are drawn. The size is kept mod2, or aligned to the chroma subsampling if that is coarser.
+            Default: ``None`` (keep the original resolution).
+        kernel: Kernel used to scale the clips when ``canvas`` is given. Default: Catrom.
 
     Raises:
         ValueError: Clip heights and widths don't match.
         ValueError: Array is one-dimensional; use :class:`Stack` instead.
         ValueError: Specified arrangement has an invalid number of clips.
+        ValueError: ``canvas`` is too small to fit the arrangement.
     """
 
     def __init__(
@@ -329,8 +456,11 @@ class Tile(Comparer):
         *,
         arrangement: list[list[int]] | None = None,
         label_alignment: int = 7,
+        cache_mb: float | None = None,
+        canvas: tuple[int, int] | None = None,
+        kernel: KernelLike = Catrom,
     ) -> None:
-        super().__init__(clips, label_alignment=label_alignment)
+        super().__init__(clips, label_alignment=label_alignment, cache_mb=cache_mb)
 
         if not self.width or not self.height:
             raise CustomValueError("All clip widths and heights must be the same!", self.__class__)
@@ -343,12 +473,15 @@ class Tile(Comparer):
                 raise CustomValueError("Use Stack instead if the array is one dimensional!", self.__class__)
             self.arrangement = arrangement
 
-        self.blank_clip = core.std.BlankClip(clip=self.clips[0], keep=1)
-
         max_length = max(map(len, self.arrangement))
 
         self.arrangement = [row + [0] * (max_length - len(row)) for row in self.arrangement]
 
+        if canvas is not None:
+            self._fit_canvas(canvas, kernel)
+
+        self.blank_clip = core.std.BlankClip(clip=self.clips[0], keep=1)
+
         array_count = sum(map(sum, self.arrangement))
 
         LengthMismatchError.check(
@@ -368,6 +501,34 @@ class Tile(Comparer):
 
         return core.std.StackVertical(rows)
 
+    def _fit_canvas(self, canvas: tuple[int, int], kernel: KernelLike) -> None:
+        """Scale self.clips down so the padded arrangement fits into ``canvas``."""
+
+        assert self.width and self.height
+
+        rows, cols = len(self.arrangement), len(self.arrangement[0])
+
+        factor = min(canvas[0] / (cols * self.width), canvas[1] / (rows * self.height), 1.0)
+
+        # Keep the scaled size aligned to the chroma subsampling of every clip, and at least mod2
+        mod_w = max([2] + [1 << clip.format.subsampling_w for clip in self.clips if clip.format])
+        mod_h = max([2] + [1 << clip.format.subsampling_h for clip in self.clips if clip.format])
+
+        width, height = int(self.width * factor) // mod_w * mod_w, int(self.height * factor) // mod_h * mod_h
+
+        if width < mod_w or height < mod_h:
+            raise CustomValueError(
+                "`canvas` is too small to fit the arrangement!", self.__class__, f"{canvas} for {rows}x{cols} tiles"
+            )
+
+        if (width, height) == (self.width, self.height):
+            return
+
+        scaler = Kernel.ensure_obj(kernel, self.__class__)
+
+        self.clips = [scaler.scale(clip, width, height) for clip in self.clips]
+        self.width, self.height = width, height
+
     def _auto_arrangement(self) -> list[list[int]]:
         def _grouper(iterable: Iterable[Any], n: int, fillvalue: Any | None = None) -> Iterator[tuple[Any, ...]]:
             args = [iter(iterable)] * n
@@ -417,6 +578,7 @@ class Split(Stack):
         clips: See :class:`Comparer`.
         direction: Axis to split on. Default: ``Direction.HORIZONTAL``.
         label_alignment: See :class:`Comparer`.
+        cache_mb: See :class:`Comparer`.
 
     Raises:
         ValueError: Clip heights and widths don't match.
@@ -430,8 +592,9 @@ class Split(Stack):
         *,
         direction: Direction = Direction.HORIZONTAL,
         label_alignment: int = 7,
+        cache_mb: float | None = None,
     ) -> None:
-        super().__init__(clips, direction=direction, label_alignment=label_alignment)
+        super().__init__(clips, direction=direction, label_alignment=label_alignment, cache_mb=cache_mb)
 
         self._smart_crop()
 
@@ -498,6 +661,11 @@ class Split(Stack):
         return cls(clips or namedclips, label_alignment=2).clip
 
 
+def _resample_rgb24(clip: vs.VideoNode) -> vs.VideoNode:
+    # Resampling to 8 bit and RGB to properly display how it appears on your screen
+    return Catrom().resample(clip, vs.RGB24, None, Matrix.from_video(clip), dither_type="error_diffusion")
+
+
 def compare(
     clip_a: vs.VideoNode,
     clip_b: vs.VideoNode,
@@ -506,6 +674,7 @@ def compare(
     force_resample: bool = True,
     print_frame: bool = True,
     mismatch: bool = False,
+    diff_select: bool = False,
 ) -> vs.VideoNode:
     """
     Compare the same frames from two different clips by interleaving them into a single clip.
@@ -518,6 +687,15 @@ def compare(
 
     Alias for this function is ``lvsfunc.comp``.
 
+    To write screenshots of the compared frames to disk, pick the frames first,
+    for example with :py:func:`lvsfunc.get_diff_frame_nums`, and pass them to :py:meth:`Comparer.export`:
+
+    .. code-block:: python
+
+        frames = get_diff_frame_nums(clip_a, clip_b, 10)
+
+        Interleave({"Clip A": clip_a, "Clip B": clip_b}).export(frames, "screenshots")
+
     Args:
         clip_a: Clip to compare.
         clip_b: Second clip to compare.
@@ -527,6 +705,8 @@ def compare(
         print_frame: Print frame numbers. Default: ``True``.
         mismatch: Allow clips with different formats and dimensions to be compared.
             Default: ``False``.
+        diff_select: If ``frames`` is ``None``, pick the ``rand_total`` frames where the clips differ the most
+            using :py:func:`lvsfunc.get_diff_frame_nums` instead of random frames. Default: ``False``.
 
     Returns:
         Interleaved clip containing specified frames from ``clip_a`` and ``clip_b``.
@@ -538,10 +718,6 @@ def compare(
         FormatsMismatchError: ``mismatch`` is ``False`` and the clip formats differ.
     """
 
-    def _resample(clip: vs.VideoNode) -> vs.VideoNode:
-        # Resampling to 8 bit and RGB to properly display how it appears on your screen
-        return Catrom().resample(clip, vs.RGB24, None, Matrix.from_video(clip), dither_type="error_diffusion")
-
     check_variable_resolution(clip_a, compare)
     check_variable_resolution(clip_b, compare)
 
@@ -553,8 +729,10 @@ def compare(
             reason=f"{len(frames)} > {clip_a.num_frames}",
         )
 
+    src_a, src_b = clip_a, clip_b
+
     if force_resample:
-        clip_a, clip_b = _resample(clip_a), _resample(clip_b)
+        clip_a, clip_b = _resample_rgb24(clip_a), _resample_rgb24(clip_b)
     elif mismatch is False:
         assert check_variable_format(clip_a, compare)
         assert check_variable_format(clip_b, compare)
@@ -570,7 +748,11 @@ def compare(
             # More comparisons for shorter clips so you can compare stuff like NCs more conveniently
             rand_total = int(clip_a.num_frames / 1000) if clip_a.num_frames > 5000 else int(clip_a.num_frames / 100)
 
-        frames = sorted(random.sample(range(1, clip_a.num_frames - 1), rand_total))
+        if diff_select:
+            amount = max(rand_total, 1)
+            frames = get_diff_frame_nums(src_a, src_b, amount, min_spacing=clip_a.num_frames // (amount * 2))
+        else:
+            frames = sorted(random.sample(range(1, clip_a.num_frames - 1), rand_total))
 
     frames_a = core.std.Splice([clip_a[f] for f in frames]).std.AssumeFPS(fpsnum=1, fpsden=1)
     frames_b = core.std.Splice([clip_b[f] for f in frames]).std.AssumeFPS(fpsnum=1, fpsden=1)
@@ -582,6 +764,8 @@ def stack_compare(
     *clips: vs.VideoNode,
     height: int | None = None,
     kernel: KernelLike = Catrom,
+    roi: RectangleT | None = None,
+    zoom: int = 1,
     **namedclips: vs.VideoNode,
 ) -> vs.VideoNode:
     """
@@ -601,6 +785,13 @@ def stack_compare(
         height: Height in px for the source clips. The diff clip uses twice this resolution.
             Default: 288.
         kernel: Kernel used to scale the source clips. The diff always uses Catrom.
+        roi: Region of interest given as ``(x, y, width, height)``. If given, both clips are cropped to it
+            before the difference is computed, and ``height`` and ``kernel`` are ignored.
+            This makes inspecting a small detail of a large source about as cheap as processing the detail itself.
+            Default: ``None``.
+        zoom: Integer factor to enlarge the (cropped) clips by using Point scaling.
+            If greater than 1, ``height`` and ``kernel`` are ignored. The diff is shown at twice this factor.
+            Default: 1.
         namedclips: Two clips as keyword arguments; names are used as labels. Only used when
             ``clips`` is not given.
 
@@ -611,11 +802,15 @@ def stack_compare(
         ClipsAndNamedClipsError: Both positional and named clips are given.
         ValueError: Fewer or more than two clips are given.
         MismatchRefError: The clips do not share the same format.
+        ValueError: ``zoom`` is smaller than 1, or ``roi`` doesn't fit the clips or their chroma subsampling.
     """
 
     if clips and namedclips:
         raise ClipsAndNamedClipsError(stack_compare)
 
+    if zoom < 1:
+        raise CustomValueError("`zoom` must be at least 1!", stack_compare, zoom)
+
     if clips:
         if len(clips) != 2:
             raise CustomValueError("Must pass exactly 2 clips!", stack_compare)
@@ -633,6 +828,22 @@ def stack_compare(
 
     MismatchRefError.check(stack_compare, clip_a, clip_b)
 
+    if roi is not None or zoom > 1:
+        clip_a, clip_b = _crop_zoom(clip_a, roi, func=stack_compare), _crop_zoom(clip_b, roi, func=stack_compare)
+
+        diff_clip = _crop_zoom(clip_a.std.MakeDiff(clip_b), zoom=zoom * 2).text.FrameNum(9)
+        diff_clip = diff_clip.text.Text(text="Difference", alignment=8)
+
+        zoomed = [_crop_zoom(clip, zoom=zoom).text.FrameNum(9) for clip in (clip_a, clip_b)]
+
+        return Stack(
+            (
+                Stack({name_a: zoomed[0], name_b: zoomed[1]}).clip,
+                diff_clip,
+            ),
+            direction=Direction.VERTICAL,
+        ).clip
+
     if not height:
         height = 288
 
@@ -685,6 +896,8 @@ def comparison_shots(
     bottom: int = 0,
     height: int | None = None,
     kernel: KernelLike = Point,
+    roi: RectangleT | None = None,
+    zoom: int | None = None,
     **namedclips: vs.VideoNode,
 ) -> vs.VideoNode:
     """
@@ -717,23 +930,51 @@ def comparison_shots(
             If equal to or lesser than 10, multiply the height by the given amount.
             Default: ``None``.
         kernel: Kernel used for upscaling the clips if applicable. Default: Point.
+        roi: Region of interest given as ``(x, y, width, height)``, as an alternative to the individual crops.
+            Default: ``None``.
+        zoom: Integer factor to enlarge the cropped clips by using Point scaling.
+            If given, ``height`` and ``kernel`` are ignored. Default: ``None``.
 
     Returns:
         A horizontal stack of the ``clips``/``namedclips``, cropped and upscaled as specified.
 
     Raises:
         ClipsAndNamedClipsError: Both positional and named clips are given.
+        ValueError: ``roi`` is given together with individual crops, ``roi`` doesn't fit the clips
+            or their chroma subsampling, or ``zoom`` is smaller than 1.
     """
 
     if clips and namedclips:
         raise ClipsAndNamedClipsError(comparison_shots)
 
+    if roi is not None and any((left, right, top, bottom)):
+        raise CustomValueError("`roi` can't be combined with individual crops!", comparison_shots)
+
+    if zoom is not None:
+        if zoom < 1:
+            raise CustomValueError("`zoom` must be at least 1!", comparison_shots, zoom)
+
+        if clips:
+            clips = tuple(
+                [_crop_zoom(c.std.Crop(left, right, top, bottom), roi, zoom, comparison_shots) for c in clips]
+            )
+        elif namedclips:
+            namedclips = {
+                k: _crop_zoom(v.std.Crop(left, right, top, bottom), roi, zoom, comparison_shots)
+                for k, v in namedclips.items()
+            }
+
+        return Stack(clips or namedclips, direction=Direction.HORIZONTAL).clip
+
     kernel = Kernel.ensure_obj(kernel, comparison_shots)
 
     if clips:
-        clips = tuple([c.std.Crop(left, right, top, bottom) for c in clips])
+        clips = tuple([_crop_zoom(c.std.Crop(left, right, top, bottom), roi, func=comparison_shots) for c in clips])
     elif namedclips:
-        namedclips = {k: v.std.Crop(left, right, top, bottom) for k, v in namedclips.items()}
+        namedclips = {
+            k: _crop_zoom(v.std.Crop(left, right, top, bottom), roi, func=comparison_shots)
+            for k, v in namedclips.items()
+        }
 
     if height is None:
         return Stack(clips or namedclips, direction=Direction.HORIZONTAL).clip
@@ -747,3 +988,143 @@ def comparison_shots(
         namedclips = {k: kernel.scale(v, get_w(height), height) for k, v in namedclips.items()}
 
     return Stack(clips or namedclips, direction=Direction.HORIZONTAL).clip
+
+
+def contact_sheet(
+    clip: vs.VideoNode,
+    out_path: SPathLike,
+    amount: int = 16,
+    mode: Literal["even", "random", "scenes"] = "even",
+    keyframes: Sequence[int] | SPathLike | None = None,
+    height: int = 180,
+    columns: int | None = None,
+    kernel: KernelLike = Bilinear,
+    seed: int | None = None,
+) -> SPath:
+    """
+    Render a contact sheet of a clip: a single image of labeled thumbnails spread over the whole clip.
+
+    Only the selected frames are requested, and they are scaled down to the thumbnail size
+    before being tiled with :py:class:`Tile`, so a whole episode can be skimmed in a single image
+    without ever building a clip of full resolution frames.
+    All thumbnails are requested concurrently while rendering the sheet.
+
+    Frames are selected with one of the following modes:
+
+        - ``"even"``: The middle frame of ``amount`` equally long segments.
+        - ``"random"``: A random frame from each of ``amount`` equally long segments,
+          using :py:func:`lvsfunc.get_random_frame_nums`.
+        - ``"scenes"``: The middle frame of every scene, so every scene gets exactly one thumbnail
+          and ``amount`` is ignored.
+          Scenes are taken from ``keyframes`` or detected with :py:meth:`vstools.Keyframes.from_clip`.
+
+    Example usage:
+
+    .. code-block:: python
+
+        from lvsfunc import contact_sheet
+
+        contact_sheet(src, "overview.png", amount=30, mode="scenes", keyframes="keyframes.txt")
+
+    Dependencies:
+
+        - Pillow (https://python-pillow.github.io/)
+
+    Args:
+        clip: Clip to create a contact sheet of.
+        out_path: Path to write the image to. The format is taken from the suffix.
+        amount: Number of thumbnails in ``"even"`` and ``"random"`` mode. Default: 16.
+        mode: Frame selection mode. Default: ``"even"``.
+        keyframes: Scene boundaries for ``"scenes"`` mode, such as a :py:class:`vstools.Keyframes` object,
+            or a path to a keyframes file readable by :py:meth:`vstools.Keyframes.from_file`.
+            Default: ``None`` (detect scene changes).
+        height: Thumbnail height. Default: 180.
+        columns: Number of thumbnails per row. Default: ``None`` (square-ish layout).
+        kernel: Kernel used to scale the thumbnails. Default: Bilinear.
+        seed: Seed for the random number generator in ``"random"`` mode. Default: ``None``.
+
+    Returns:
+        The path to the written image.
+
+    Raises:
+        ValueError: ``amount`` is smaller than 2 or exceeds the number of frames outside of ``"scenes"`` mode,
+            ``height`` or ``columns`` is not positive, ``mode`` is unknown, or there are fewer than two frames to show.
+    """
+
+    if mode != "scenes" and not 2 <= amount <= clip.num_frames:
+        raise CustomValueError("`amount` must be between 2 and the number of frames!", contact_sheet, amount)
+
+    if height <= 0 or (columns is not None and columns <= 0):
+        raise CustomValueError("`height` and `columns` must be greater than 0!", contact_sheet)
+
+    segment = clip.num_frames / amount
+
+    match mode:
+        case "even":
+            frames = [int(segment * (i + 0.5)) for i in range(amount)]
+        case "random":
+            frames = get_random_frame_nums(clip, math.ceil(segment), seed)
+        case "scenes":
+            if keyframes is None:
+                keyframes = Keyframes.from_clip(clip)
+            elif not isinstance(keyframes, Sequence) or isinstance(keyframes, str):
+                keyframes = Keyframes.from_file(keyframes)
+
+            cuts = sorted({0, *(kf for kf in keyframes if 0 <= kf < clip.num_frames)})
+            frames = [(start + end - 1) // 2 for start, end in zip(cuts, [*cuts[1:], clip.num_frames])]
+        case _:
+            raise CustomValueError("Unknown contact sheet mode!", contact_sheet, mode)
+
+    frames = sorted(set(frames))
+
+    if len(frames) < 2:
+        raise CustomValueError("Not enough frames to create a contact sheet!", contact_sheet, frames)
+
+    thumbs = Kernel.ensure_obj(kernel, contact_sheet).scale(
+        core.std.Splice([clip[f] for f in frames]), get_w(height, clip), height
+    )
+
+    named = {f"Frame {f}": thumbs[i] for i, f in enumerate(frames)}
+
+    if columns is None:
+        sheet = Tile(named).clip
+    elif columns >= len(frames):
+        sheet = Stack(named).clip
+    elif columns == 1:
+        sheet = Stack(named, direction=Direction.VERTICAL).clip
+    else:
+        rows = [[1] * min(columns, len(frames) - i) for i in range(0, len(frames), columns)]
+        sheet = Tile(named, arrangement=rows).clip
+
+    return write_images(sheet, [out_path], func_except=contact_sheet)[0]
+
+
+def _crop_zoom(
+    clip: vs.VideoNode, roi: RectangleT | None = None, zoom: int = 1, func: FuncExceptT | None = None
+) -> vs.VideoNode:
+    """Crop a clip to ``roi`` first, then enlarge it by an integer factor with Point scaling."""
+
+    if roi is not None:
+        x, y, width, height = roi
+
+        if width <= 0 or height <= 0 or x < 0 or y < 0 or x + width > clip.width or y + height > clip.height:
+            raise CustomValueError("The ROI must have a positive size and fit inside the clip!", func, roi)
+
+        if clip.format is not None:
+            mod_w, mod_h = 1 << clip.format.subsampling_w, 1 << clip.format.subsampling_h
+
+            # CropAbs would only fail once frames are requested, deep inside the graph
+            if x % mod_w or width % mod_w or y % mod_h or height % mod_h:
+                raise CustomValueError(
+                    f"The ROI must be aligned to the chroma subsampling, mod {mod_w} horizontally "
+                    f"and mod {mod_h} vertically!",
+                    func,
+                    roi,
+                )
+
+        clip = clip.std.CropAbs(width, height, x, y)
+
+    if zoom > 1:
+        clip = Point().scale(clip, clip.width * zoom, clip.height * zoom)
+
+    return clip
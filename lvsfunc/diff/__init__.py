@@ -1,7 +1,10 @@
 # flake8: noqa
 
+from .duplicates import *
 from .enum import *
 from .exceptions import *
 from .func import *
+from .multi import *
+from .qa import *
 from .strategies import *
 from .types import *
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Literal
+
+import numpy as np
+from jetpytools import CustomValueError, FuncExceptT
+from vsrgtools import box_blur
+from vstools import (
+    FrameRangesN,
+    VSFunctionNoArgs,
+    clip_async_render,
+    core,
+    get_prop,
+    merge_clip_props,
+    normalize_ranges,
+    vs,
+)
+
+from .enum import DiffMode
+from .func import FindDiff
+from .strategies import DiffStrategy, PlaneAvgFloatDiff
+from .types import RoiT
+
+__all__: list[str] = [
+    "FindDuplicates",
+]
+
+
+class FindDuplicates(FindDiff):
+    """Find duplicate and dropped frames within a single clip."""
+
+    duplicate_ranges: FrameRangesN
+    """Runs of identical frames. Each range starts on the first unique frame of the run."""
+
+    drop_ranges: FrameRangesN
+    """Frames that likely follow a dropped frame."""
+
+    metrics: list[float]
+    """Normalized luma difference between every frame and the frame that follows it."""
+
+    def __init__(
+        self,
+        strategies: DiffStrategy | Sequence[DiffStrategy] | None = None,
+        mode: DiffMode = DiffMode.ANY,
+        pre_process: VSFunctionNoArgs | Literal[False] | None = (lambda clip: box_blur(clip).std.Crop(8, 8, 8, 8)),
+        exclusion_ranges: FrameRangesN | None = None,
+        roi: RoiT | None = None,
+        drop_thr: float = 3.0,
+        radius: int = 12,
+        func_except: FuncExceptT | None = None,
+    ) -> None:
+        """
+        Find duplicate, repeated, and dropped frames by diffing a clip against itself shifted by one frame.
+
+        Frame ``n`` is compared to frame ``n + 1`` using the same strategy machinery as :class:`FindDiff`.
+        If the strategies find no difference, frame ``n + 1`` is considered a duplicate of frame ``n``.
+        The normalized luma difference of every pair is collected in the same pass.
+        A pair whose difference is ``drop_thr`` times larger than the local median is flagged as a suspected drop.
+
+        This is useful for making decimation or VFR timecode decisions without scrubbing through the clip.
+
+        Example usage:
+
+        .. code-block:: python
+
+            from lvsfunc import FindDuplicates
+
+            dupes = FindDuplicates().find_duplicates(clip)
+
+            print(dupes.duplicate_ranges)  # Runs of identical frames
+            print(dupes.diff_ranges)  # Repeated frames, i.e. what decimation would drop
+            print(dupes.drop_ranges)  # Frames following a suspected drop
+
+        Args:
+            strategies: The strategy or strategies used to decide whether two neighboring frames differ.
+                Default: ``PlaneAvgFloatDiff(0.001, planes=0)``.
+            mode: The mode to use for combining results from multiple strategies.
+                Default: ``DiffMode.ANY``.
+            pre_process: The pre-processing function to use for the comparison.
+                A callable, ``False`` to skip, or the default box blur with an 8px crop.
+            exclusion_ranges: Ranges to exclude from the results.
+                These frames will still be processed, but not outputted.
+            roi: Region of interest to restrict the comparison to. See :class:`FindDiff` for details.
+                Default: ``None`` (compare the whole frame).
+            drop_thr: How many times larger than the local median difference a pair's difference must be
+                to be considered a drop. Default: 3.0.
+            radius: Number of neighboring pairs on either side used for the local median. Default: 12.
+
+        Raises:
+            ValueError: No strategies were passed, ``drop_thr`` is not positive, or ``radius`` is smaller than 1.
+        """
+
+        if strategies is None:
+            strategies = PlaneAvgFloatDiff(0.001, planes=0)
+
+        super().__init__(strategies, mode, pre_process, exclusion_ranges, roi, func_except)
+
+        if drop_thr <= 0:
+            raise CustomValueError("`drop_thr` must be greater than 0!", self._func_except, drop_thr)
+
+        if radius < 1:
+            raise CustomValueError("`radius` must be at least 1!", self._func_except, radius)
+
+        self.drop_thr = drop_thr
+        self.radius = radius
+
+        self.duplicate_ranges = []
+        self.drop_ranges = []
+        self.metrics = []
+
+    def find_duplicates(
+        self,
+        clip: vs.VideoNode,
+        force: bool = False,
+        frames_post_process: Callable[[Iterable[int]], Iterable[int]] | None = None,
+    ) -> FindDuplicates:
+        """
+        Find duplicate and dropped frames in a clip and store the results.
+
+        All metrics are collected in a single render of the clip.
+        The results will be accessible through the ``duplicate_ranges``, ``diff_ranges``,
+        ``drop_ranges``, and ``metrics`` attributes.
+
+        Args:
+            clip: Clip to search.
+            force: Recompute even when results already exist.
+            frames_post_process: Post-filter for the repeated frame numbers. Default: ``None``.
+
+        Returns:
+            This ``FindDuplicates`` instance.
+
+        Raises:
+            ValueError: The clip is shorter than two frames.
+        """
+
+        if not force and self.metrics:
+            return self
+
+        if clip.num_frames < 2:
+            raise CustomValueError("The clip must be at least two frames long!", self._func_except, clip.num_frames)
+
+        self._diff_frames = None
+        self.diff_ranges = []
+        self.duplicate_ranges = []
+        self.drop_ranges = []
+
+        cur, nxt = self._prepare_clips(clip[:-1], clip[1:])
+
+        processed_clip, callbacks = self._run_strategies(cur, nxt)
+
+        self._processed_clip = merge_clip_props(processed_clip, core.std.PlaneStats(cur, nxt, 0, prop="fd_dup"))
+
+        def _check(n: int, f: vs.VideoFrame) -> tuple[bool, float]:
+            differs = self.mode.check_result([cb(f) for cb in callbacks])
+
+            return differs, float(get_prop(f, "fd_dupDiff", (float, int), default=0.0))
+
+        results = clip_async_render(self._processed_clip, None, "Finding duplicate frames...", _check)
+
+        differs = np.array([r[0] for r in results], dtype=bool)
+        self.metrics = [r[1] for r in results]
+
+        excluded = set[int]()
+
+        if self.exclusion_ranges:
+            self.exclusion_ranges = normalize_ranges(clip, self.exclusion_ranges)
+
+            excluded = {frame for start, stop in self.exclusion_ranges for frame in range(start, stop + 1)}
+
+        dup_pairs = [n for n in np.flatnonzero(~differs).tolist() if n + 1 not in excluded]
+
+        self.duplicate_ranges = [(start, end + 1) for start, end in self._to_ranges(dup_pairs)]
+
+        self._diff_frames = [n + 1 for n in dup_pairs]
+
+        if frames_post_process is not None:
+            self._diff_frames = list(frames_post_process(self._diff_frames))
+
+        self.diff_ranges = list(self._to_ranges(self._diff_frames))
+
+        drops = self._find_drops(np.asarray(self.metrics, dtype=np.float64), differs)
+
+        self.drop_ranges = list(self._to_ranges([n + 1 for n in drops if n + 1 not in excluded]))
+
+        return self
+
+    def _find_drops(self, metrics: np.ndarray[Any, Any], differs: np.ndarray[Any, Any]) -> list[int]:
+        """Find the pairs whose difference spikes well above the local median of the moving pairs around them."""
+
+        drops = list[int]()
+
+        for n in np.flatnonzero(differs).tolist():
+            start, end = max(0, n - self.radius), min(len(metrics), n + self.radius + 1)
+
+            window = np.delete(metrics[start:end][differs[start:end]], np.count_nonzero(differs[start:n]))
+
+            if not window.size:
+                continue
+
+            if metrics[n] > self.drop_thr * max(float(np.median(window)), 1e-6):
+                drops.append(n)
+
+        return drops
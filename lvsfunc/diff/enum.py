@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Sequence
+
 from jetpytools import CustomIntEnum
 
 __all__: list[str] = [
     "ButteraugliNorm",
+    "ChunkFormat",
     "DiffMode",
     "VMAFFeature",
 ]
@@ -144,3 +148,37 @@ class ButteraugliNorm(CustomIntEnum):
             return " ".join(props.values())
 
         return props[self]
+
+
+class ChunkFormat(CustomIntEnum):
+    """Different supported output formats for keyframe-aligned chunks."""
+
+    RANGES = 0
+    """One ``start-end`` range per line. This is the same format as :py:meth:`FindDiff.to_file`."""
+
+    ZONES = 1
+    """A single x264/x265 ``--zones`` string, with ``zone_args`` applied to every chunk."""
+
+    JSON = 2
+    """A JSON list of ``{"start": ..., "end": ...}`` objects with inclusive end frames."""
+
+    def format(self, chunks: Sequence[tuple[int, int]], zone_args: str = "b=1.0") -> str:
+        """
+        Format the chunks as text.
+
+        Args:
+            chunks: Inclusive ``(start, end)`` frame ranges.
+            zone_args: Zone options applied to every chunk. Only used by ``ChunkFormat.ZONES``.
+                Default: ``"b=1.0"``.
+
+        Returns:
+            The formatted chunks.
+        """
+
+        match self:
+            case ChunkFormat.RANGES:
+                return "\n".join(f"{start}-{end}" for start, end in chunks)
+            case ChunkFormat.ZONES:
+                return "/".join(f"{start},{end},{zone_args}" for start, end in chunks)
+            case ChunkFormat.JSON:
+                return json.dumps([{"start": start, "end": end} for start, end in chunks], indent=4)
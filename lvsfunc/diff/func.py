@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import html
 import warnings
+from bisect import bisect_right
 from collections.abc import Callable, Iterable, Sequence
 from itertools import groupby
 from typing import Literal
 
+import numpy as np
 from jetpytools import (
     CustomRuntimeError,
     CustomValueError,
@@ -16,29 +19,36 @@ from jetpytools import (
     SPath,
     SPathLike,
 )
-from vskernels import Catrom
+from vskernels import Bilinear, Catrom, Kernel, KernelLike
 from vsrgtools import box_blur
 from vstools import (
     FrameRangesN,
+    Keyframes,
+    Matrix,
     PlanesT,
     VSFunctionNoArgs,
     check_ref_clip,
     clip_async_render,
     core,
+    depth,
     get_prop,
+    get_w,
     merge_clip_props,
     normalize_ranges,
+    plane,
     vs,
 )
 
-from .enum import DiffMode
+from ..export import write_images
+from .enum import ChunkFormat, DiffMode
 from .exceptions import CustomOSError, NoDifferencesFoundError
 from .strategies import DiffStrategy, PlaneStatsDiff
-from .types import CallbacksT
+from .types import CallbacksT, RectangleT, RoiT
 
 __all__: list[str] = [
     "FindDiff",
     "remove_isolated_frames",
+    "snap_ranges_to_keyframes",
 ]
 
 
@@ -59,6 +69,100 @@ def remove_isolated_frames(frames: Iterable[int], thr: int = 1) -> Iterable[int]
     return [f for f in frames if (f - thr in frames_set) or (f + thr in frames_set)]
 
 
+def snap_ranges_to_keyframes(
+    ranges: Iterable[tuple[int, int]],
+    keyframes: Iterable[int],
+    num_frames: int,
+    min_gap: int = 0,
+) -> list[tuple[int, int]]:
+    """
+    Snap frame ranges outwards to keyframes and merge chunks that are close together.
+
+    Every range is extended to start on the closest keyframe at or before its first frame,
+    and to end on the frame right before the first keyframe after its last frame.
+    Overlapping or adjacent chunks are always merged.
+    The resulting chunks can be re-encoded independently and spliced back into the original encode.
+
+    .. code-block:: text
+
+        keyframes:  0         48        96        144       192
+        ranges:       [10-20]                       [150-160]
+        chunks:     [0 ---- 47]                   [144 --- 191]
+
+    Args:
+        ranges: Inclusive ``(start, end)`` frame ranges.
+        keyframes: Keyframe numbers. Frame 0 is always treated as a keyframe.
+        num_frames: Total number of frames in the clip, used to close the last chunk.
+        min_gap: Merge chunks that are fewer than this many frames apart. Default: 0.
+
+    Returns:
+        Sorted, non-overlapping, inclusive ``(start, end)`` chunks.
+
+    Raises:
+        CustomValueError: ``min_gap`` is negative.
+    """
+
+    if min_gap < 0:
+        raise CustomValueError("`min_gap` must be greater than or equal to 0!", snap_ranges_to_keyframes, min_gap)
+
+    kfs = sorted({0, *(kf for kf in keyframes if 0 <= kf < num_frames)})
+
+    chunks = list[tuple[int, int]]()
+
+    for start, end in sorted(ranges):
+        start, end = max(0, start), min(end, num_frames - 1)
+
+        if start > end:
+            continue
+
+        chunk_start = kfs[bisect_right(kfs, start) - 1]
+        next_kf = bisect_right(kfs, end)
+        chunk_end = kfs[next_kf] - 1 if next_kf < len(kfs) else num_frames - 1
+
+        if chunks and chunk_start - chunks[-1][1] - 1 < max(min_gap, 1):
+            chunks[-1] = (chunks[-1][0], max(chunks[-1][1], chunk_end))
+        else:
+            chunks.append((chunk_start, chunk_end))
+
+    return chunks
+
+
+def _grid_mask(clip: vs.VideoNode, tile: int) -> vs.VideoNode:
+    """Create a GRAY8 mask of one pixel wide lines every ``tile`` pixels, matching the dimensions of ``clip``."""
+
+    def _lines(length: int, size: int, horizontal: bool) -> vs.VideoNode:
+        w, h = (size, 1) if horizontal else (1, size)
+
+        line = core.std.BlankClip(clip, w, h, vs.GRAY8, color=255, keep=True)
+        gap = core.std.BlankClip(line, *((size, tile - 1) if horizontal else (tile - 1, size)), keep=True)
+
+        count = -(-length // tile)
+        stack = core.std.StackVertical if horizontal else core.std.StackHorizontal
+
+        return stack([line, gap] * count)
+
+    vertical = _lines(clip.width, clip.height, False).std.CropAbs(clip.width, clip.height)
+    horizontal = _lines(clip.height, clip.width, True).std.CropAbs(clip.width, clip.height)
+
+    return core.std.Expr([vertical, horizontal], "x y max")
+
+
+def _jet_heatmap(src: vs.VideoNode, ref: vs.VideoNode, amplify: float) -> vs.VideoNode:
+    """Map the amplified absolute difference of the first plane of two clips to an RGB24 "jet" heatmap."""
+
+    src_luma, ref_luma = (depth(plane(c, 0), 32) for c in (src, ref))
+
+    diff = core.std.Expr([src_luma, ref_luma], f"x y - abs {amplify} * 0 max 1 min")
+
+    # Piecewise-linear "jet" color map
+    heatmap = core.std.Expr(
+        core.std.ShufflePlanes([diff] * 3, [0, 0, 0], vs.RGB),
+        [f"1.5 4 x * {offset} - abs - 0 max 1 min" for offset in (3, 2, 1)],
+    )
+
+    return depth(heatmap, 8)
+
+
 class FindDiff:
     """Find the differences between two clips."""
 
@@ -83,6 +187,9 @@ class FindDiff:
     diff_ranges: FrameRangesN
     """Ranges of frames that are different between the two clips."""
 
+    roi: RoiT | None
+    """Region of interest the comparison is restricted to."""
+
     def __init__(
         self,
         strategies: DiffStrategy | Sequence[DiffStrategy] | None = None,
@@ -90,6 +197,7 @@ class FindDiff:
         pre_process: VSFunctionNoArgs | Literal[False] | None = (lambda clip: box_blur(clip).std.Crop(8, 8, 8, 8)),
         exclusion_ranges: FrameRangesN | None = None,
         func_except: FuncExceptT | None = None,
+        roi: RoiT | None = None,
     ) -> None:
         """
         Find differences between two clips using various comparison methods.
@@ -120,6 +228,12 @@ class FindDiff:
                 pre_process=lambda c: c.std.Crop(top=10, bottom=10, left=10, right=10),
             ).get_diff(clip_a, clip_b)
 
+        Region of interest example:
+
+        .. code-block:: python
+
+            # Only compare the top 800 lines, ignoring the area where subtitles are burned in.
+            diff_finder = FindDiff(roi=(0, 0, 1920, 800)).get_diff(clip_a, clip_b)
 
         Args:
             strategies: The strategy or strategies to use for comparison.
@@ -131,6 +245,14 @@ class FindDiff:
                 A callable, ``False`` to skip, or the default box blur with an 8px crop.
             exclusion_ranges: Ranges to exclude from the comparison.
                 These frames will still be processed, but not outputted.
+            roi: Region of interest to restrict the comparison to. Either a list of ``(x, y, width, height)``
+                rectangles, or a mask clip where non-zero pixels are compared.
+                Both clips are cropped to the bounding box of the region before any strategy runs,
+                and everything outside the region but inside the bounding box is ignored.
+                The box is padded by whatever ``pre_process`` crops off, so the crop doesn't eat into the region.
+                A single-frame mask is treated as static; masks with more frames are applied per frame
+                and are not cropped, and must have as many frames as the clips.
+                Default: ``None`` (compare the whole frame).
 
         Raises:
             ValueError: No strategies were passed.
@@ -160,6 +282,8 @@ class FindDiff:
 
         self.exclusion_ranges = exclusion_ranges or []
 
+        self.roi = roi
+
         self.diff_ranges = []
         self._diff_frames: list[int] | None = None
         self._processed_clip: vs.VideoNode | None = None
@@ -327,6 +451,87 @@ class FindDiff:
 
         return (src_diff, ref_diff, diff_clip)
 
+    def get_heatmap(
+        self,
+        src: vs.VideoNode,
+        ref: vs.VideoNode,
+        height: int | None = None,
+        amplify: float = 8.0,
+        grid: int | None = None,
+        kernel: KernelLike = Bilinear,
+        frames_post_process: Callable[[Iterable[int]], Iterable[int]] | None = remove_isolated_frames,
+    ) -> vs.VideoNode:
+        """
+        Get a color-mapped heatmap of the differences between two clips, limited to differing frames.
+
+        The differing frames are selected from both clips before anything else is done,
+        and are then scaled down to the preview resolution before differencing.
+        Only the frames in ``diff_ranges`` are ever requested from the upstream clips,
+        and the heatmap itself is computed at the preview resolution.
+
+        The absolute difference of the first plane (luma for YUV) is amplified and mapped from
+        dark blue (no difference) through green and yellow to red (large difference).
+        Every frame is labeled with its frame number in the original clip.
+
+        If ``find_diff`` has not been run yet, this method runs it first.
+
+        Args:
+            src: Source clip.
+            ref: Reference clip.
+            height: Preview height. ``None`` keeps the original resolution. Default: ``None``.
+            amplify: Multiplier applied to the absolute difference before color mapping. Default: 8.0.
+            grid: Draw a grid of ``grid`` x ``grid`` pixel tiles over the heatmap, at the preview resolution.
+                ``None`` disables the grid. Default: ``None``.
+            kernel: Kernel used to scale the clips to the preview resolution. Default: Bilinear.
+            frames_post_process: Post-filter for differing frame numbers.
+                Default: :func:`remove_isolated_frames`.
+
+        Returns:
+            An RGB24 heatmap clip of the differing frames.
+
+        Raises:
+            NoDifferencesFoundError: No differences were found.
+            ValueError: ``amplify`` is not positive, ``grid`` is smaller than 2,
+                or ``height`` doesn't fit the chroma subsampling.
+        """
+
+        if amplify <= 0:
+            raise CustomValueError("`amplify` must be greater than 0!", self.get_heatmap, amplify)
+
+        if grid is not None and grid < 2:
+            raise CustomValueError("`grid` must be at least 2!", self.get_heatmap, grid)
+
+        self.find_diff(src, ref, frames_post_process=frames_post_process)
+
+        assert self._diff_frames is not None
+
+        src_frames, ref_frames = self.get_clip_frames(src), self.get_clip_frames(ref)
+
+        if height is not None:
+            if src_frames.format and height % (1 << src_frames.format.subsampling_h):
+                raise CustomValueError(
+                    "`height` must be a multiple of the vertical chroma subsampling!", self.get_heatmap, height
+                )
+
+            scaler = Kernel.ensure_obj(kernel, self.get_heatmap)
+            # Let get_w pick a width that's compatible with the chroma subsampling
+            width = get_w(height, src_frames)
+
+            src_frames, ref_frames = (scaler.scale(c, width, height) for c in (src_frames, ref_frames))
+
+        heatmap = _jet_heatmap(src_frames, ref_frames, amplify)
+
+        if grid is not None:
+            white = core.std.BlankClip(heatmap, color=[255, 255, 255], keep=True)
+            heatmap = heatmap.std.MaskedMerge(white, _grid_mask(heatmap, grid), first_plane=True)
+
+        # Build every label once, so the FrameEval only has to pick the right one
+        labels = [heatmap.text.Text(f"Frame {frame}", alignment=7) for frame in self._diff_frames]
+
+        labeled = core.std.FrameEval(heatmap, lambda n: labels[n], clip_src=heatmap)
+
+        return labeled.std.SetFrameProps(Name="diff heatmap", fd_diffRanges=str(self.diff_ranges))
+
     def get_clip_frames(
         self,
         clip: vs.VideoNode,
@@ -392,46 +597,232 @@ class FindDiff:
                 reason=self.diff_ranges,
             )
 
-        sfile = SPath(output_path)
+        franges = "\n".join(f"{start}-{end}" for start, end in self.diff_ranges)  # type: ignore
 
-        if sfile.is_dir():
-            raise FileIsADirectoryError(
-                "Failed to save frame ranges! Output path is a directory!",
-                self.to_file,
-                reason=sfile,
-            )
+        return self._write_file(output_path, franges, self.to_file)
 
-        franges = "\n".join(f"{start}-{end}" for start, end in self.diff_ranges)  # type: ignore
+    def to_chunks(
+        self,
+        output_path: SPathLike,
+        keyframes: Sequence[int] | SPathLike,
+        num_frames: int | None = None,
+        min_gap: int = 0,
+        fmt: ChunkFormat = ChunkFormat.RANGES,
+        zone_args: str = "b=1.0",
+    ) -> SPath:
+        """
+        Save the frame ranges snapped outwards to keyframes, for partial re-encodes.
 
-        try:
-            sfile.write_text(franges)
-        except PermissionError as e:
-            raise FilePermissionError(
-                "Failed to save frame ranges! Insufficient permissions!",
-                self.to_file,
-                reason=e,
-            )
-        except OSError as e:
-            raise CustomOSError(
-                "Failed to save frame ranges! OS error (disk full, invalid path, etc.)!",
-                self.to_file,
-                reason=e,
-            )
-        except Exception as e:
-            raise CustomRuntimeError(
-                "Failed to save frame ranges!",
-                self.to_file,
-                reason=e,
+        Every range is extended to start on the closest keyframe at or before it,
+        and to end right before the first keyframe after it.
+        Chunks that end up closer than ``min_gap`` frames to each other are merged.
+        See :func:`snap_ranges_to_keyframes` for details.
+
+        Example usage:
+
+        .. code-block:: python
+
+            from vstools import Keyframes
+
+            finder = FindDiff().find_diff(src, ref)
+            finder.to_chunks("zones.txt", Keyframes.from_clip(src), min_gap=48, fmt=ChunkFormat.ZONES)
+
+        Args:
+            output_path: File path to write.
+            keyframes: Keyframes to snap to, such as a :py:class:`vstools.Keyframes` object,
+                or a path to a keyframes file readable by :py:meth:`vstools.Keyframes.from_file`.
+            num_frames: Total number of frames in the clip, used to close the last chunk.
+                Default: The length of the clip processed by ``find_diff``.
+            min_gap: Merge chunks that are fewer than this many frames apart. Default: 0.
+            fmt: Output format. See :py:class:`lvsfunc.diff.enum.ChunkFormat`. Default: ``ChunkFormat.RANGES``.
+            zone_args: Zone options applied to every chunk when using ``ChunkFormat.ZONES``.
+                Default: ``"b=1.0"``.
+
+        Returns:
+            The written file path.
+
+        Raises:
+            NoDifferencesFoundError: ``find_diff`` has not been run yet.
+            CustomValueError: ``num_frames`` is not given and no processed clip is available.
+            FileIsADirectoryError: ``output_path`` is a directory.
+            FilePermissionError: The file cannot be written.
+            CustomOSError: An OS error occurred while writing.
+            CustomRuntimeError: An unexpected error occurred while writing.
+            FileWasNotFoundError: The file was not created.
+        """
+
+        if not self.diff_ranges:
+            raise NoDifferencesFoundError(
+                "You have not found the differences yet! Please run `find_diff` first.",
+                self.to_chunks,
+                reason=self.diff_ranges,
             )
 
-        if not sfile.exists():
-            raise FileWasNotFoundError(
-                "Failed to save frame ranges! File was not found!",
-                self.to_file,
-                reason=sfile,
+        if num_frames is None:
+            if self._processed_clip is None:
+                raise CustomValueError(
+                    "`num_frames` must be given when `find_diff` has not been run in this session!",
+                    self.to_chunks,
+                )
+
+            num_frames = self._processed_clip.num_frames
+
+        if not isinstance(keyframes, Sequence) or isinstance(keyframes, str):
+            keyframes = Keyframes.from_file(keyframes)
+
+        chunks = snap_ranges_to_keyframes(self.diff_ranges, keyframes, num_frames, min_gap)  # type: ignore[arg-type]
+
+        return self._write_file(output_path, ChunkFormat(fmt).format(chunks, zone_args), self.to_chunks)
+
+    def to_report(
+        self,
+        src: vs.VideoNode,
+        ref: vs.VideoNode,
+        output_dir: SPathLike,
+        height: int = 180,
+        fmt: Literal["webp", "png"] = "webp",
+        amplify: float = 8.0,
+        workers: int | None = None,
+        kernel: KernelLike = Bilinear,
+        frames_post_process: Callable[[Iterable[int]], Iterable[int]] | None = remove_isolated_frames,
+    ) -> SPath:
+        """
+        Write a static HTML review report of the differences between two clips.
+
+        The report holds one thumbnail strip per range, showing the source, the reference,
+        and a difference heatmap (see :meth:`get_heatmap`) of the middle frame of the range,
+        together with the frame numbers and a severity score.
+        The severity is the mean absolute difference of the first plane of the thumbnails, in percent.
+        If a region of interest is set, the thumbnails are cropped to its bounding box.
+
+        Only one frame per range is requested from the upstream clips.
+        All strips are rendered in a single pass and encoded concurrently by :func:`lvsfunc.write_images`,
+        so the report can be reviewed in any browser without re-rendering the clips.
+
+        If ``find_diff`` has not been run yet, this method runs it first.
+
+        Example usage:
+
+        .. code-block:: python
+
+            from lvsfunc import FindDiff
+
+            FindDiff().to_report(src, ref, "diff_report")  # Open diff_report/index.html
+
+        Dependencies:
+
+            - Pillow (https://python-pillow.github.io/)
+
+        Args:
+            src: Source clip.
+            ref: Reference clip.
+            output_dir: Directory to write ``index.html`` and the thumbnails to.
+            height: Thumbnail height. Default: 180.
+            fmt: Thumbnail image format. Either ``"webp"`` or ``"png"``. Default: ``"webp"``.
+            amplify: Multiplier applied to the absolute difference before color mapping. Default: 8.0.
+            workers: Number of encoder threads. Default: See :func:`lvsfunc.write_images`.
+            kernel: Kernel used to scale the clips to the thumbnail resolution. Default: Bilinear.
+            frames_post_process: Post-filter for differing frame numbers.
+                Default: :func:`remove_isolated_frames`.
+
+        Returns:
+            The path to the written ``index.html``.
+
+        Raises:
+            NoDifferencesFoundError: No differences were found.
+            ValueError: ``fmt`` is not supported, ``height`` or ``amplify`` is not positive,
+                or ``height`` doesn't fit the chroma subsampling.
+            FileIsADirectoryError: ``output_dir/index.html`` is a directory.
+            FilePermissionError: The report cannot be written.
+            CustomOSError: An OS error occurred while writing.
+            CustomRuntimeError: An unexpected error occurred while writing.
+            FileWasNotFoundError: The report was not created.
+        """
+
+        if fmt not in ("webp", "png"):
+            raise CustomValueError("`fmt` must be either 'webp' or 'png'!", self.to_report, fmt)
+
+        if height <= 0:
+            raise CustomValueError("`height` must be greater than 0!", self.to_report, height)
+
+        if src.format and height % (1 << src.format.subsampling_h):
+            raise CustomValueError(
+                "`height` must be a multiple of the vertical chroma subsampling!", self.to_report, height
             )
 
-        return sfile
+        if amplify <= 0:
+            raise CustomValueError("`amplify` must be greater than 0!", self.to_report, amplify)
+
+        self.find_diff(src, ref, frames_post_process=frames_post_process)
+
+        if not self.diff_ranges:
+            raise NoDifferencesFoundError("No differences found!", self.to_report, reason=self.diff_ranges)
+
+        ranges = [(start, end) for start, end in self.diff_ranges]  # type: ignore[misc]
+        shown = [(start + end) // 2 for start, end in ranges]
+
+        roi_bounds = self._roi_bounds(src)
+        scaler = Kernel.ensure_obj(kernel, self.to_report)
+
+        src_thumbs, ref_thumbs = (
+            self._crop_roi(core.std.Splice([clip[n] for n in shown]), roi_bounds) for clip in (src, ref)
+        )
+
+        # Let get_w pick a width that's compatible with the chroma subsampling
+        width = get_w(height, src_thumbs)
+
+        src_thumbs, ref_thumbs = (scaler.scale(c, width, height) for c in (src_thumbs, ref_thumbs))
+
+        strip = core.std.StackHorizontal(
+            [
+                scaler.resample(c, vs.RGB24, matrix_in=Matrix.from_param_or_video(None, c, False, self.to_report))
+                .text.Text(label, alignment=7)
+                for c, label in ((src_thumbs, "Source"), (ref_thumbs, "Reference"))
+            ]
+            + [_jet_heatmap(src_thumbs, ref_thumbs, amplify).text.Text("Difference", alignment=7)]
+        )
+
+        strip = merge_clip_props(strip, core.std.PlaneStats(src_thumbs, ref_thumbs, 0, prop="fd_report"))
+
+        out_dir = SPath(output_dir)
+        thumbs = [out_dir / "thumbs" / f"{start:06d}-{end:06d}.{fmt}" for start, end in ranges]
+        severities = [0.0] * len(ranges)
+
+        def _collect(n: int, f: vs.VideoFrame) -> None:
+            severities[n] = float(get_prop(f, "fd_reportDiff", (float, int), default=0.0)) * 100
+
+        write_images(strip, thumbs, workers, func_except=self.to_report, callback=_collect)
+
+        names = [
+            get_prop(clip, "Name", str, default=default, func=self.to_report)
+            for clip, default in ((src, "Source"), (ref, "Reference"))
+        ]
+
+        rows = "\n".join(
+            f"<tr><td>{start}-{end}</td><td>{end - start + 1}</td><td>{frame}</td><td>{severity:.2f}%</td>"
+            f'<td><img src="thumbs/{thumb.name}" loading="lazy" alt="Frame {frame}"></td></tr>'
+            for (start, end), frame, severity, thumb in zip(ranges, shown, severities, thumbs)
+        )
+
+        title = html.escape(f"Differences between {names[0]} and {names[1]}")
+
+        report = (
+            "<!DOCTYPE html>\n"
+            '<html><head><meta charset="utf-8">'
+            f"<title>{title}</title>"
+            "<style>body{font-family:sans-serif;background:#111;color:#ddd}"
+            "table{border-collapse:collapse}td,th{padding:4px 8px;border-bottom:1px solid #333;text-align:left}"
+            "img{display:block}</style></head><body>\n"
+            f"<h1>{title}</h1>\n"
+            f"<p>{len(ranges)} ranges, {len(self._diff_frames or [])} frames.</p>\n"
+            "<table><tr><th>Frames</th><th>Length</th><th>Shown</th><th>Severity</th>"
+            "<th>Source | Reference | Difference</th></tr>\n"
+            f"{rows}\n</table></body></html>\n"
+        )
+
+        return self._write_file(
+            out_dir / "index.html", report.encode("ascii", "xmlcharrefreplace").decode(), self.to_report
+        )
 
     def from_file(self, input_path: SPathLike) -> FrameRangesN:
         """
@@ -516,6 +907,46 @@ class FindDiff:
 
         return self.diff_ranges
 
+    def _write_file(self, output_path: SPathLike, content: str, func: FuncExceptT) -> SPath:
+        sfile = SPath(output_path)
+
+        if sfile.is_dir():
+            raise FileIsADirectoryError(
+                "Failed to save frame ranges! Output path is a directory!",
+                func,
+                reason=sfile,
+            )
+
+        try:
+            sfile.write_text(content)
+        except PermissionError as e:
+            raise FilePermissionError(
+                "Failed to save frame ranges! Insufficient permissions!",
+                func,
+                reason=e,
+            )
+        except OSError as e:
+            raise CustomOSError(
+                "Failed to save frame ranges! OS error (disk full, invalid path, etc.)!",
+                func,
+                reason=e,
+            )
+        except Exception as e:
+            raise CustomRuntimeError(
+                "Failed to save frame ranges!",
+                func,
+                reason=e,
+            )
+
+        if not sfile.exists():
+            raise FileWasNotFoundError(
+                "Failed to save frame ranges! File was not found!",
+                func,
+                reason=sfile,
+            )
+
+        return sfile
+
     def _validate_inputs(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, vs.VideoNode]:
         check_ref_clip(src, ref, self._func_except)
 
@@ -531,11 +962,155 @@ class FindDiff:
         min_frames = min(src.num_frames, ref.num_frames)
         return src[:min_frames], ref[:min_frames]
 
-    def _prepare_clips(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, vs.VideoNode]:
+    def _prepare_clips(self, src: vs.VideoNode, *refs: vs.VideoNode) -> tuple[vs.VideoNode, ...]:
+        """
+        Restrict ``src`` and every reference to the ROI, then pre-process them.
+
+        The ROI's bounding box is grown by whatever ``pre_process`` crops off the edges,
+        so the crop eats into that padding instead of into the region itself.
+        """
+
+        if self.roi is not None:
+            bounds = self._roi_bounds(src, self._pre_process_margin(src))
+
+            src = self._crop_roi(src, bounds)
+            refs = tuple(self._mask_roi(src, self._crop_roi(ref, bounds), bounds) for ref in refs)
+
         if callable(self.pre_process):
-            return self.pre_process(src), self.pre_process(ref)
+            return self.pre_process(src), *(self.pre_process(ref) for ref in refs)
+
+        return src, *refs
+
+    def _pre_process_margin(self, clip: vs.VideoNode) -> tuple[int, int]:
+        """Get how many pixels ``pre_process`` removes from each side of ``clip``, assuming it crops evenly."""
+
+        if not callable(self.pre_process):
+            return 0, 0
+
+        processed = self.pre_process(clip)
+
+        return max(0, (clip.width - processed.width) // 2), max(0, (clip.height - processed.height) // 2)
+
+    def _crop_roi(self, clip: vs.VideoNode, bounds: RectangleT | None) -> vs.VideoNode:
+        if bounds is None or bounds == (0, 0, clip.width, clip.height):
+            return clip
+
+        x, y, width, height = bounds
+
+        return clip.std.CropAbs(width, height, x, y)
+
+    def _mask_roi(self, src: vs.VideoNode, ref: vs.VideoNode, bounds: RectangleT | None) -> vs.VideoNode:
+        """Replace every pixel of ``ref`` outside of the ROI with ``src`` so it never counts as a difference."""
+
+        assert src.format
+
+        gray = src.format.replace(color_family=vs.GRAY, subsampling_w=0, subsampling_h=0)
+
+        if isinstance(self.roi, vs.VideoNode):
+            mask = self._crop_roi(plane(self.roi, 0), bounds)
+
+            if mask.num_frames == 1:
+                mask = mask * src.num_frames
+
+            mask = depth(mask, src).std.Binarize(threshold=1e-6 if gray.sample_type == vs.FLOAT else 1)
+        else:
+            assert bounds is not None
+
+            rects = self._roi_rects()
+
+            if len(rects) == 1 and rects[0] == bounds:
+                return ref
+
+            bx, by, bwidth, bheight = bounds
+
+            peak = 1.0 if gray.sample_type == vs.FLOAT else (1 << gray.bits_per_sample) - 1
+
+            blank = core.std.BlankClip(src, bwidth, bheight, gray.id, color=0, keep=True)
 
-        return src, ref
+            masks = [
+                core.std.BlankClip(blank, width, height, color=peak, keep=True).std.AddBorders(
+                    x - bx, bwidth - width - (x - bx), y - by, bheight - height - (y - by)
+                )
+                for x, y, width, height in rects
+            ]
+
+            mask = masks[0]
+
+            for other in masks[1:]:
+                mask = core.std.Expr([mask, other], "x y max")
+
+        return src.std.MaskedMerge(ref, mask, first_plane=True)
+
+    def _roi_rects(self) -> list[RectangleT]:
+        assert self.roi is not None and not isinstance(self.roi, vs.VideoNode)
+
+        if len(self.roi) == 4 and all(isinstance(v, int) for v in self.roi):
+            return [self.roi]  # type: ignore[list-item]
+
+        return [tuple(rect) for rect in self.roi]  # type: ignore[misc]
+
+    def _roi_bounds(self, clip: vs.VideoNode, margin: tuple[int, int] = (0, 0)) -> RectangleT | None:
+        """
+        Get the ROI's bounding box as ``(x, y, width, height)``, aligned outwards to the clip's subsampling.
+
+        The box is grown by ``margin`` pixels horizontally and vertically, as far as the clip's edges allow.
+        """
+
+        if self.roi is None:
+            return None
+
+        if isinstance(self.roi, vs.VideoNode):
+            if (self.roi.width, self.roi.height) != (clip.width, clip.height):
+                raise CustomValueError(
+                    "The ROI mask must have the same dimensions as the clips!",
+                    self._func_except,
+                    f"{(self.roi.width, self.roi.height)} != {(clip.width, clip.height)}",
+                )
+
+            if self.roi.num_frames > 1:
+                if self.roi.num_frames != clip.num_frames:
+                    raise CustomValueError(
+                        "A per-frame ROI mask must have as many frames as the clips!",
+                        self._func_except,
+                        f"{self.roi.num_frames} != {clip.num_frames}",
+                    )
+
+                return None
+
+            mask = np.asarray(self.roi.get_frame(0)[0])
+
+            rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+
+            if not rows.size:
+                raise CustomValueError("The ROI mask is empty!", self._func_except)
+
+            left, top, right, bottom = int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+        else:
+            rects = self._roi_rects()
+
+            if not rects or any(w <= 0 or h <= 0 or x < 0 or y < 0 for x, y, w, h in rects):
+                raise CustomValueError("ROI rectangles must have a positive size and position!", self._func_except)
+
+            left, top = min(r[0] for r in rects), min(r[1] for r in rects)
+            right, bottom = max(r[0] + r[2] for r in rects), max(r[1] + r[3] for r in rects)
+
+        if right > clip.width or bottom > clip.height:
+            raise CustomValueError(
+                "The ROI is out of the bounds of the clip!",
+                self._func_except,
+                f"{(right, bottom)} > {(clip.width, clip.height)}",
+            )
+
+        left, top = max(0, left - margin[0]), max(0, top - margin[1])
+        right, bottom = min(clip.width, right + margin[0]), min(clip.height, bottom + margin[1])
+
+        if clip.format:
+            mod_w, mod_h = 1 << clip.format.subsampling_w, 1 << clip.format.subsampling_h
+
+            left, top = left - left % mod_w, top - top % mod_h
+            right, bottom = min(-(-right // mod_w) * mod_w, clip.width), min(-(-bottom // mod_h) * mod_h, clip.height)
+
+        return left, top, right - left, bottom - top
 
     def _process(
         self,
@@ -543,7 +1118,14 @@ class FindDiff:
         ref: vs.VideoNode,
         frames_post_process: Callable[[Iterable[int]], Iterable[int]] | None = None,
     ) -> None:
-        self._processed_clip = src
+        self._processed_clip, callbacks = self._run_strategies(*self._prepare_clips(src, ref))
+
+        self._find_frames(callbacks, frames_post_process)
+
+    def _run_strategies(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, CallbacksT]:
+        """Chain every strategy over ``src`` and ``ref``, returning the processed clip and all callbacks."""
+
+        processed_clip = src
 
         callbacks: CallbacksT = []
 
@@ -551,11 +1133,10 @@ class FindDiff:
             if not isinstance(strategy, DiffStrategy):
                 strategy = strategy()  # type: ignore
 
-            processed_clip, cb = strategy.process(src=self._processed_clip, ref=ref)
-            self._processed_clip = processed_clip
+            processed_clip, cb = strategy.process(src=processed_clip, ref=ref)
             callbacks += cb
 
-        self._find_frames(callbacks, frames_post_process)
+        return processed_clip, callbacks
 
     def _find_frames(
         self,
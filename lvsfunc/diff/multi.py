@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import warnings
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import numpy as np
+from jetpytools import CustomValueError
+from vstools import FrameRangesN, check_ref_clip, clip_async_render, core, get_prop, normalize_ranges, vs
+
+from .exceptions import NoDifferencesFoundError
+from .func import FindDiff, remove_isolated_frames
+from .types import CallbacksT
+
+__all__: list[str] = [
+    "FindDiffMulti",
+]
+
+
+class FindDiffMulti(FindDiff):
+    """Find the differences between one source and multiple references in a single pass."""
+
+    ref_names: list[str]
+    """Names of the reference clips, in the same order as the columns of ``diff_matrix``."""
+
+    ref_ranges: dict[str, FrameRangesN]
+    """Ranges of frames that are different between the source and each reference."""
+
+    diff_matrix: np.ndarray[Any, Any]
+    """Boolean ``(frames, references)`` matrix. ``True`` where a reference differs from the source."""
+
+    def find_diff_multi(
+        self,
+        src: vs.VideoNode,
+        refs: Sequence[vs.VideoNode] | dict[str, vs.VideoNode],
+        force: bool = False,
+        error_on_no_diff: bool = True,
+        frames_post_process: Callable[[Iterable[int]], Iterable[int]] | None = remove_isolated_frames,
+    ) -> FindDiffMulti:
+        """
+        Find the differences between a source clip and every reference clip and store the results.
+
+        The source is cropped to the ROI, pre-processed, and converted to the format of the first strategy once,
+        and shared by every reference.
+        All references are then evaluated in the same render, so every frame is only requested once.
+
+        The per-reference ranges will be accessible through the ``ref_ranges`` attribute.
+        ``diff_ranges`` holds the frames where at least one reference differs from the source,
+        so :meth:`get_clip_frames` and :meth:`to_file` keep working as usual.
+
+        Example usage:
+
+        .. code-block:: python
+
+            from lvsfunc import FindDiffMulti
+
+            finder = FindDiffMulti().find_diff_multi(src, {"JP BD": jp, "US BD": us, "WEB": web})
+
+            print(finder.ref_ranges["WEB"])
+            print(finder.agreement())
+
+        Args:
+            src: Source clip.
+            refs: Reference clips. If given a dict, the keys are used as names.
+                Otherwise the ``Name`` prop of each clip is used, falling back to ``"Ref {index}"``.
+            force: Recompute even when results already exist.
+            error_on_no_diff: Raise when no differences are found for any reference. Default: ``True``.
+            frames_post_process: Post-filter for differing frame numbers, applied per reference.
+                Default: :func:`remove_isolated_frames`.
+
+        Returns:
+            This ``FindDiffMulti`` instance.
+
+        Raises:
+            ValueError: No references were passed.
+            NoDifferencesFoundError: No differences were found and ``error_on_no_diff`` is ``True``.
+        """
+
+        if not force and self._diff_frames:
+            return self
+
+        if not refs:
+            raise CustomValueError("You must pass at least one reference clip!", self._func_except)
+
+        if isinstance(refs, dict):
+            self.ref_names = list(refs.keys())
+            ref_clips = list(refs.values())
+        else:
+            ref_clips = list(refs)
+            self.ref_names = [
+                get_prop(ref, "Name", str, default=f"Ref {i}", func=self.find_diff_multi)
+                for i, ref in enumerate(ref_clips, 1)
+            ]
+
+        self._diff_frames = None
+        self.diff_ranges = []
+        self.ref_ranges = {}
+
+        src, ref_clips = self._validate_multi_inputs(src, ref_clips)
+
+        src_proc, *refs_proc = self._prepare_clips(src, *ref_clips)
+
+        # Only the first strategy sees the source directly, the others are chained on its output.
+        # Converting it here means every reference shares the same conversion, instead of doing it once per reference.
+        src_proc = self.strategies[0].prepare(src_proc)
+
+        processed = list[vs.VideoNode]()
+        ref_callbacks = list[CallbacksT]()
+
+        for ref_proc in refs_proc:
+            processed_clip, callbacks = self._run_strategies(src_proc, ref_proc)
+
+            processed.append(processed_clip)
+            ref_callbacks.append(callbacks)
+
+        def _evaluate(n: int, f: vs.VideoFrame | list[vs.VideoFrame]) -> vs.VideoFrame:
+            # ModifyFrame passes a single frame instead of a list when there is only one clip
+            frames = f if isinstance(f, list) else [f]
+
+            fout = frames[0].copy()
+            fout.props["fd_multi"] = [
+                int(self.mode.check_result([cb(frame) for cb in callbacks]))
+                for frame, callbacks in zip(frames, ref_callbacks)
+            ]
+
+            return fout
+
+        self._processed_clip = core.std.ModifyFrame(processed[0], processed, _evaluate)
+
+        results = clip_async_render(
+            self._processed_clip,
+            None,
+            f"Finding differences between the source and {len(ref_clips)} references...",
+            lambda n, f: get_prop(f, "fd_multi", (list, int)),
+        )
+
+        self.diff_matrix = np.array(results, dtype=bool).reshape(-1, len(ref_clips))
+
+        if self.exclusion_ranges:
+            self.exclusion_ranges = normalize_ranges(self._processed_clip, self.exclusion_ranges)
+
+            for start, stop in self.exclusion_ranges:
+                self.diff_matrix[start : stop + 1] = False
+
+        all_frames = set[int]()
+
+        for name, column in zip(self.ref_names, self.diff_matrix.T):
+            frames: Iterable[int] = np.flatnonzero(column).tolist()
+
+            if frames_post_process is not None:
+                frames = frames_post_process(frames)
+
+            frames = list(frames)
+            all_frames.update(frames)
+
+            self.ref_ranges[name] = list(self._to_ranges(frames))
+
+        self._diff_frames = sorted(all_frames)
+        self.diff_ranges = list(self._to_ranges(self._diff_frames))
+
+        if error_on_no_diff and not self._diff_frames:
+            raise NoDifferencesFoundError(
+                "No differences found!",
+                self._func_except,
+                reason=self.ref_ranges,
+            )
+
+        return self
+
+    def agreement(self) -> np.ndarray[Any, Any]:
+        """
+        Get how often every pair of references agrees on whether a frame differs from the source.
+
+        Returns:
+            A ``(references, references)`` matrix with the fraction of frames on which two references agree,
+            in the same order as ``ref_names``.
+
+        Raises:
+            NoDifferencesFoundError: ``find_diff_multi`` has not been run yet.
+        """
+
+        if not hasattr(self, "diff_matrix"):
+            raise NoDifferencesFoundError(
+                "You have not looked for differences yet! Please run `find_diff_multi` first.",
+                self.agreement,
+            )
+
+        matrix = self.diff_matrix
+
+        return (matrix[:, :, None] == matrix[:, None, :]).mean(axis=0)
+
+    def _validate_multi_inputs(
+        self, src: vs.VideoNode, refs: list[vs.VideoNode]
+    ) -> tuple[vs.VideoNode, list[vs.VideoNode]]:
+        for ref in refs:
+            check_ref_clip(src, ref, self._func_except)
+
+        min_frames = min(clip.num_frames for clip in (src, *refs))
+
+        if all(clip.num_frames == min_frames for clip in (src, *refs)):
+            return src, refs
+
+        warnings.warn(
+            f"{self._func_except}: 'The number of frames of the clips don't match! "
+            f"({src.num_frames=}, refs={[ref.num_frames for ref in refs]})\n"
+            "The function will still work, but your clips may be synced incorrectly!'"
+        )
+
+        return src[:min_frames], [ref[:min_frames] for ref in refs]
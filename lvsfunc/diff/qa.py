@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import csv
+import math
+from collections.abc import Sequence
+from threading import Lock
+from typing import Any, TextIO
+
+import numpy as np
+from jetpytools import CustomRuntimeError, CustomValueError, DependencyNotFoundError, FuncExceptT, SPath, SPathLike
+from vstools import (
+    FrameRangesN,
+    InvalidColorFamilyError,
+    Keyframes,
+    clip_async_render,
+    core,
+    depth,
+    get_prop,
+    merge_clip_props,
+    plane,
+    vs,
+)
+
+from .enum import VMAFFeature
+
+__all__: list[str] = [
+    "EncodeQA",
+]
+
+
+_PSNR_MAX = 100.0
+"""PSNR reported for frames that are identical to the source."""
+
+
+class EncodeQA:
+    """Measure the quality of an encode against its source, per frame and per scene."""
+
+    metric_names: list[str]
+    """Names of the measured metrics, in the same order as the columns of ``frame_metrics``."""
+
+    frame_metrics: np.ndarray[Any, Any]
+    """``(frames, metrics)`` matrix of the per-frame metric values."""
+
+    scenes: FrameRangesN
+    """Scenes the metrics are aggregated over, as inclusive ``(start, end)`` ranges."""
+
+    scene_stats: dict[str, np.ndarray[Any, Any]]
+    """
+    Per-scene statistics, keyed by ``"{metric}_{stat}"``.
+
+    ``stat`` is one of ``min``, ``mean``, or ``p{percentile}``. Every array holds one value per scene.
+    """
+
+    def __init__(
+        self,
+        features: VMAFFeature | Sequence[VMAFFeature] | None = None,
+        percentiles: Sequence[float] = (1, 5, 50),
+        scene_thr: float = 0.1,
+        func_except: FuncExceptT | None = None,
+    ) -> None:
+        """
+        Compute several quality metrics between a source and an encode in a single pass.
+
+        Luma PSNR is always measured, with the maximum sample value of the format as the peak.
+        Any VMAF features passed are measured in the same render. VMAF requires YUV clips,
+        and clips that aren't 8, 10, or 12-bit integer are converted to 12-bit for it.
+        Every frame's metrics are written into a preallocated array and, optionally,
+        streamed to a CSV file in frame order as soon as they are rendered.
+        The metrics are then aggregated per scene, which makes it easy to find the scenes that need zoning.
+
+        Higher is better for every metric, so the worst scenes are the ones with the lowest statistics.
+
+        Example usage:
+
+        .. code-block:: python
+
+            from lvsfunc import EncodeQA, VMAFFeature
+
+            qa = EncodeQA(VMAFFeature.SSIM).run(src, enc, keyframes="keyframes.txt", csv_path="qa.csv")
+
+            print(qa.worst_scenes("float_ssim", fraction=0.01))
+
+        Dependencies:
+
+            - VapourSynth-VMAF (https://github.com/HomeOfVapourSynthEvolution/VapourSynth-VMAF)
+              (only when ``features`` are given)
+
+        Args:
+            features: VMAF features to measure in addition to PSNR.
+                See :py:class:`lvsfunc.diff.enum.VMAFFeature` for details. Default: ``None``.
+            percentiles: Percentiles to compute per scene, between 0 and 100. Default: ``(1, 5, 50)``.
+            scene_thr: Normalized luma difference between two neighboring source frames
+                above which a new scene starts. Only used when no keyframes are passed to :meth:`run`.
+                Default: 0.1.
+
+        Raises:
+            ValueError: A percentile is outside of 0-100, or ``scene_thr`` is not between 0 and 1.
+            DependencyNotFoundError: ``features`` are given and VMAF is not installed.
+        """
+
+        self._func_except = func_except or self.__class__.__name__
+
+        if isinstance(features, VMAFFeature):
+            features = [features]
+
+        self.features = [
+            f
+            for feature in features or []
+            for f in ([f for f in VMAFFeature if f.value >= 0] if feature == VMAFFeature.ALL else [feature])
+        ]
+
+        if self.features and not hasattr(core, "vmaf"):
+            raise DependencyNotFoundError(
+                self._func_except,
+                "vmaf <https://github.com/HomeOfVapourSynthEvolution/VapourSynth-VMAF>",
+            )
+
+        if any(not 0 <= q <= 100 for q in percentiles):
+            raise CustomValueError("Percentiles must be between 0 and 100!", self._func_except, percentiles)
+
+        if not 0 < scene_thr <= 1:
+            raise CustomValueError("`scene_thr` must be between 0 and 1!", self._func_except, scene_thr)
+
+        self.percentiles = list(percentiles)
+        self.scene_thr = scene_thr
+
+        self.metric_names = ["psnr", *(feature.prop for feature in self.features)]
+        self.scenes = []
+        self.scene_stats = {}
+
+    def run(
+        self,
+        src: vs.VideoNode,
+        enc: vs.VideoNode,
+        keyframes: Sequence[int] | SPathLike | None = None,
+        csv_path: SPathLike | None = None,
+        npz_path: SPathLike | None = None,
+    ) -> EncodeQA:
+        """
+        Measure the encode against the source and aggregate the results per scene.
+
+        Args:
+            src: Source clip.
+            enc: Encoded clip. Must have the same length, format, and dimensions as ``src``.
+            keyframes: Scene boundaries, such as a :py:class:`vstools.Keyframes` object,
+                or a path to a keyframes file readable by :py:meth:`vstools.Keyframes.from_file`.
+                If ``None``, scene changes are detected on the source in the same pass.
+            csv_path: Stream the per-frame metrics to this CSV file while rendering. Default: ``None``.
+            npz_path: Write the per-frame metrics, scenes, and per-scene statistics to this NPZ file.
+                Default: ``None``.
+
+        Returns:
+            This ``EncodeQA`` instance.
+
+        Raises:
+            ValueError: The clips differ in length, format, or dimensions.
+            InvalidColorFamilyError: VMAF features are measured on clips that aren't YUV.
+        """
+
+        if src.num_frames != enc.num_frames:
+            raise CustomValueError(
+                "The source and encode must have the same number of frames!",
+                self._func_except,
+                f"{src.num_frames} != {enc.num_frames}",
+            )
+
+        if (src.format, src.width, src.height) != (enc.format, enc.width, enc.height):
+            raise CustomValueError("The source and encode must have the same format and dimensions!", self._func_except)
+
+        assert src.format
+
+        vmaf_src, vmaf_enc = src, enc
+
+        if self.features:
+            InvalidColorFamilyError.check(src, vs.YUV, self._func_except)
+
+            # VMAF only reads 8, 10, or 12-bit integer YUV
+            if src.format.sample_type == vs.FLOAT or src.format.bits_per_sample not in (8, 10, 12):
+                vmaf_src, vmaf_enc = (depth(clip, 12, dither_type="none") for clip in (src, enc))
+
+        # The squared error is measured on the native samples, so PSNR uses the full code range as its peak,
+        # regardless of the color range of the clips
+        peak = 1.0 if src.format.sample_type == vs.FLOAT else float((1 << src.format.bits_per_sample) - 1)
+        squared_error = core.std.Expr([plane(src, 0), plane(enc, 0)], "x y - dup *", vs.GRAYS)
+
+        src_luma = depth(plane(src, 0), 32)
+
+        props_clips = [core.std.PlaneStats(squared_error, prop="qa_mse")]
+        props_clips += [core.vmaf.Metric(vmaf_src, vmaf_enc, feature=int(feature)) for feature in self.features]
+
+        if keyframes is None:
+            prev_luma = src_luma[0] + src_luma[:-1] if src.num_frames > 1 else src_luma
+
+            props_clips += [core.std.PlaneStats(src_luma, prev_luma, prop="qa_sc")]
+
+        self.frame_metrics = np.full((src.num_frames, len(self.metric_names)), np.nan)
+        scene_diffs = np.zeros(src.num_frames)
+
+        writer = _OrderedCsvWriter(csv_path, ["frame", *self.metric_names]) if csv_path is not None else None
+
+        def _measure(n: int, f: vs.VideoFrame) -> None:
+            mse = float(get_prop(f, "qa_mseAverage", (float, int), default=0.0))
+
+            row = self.frame_metrics[n]
+            row[0] = _PSNR_MAX if mse <= 0 else min(10 * math.log10(peak**2 / mse), _PSNR_MAX)
+
+            for i, feature in enumerate(self.features, 1):
+                row[i] = get_prop(f, feature.prop, (float, int), default=math.nan)
+
+            if keyframes is None:
+                scene_diffs[n] = get_prop(f, "qa_scDiff", (float, int), default=0.0)
+
+            if writer is not None:
+                writer.write(n, [n, *row.tolist()])
+
+        try:
+            clip_async_render(merge_clip_props(*props_clips), None, "Measuring encode quality...", _measure)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if keyframes is None:
+            cuts = [0, *(np.flatnonzero(scene_diffs[1:] > self.scene_thr) + 1).tolist()]
+        else:
+            if not isinstance(keyframes, Sequence) or isinstance(keyframes, str):
+                keyframes = Keyframes.from_file(keyframes)
+
+            cuts = sorted({0, *(kf for kf in keyframes if 0 <= kf < src.num_frames)})
+
+        self.scenes = [(start, end - 1) for start, end in zip(cuts, [*cuts[1:], src.num_frames])]
+        self.scene_stats = self._aggregate()
+
+        if npz_path is not None:
+            np.savez_compressed(
+                SPath(npz_path),
+                metric_names=np.array(self.metric_names),
+                frame_metrics=self.frame_metrics,
+                scenes=np.array(self.scenes, dtype=np.int64).reshape(-1, 2),
+                **self.scene_stats,
+            )
+
+        return self
+
+    def worst_scenes(self, metric: str | None = None, stat: str = "mean", fraction: float = 0.01) -> FrameRangesN:
+        """
+        Get the scenes with the lowest value for a statistic, worst first.
+
+        Args:
+            metric: Metric to rank by. Default: The first metric (PSNR).
+            stat: Statistic to rank by, e.g. ``"min"``, ``"mean"``, or ``"p5"``. Default: ``"mean"``.
+            fraction: Fraction of scenes to return. At least one scene is always returned. Default: 0.01.
+
+        Returns:
+            The worst scenes as inclusive ``(start, end)`` ranges.
+
+        Raises:
+            CustomRuntimeError: :meth:`run` has not been called yet.
+            ValueError: The metric or statistic does not exist, or ``fraction`` is not between 0 and 1.
+        """
+
+        if not self.scenes:
+            raise CustomRuntimeError("You have not measured an encode yet! Please run `run` first.", self.worst_scenes)
+
+        if not 0 < fraction <= 1:
+            raise CustomValueError("`fraction` must be between 0 and 1!", self.worst_scenes, fraction)
+
+        key = f"{metric or self.metric_names[0]}_{stat}"
+
+        if key not in self.scene_stats:
+            raise CustomValueError(
+                "Unknown metric or statistic!", self.worst_scenes, f"{key} not in {list(self.scene_stats)}"
+            )
+
+        count = max(1, round(len(self.scenes) * fraction))
+        order = np.argsort(self.scene_stats[key], kind="stable")[:count]
+
+        return [self.scenes[i] for i in order.tolist()]
+
+    def _aggregate(self) -> dict[str, np.ndarray[Any, Any]]:
+        """Compute the per-scene statistics of every metric."""
+
+        starts = np.array([start for start, _ in self.scenes])
+        lengths = np.array([end - start + 1 for start, end in self.scenes])
+
+        stats = dict[str, np.ndarray[Any, Any]]()
+
+        for i, name in enumerate(self.metric_names):
+            values = self.frame_metrics[:, i]
+
+            stats[f"{name}_min"] = np.minimum.reduceat(values, starts)
+            stats[f"{name}_mean"] = np.add.reduceat(values, starts) / lengths
+
+            for q in self.percentiles:
+                stats[f"{name}_p{q:g}"] = np.array(
+                    [np.percentile(values[start : end + 1], q) for start, end in self.scenes]
+                )
+
+        return stats
+
+
+class _OrderedCsvWriter:
+    """Write rows to a CSV file in frame order, buffering only the rows that arrive ahead of it."""
+
+    def __init__(self, path: SPathLike, header: list[str]) -> None:
+        self._file: TextIO = SPath(path).open("w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+        self._pending = dict[int, list[Any]]()
+        self._next = 0
+        self._lock = Lock()
+
+    def write(self, n: int, row: list[Any]) -> None:
+        with self._lock:
+            self._pending[n] = row
+
+            while self._next in self._pending:
+                self._writer.writerow(self._pending.pop(self._next))
+                self._next += 1
+
+    def close(self) -> None:
+        self._file.close()
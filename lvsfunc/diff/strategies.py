@@ -59,6 +59,22 @@ class DiffStrategy(ABC):
         self._func_except = func_except or self.__class__.__name__
         self.kwargs = kwargs
 
+    def prepare(self, clip: vs.VideoNode) -> vs.VideoNode:
+        """
+        Convert a clip to the format this strategy compares in.
+
+        :meth:`process` converts its inputs itself, so this is only needed to share a single conversion
+        of a clip between several calls, such as the source in :py:class:`lvsfunc.diff.FindDiffMulti`.
+
+        Args:
+            clip: The clip to convert.
+
+        Returns:
+            The converted clip, or the clip itself if no conversion is needed.
+        """
+
+        return clip
+
     @abstractmethod
     def process(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, CallbacksT]:
         """
@@ -124,11 +140,16 @@ class PlaneStatsDiff(DiffStrategy, _VszipStrategy):
 
         super().__init__(threshold, planes, func_except)
 
+    def prepare(self, clip: vs.VideoNode) -> vs.VideoNode:
+        """Convert a clip to 8-bit."""
+
+        return depth(clip, 8)
+
     def process(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, CallbacksT]:
         """Process the difference between two clips using the old find_diff logic."""
 
-        src = depth(src, 8)
-        ref = depth(ref, 8)
+        src = self.prepare(src)
+        ref = self.prepare(ref)
 
         diff_clip = (
             src.std.MakeDiff(ref, planes=self.planes).vszip.PlaneMinMax(prop="fs_ps").std.PlaneStats(prop="fs_ps")
@@ -179,13 +200,18 @@ class PlaneAvgFloatDiff(DiffStrategy, _VszipStrategy):
 
         super().__init__(threshold, planes, func_except)
 
+    def prepare(self, clip: vs.VideoNode) -> vs.VideoNode:
+        """Convert a clip to 32-bit float."""
+
+        return depth(clip, 32)
+
     def process(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, CallbacksT]:
         """Process the difference between two clips using PlaneAvg."""
 
         self.threshold = max(0, min(1, self.threshold))
 
-        src = depth(src, 32)
-        ref = depth(ref, 32)
+        src = self.prepare(src)
+        ref = self.prepare(ref)
 
         try:
             ps_comp = src.vszip.PlaneAverage([0], ref, planes=normalize_planes(src, self.planes), prop="fd_psf")
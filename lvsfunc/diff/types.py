@@ -1,10 +1,12 @@
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 
 from vstools import vs
 
 __all__: list[str] = [
     "CallbackT",
     "CallbacksT",
+    "RectangleT",
+    "RoiT",
 ]
 
 
@@ -14,3 +16,11 @@ type CallbackT = Callable[[vs.VideoFrame], bool]
 
 type CallbacksT = list[CallbackT]
 """A list of callback functions."""
+
+
+type RectangleT = tuple[int, int, int, int]
+"""A rectangle given as ``(x, y, width, height)``."""
+
+
+type RoiT = vs.VideoNode | RectangleT | Sequence[RectangleT]
+"""A region of interest. Either a mask clip, a single rectangle, or a list of rectangles."""
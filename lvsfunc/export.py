@@ -1,15 +1,31 @@
 from __future__ import annotations
 
-from typing import Any
+import json
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import IO, Any, Literal
 
-from jetpytools import CustomStrEnum, CustomTypeError, FuncExceptT, SPath, SPathLike
+import numpy as np
+from jetpytools import (
+    CustomStrEnum,
+    CustomTypeError,
+    CustomValueError,
+    DependencyNotFoundError,
+    FuncExceptT,
+    SPath,
+    SPathLike,
+)
 from vskernels import Bilinear, Kernel, KernelLike, Lanczos
-from vstools import Matrix, MatrixLike, clip_async_render, core, vs
+from vstools import InvalidColorFamilyError, Matrix, MatrixLike, clip_async_render, core, vs
 
 from .nn import clip_to_npy
+from .util import _FrameDeduplicator, _in_frame_order, clip_fingerprint
 
 __all__: list[str] = [
     "ExportFrames",
+    "write_images",
 ]
 
 
@@ -31,14 +47,20 @@ class ExportFrames(CustomStrEnum):
     TIFF: ExportFrames = "tiff"  # type:ignore
     NPY: ExportFrames = "npy"  # type:ignore
     NPZ: ExportFrames = "npz"  # type:ignore
+    Y4M: ExportFrames = "y4m"  # type:ignore
+    RAW: ExportFrames = "raw"  # type:ignore
 
     def __call__(
         self,
         clip: vs.VideoNode,
-        filename: SPathLike = "bin/%d.png",
+        filename: SPathLike | int | IO[bytes] = "bin/%d.png",
         kernel: KernelLike = Bilinear,
         matrix: MatrixLike | None = None,
         func_except: FuncExceptT | None = None,
+        workers: int | None = None,
+        effort: int | None = None,
+        dedup: Literal["exact", "perceptual"] | None = None,
+        dedup_threshold: int = 0,
         **kwargs: Any,
     ) -> list[SPath]:
         """
@@ -51,19 +73,77 @@ class ExportFrames(CustomStrEnum):
         If you're exporting to PNG, this function will use the ``vsfpng`` plugin if installed,
         otherwise falling back to ``imwri.Write``.
 
+        If ``workers`` or ``effort`` is set, frames are instead copied out as NumPy arrays
+        and encoded with Pillow in a bounded pool of encoder threads (see :func:`write_images`).
+        This scales with the number of cores when the encoder, not the filter chain, is the bottleneck,
+        which is usually the case for PNG, WebP, and AVIF. Only formats Pillow can write are supported.
+
+        Image exports are resumable. A manifest is kept next to the images, recording the
+        fingerprint of the exported clip (see :py:func:`lvsfunc.clip_fingerprint`), the filename pattern,
+        the format, the dimensions, and every frame that has been written. Running the same export again
+        only renders the frames that are missing, including after an interrupted export.
+        If the clip, format, or dimensions changed, every frame is exported again and existing files are overwritten.
+        Every filename pattern gets its own manifest, named after the pattern with ``%d`` replaced by ``#``,
+        such as ``hq_#.png.manifest.json``, so several clips can be exported into the same folder.
+
+        With ``dedup``, every rendered frame is hashed before it is encoded, and frames that duplicate
+        an earlier frame are not written at all. Their manifest entries and returned paths point to the file
+        of the first occurrence instead. This saves a lot of disk space and encoding time on animation,
+        where most frames are held for two or three frames, and on static scenes.
+        Deduplicating always encodes with Pillow. Only the frames rendered in the same run are compared,
+        so when resuming, frames that duplicate an image written by an earlier run are written again.
+
+        ``Y4M`` and ``RAW`` don't write images, but stream every frame in order into a single file,
+        an open file descriptor, or a binary file object, such as the stdin of an encoder.
+        The clip is written as-is, without resampling. ``RAW`` writes the planes of every frame back to back,
+        and ``Y4M`` adds a YUV4MPEG2 header, which requires a YUV or GRAY clip.
+        Frames are rendered ahead concurrently, but only up to ``prefetch`` frames are requested
+        and at most ``backlog`` finished frames wait to be written, so memory use stays bounded
+        when the receiving end is slower. Both can be passed as keyword arguments.
+        Default: The number of VapourSynth threads, and three times that.
+
+        Example usage:
+
+        .. code-block:: python
+
+            encoder = subprocess.Popen(["x265", "--y4m", "-", "-o", "out.hevc"], stdin=subprocess.PIPE)
+
+            ExportFrames.Y4M(clip, encoder.stdin)
+
         Args:
             clip: The input clip to process.
             filename: Output filename pattern. Must include ``%d`` for frame number substitution.
+                ``Y4M`` and ``RAW`` take a single output file, file descriptor, or binary file object instead.
             kernel: Kernel for resampling, if necessary. Default: Bilinear.
             matrix: Color matrix of the input clip. Attempts to detect if ``None``.
+            workers: Number of encoder threads to encode the images with Pillow. Default: ``None`` (writer plugin).
+            effort: Compression effort for the Pillow encoders. See :func:`write_images`. Default: Encoder default.
+            dedup: Skip frames that duplicate an earlier frame. See :func:`write_images`. Default: ``None``.
+            dedup_threshold: Maximum perceptual hash distance for ``"perceptual"`` deduplication. Default: 0.
             kwargs: Additional arguments to pass to the underlying writer.
+                When encoding with Pillow, only ``quality`` is supported.
 
         Returns:
-            List of SPath objects pointing to exported images.
+            List of SPath objects pointing to exported images, one per frame in frame order.
+            Duplicate frames point to the image of their first occurrence.
+            ``Y4M`` and ``RAW`` return the output file, or an empty list when writing to a file descriptor or object.
+
+        Raises:
+            CustomValueError: Unsupported arguments were passed when encoding with Pillow or streaming.
+            InvalidColorFamilyError: A clip that isn't YUV or GRAY was streamed as ``Y4M``.
         """
 
         func = func_except or self.__class__
 
+        if self in (ExportFrames.Y4M, ExportFrames.RAW):
+            if workers is not None or effort is not None or dedup is not None:
+                raise CustomValueError("`workers`, `effort`, and `dedup` can't be used when streaming!", func)
+
+            return self._stream_frames(clip, filename, func, **kwargs)
+
+        if isinstance(filename, int) or not isinstance(filename, (str, os.PathLike)):
+            raise CustomTypeError("Only Y4M and RAW can be written to a file descriptor or object!", func)
+
         kernel = Kernel.ensure_obj(kernel, func)
         matrix = Matrix.from_param_or_video(matrix, clip, False, func)
 
@@ -74,7 +154,49 @@ class ExportFrames(CustomStrEnum):
 
         sfile = self._check_sfile(filename, func)
 
-        return self._render_frames(clip, sfile, **kwargs)
+        if self._is_np:
+            return self._render_frames(clip, sfile, dedup=dedup, dedup_threshold=dedup_threshold, **kwargs)
+
+        use_pool = workers is not None or effort is not None or dedup is not None
+
+        # Pillow picks the format from the suffix
+        if use_pool and sfile.suffix.lower() != f".{self.value}":
+            sfile = sfile.with_suffix(f".{self.value}")
+
+        paths = [SPath(sfile.to_str() % n) for n in range(clip.num_frames)]
+
+        manifest_path = sfile.get_folder() / f"{sfile.name.replace('%d', '#')}.manifest.json"
+        manifest = self._load_manifest(manifest_path, clip, sfile.name)
+
+        folder = manifest_path.parent
+        exported = {int(n): folder / path for n, path in manifest["frames"].items() if (folder / path).exists()}
+
+        if missing := [n for n in range(clip.num_frames) if n not in exported]:
+            written = dict[int, SPath]()
+
+            try:
+                if use_pool:
+                    self._encode_frames(
+                        clip,
+                        paths,
+                        missing,
+                        workers,
+                        effort,
+                        dedup,
+                        dedup_threshold,
+                        func,
+                        written.__setitem__,
+                        **kwargs,
+                    )
+                else:
+                    self._write_frames(clip, sfile, missing, written.__setitem__, **kwargs)
+            finally:
+                # Also runs when interrupted, so the next run picks up where this one stopped
+                exported |= written
+                manifest["frames"] = {str(n): path.relative_to(folder).as_posix() for n, path in exported.items()}
+                self._save_manifest(manifest_path, manifest)
+
+        return [exported.get(n, path) for n, path in enumerate(paths)]
 
     def _check_sfile(self, file: SPathLike, func: FuncExceptT) -> SPath:
         """Validate the output file path."""
@@ -86,30 +208,337 @@ class ExportFrames(CustomStrEnum):
 
         sfile.get_folder().mkdir(parents=True, exist_ok=True)
 
-        if list(sfile.get_folder().glob("*")):
-            input(
-                f'ExportFrames: Files found in "{sfile.parent}". They may be overwritten. '
-                "Press Enter to continue or Ctrl+C to abort..."
-            )
-
         return sfile
 
-    def _render_frames(self, clip: vs.VideoNode, out_file: SPath, **kwargs: Any) -> list[SPath]:
-        """Render the frames to a PNG file using the vsfpng plugin, or fallback to imwri.Write."""
+    def _load_manifest(self, path: SPath, clip: vs.VideoNode, pattern: str) -> dict[str, Any]:
+        """Load the export manifest, starting a new one if it doesn't describe the same clip, pattern, and format."""
 
-        if self._is_np:
-            return clip_to_npy(
-                clip,
-                out_file.parent.to_str(),
-                export_npz=self == ExportFrames.NPZ,
-                **kwargs,
+        header = {
+            "fingerprint": clip_fingerprint(clip),
+            "pattern": pattern,
+            "format": self.value,
+            "width": clip.width,
+            "height": clip.height,
+        }
+
+        if path.exists():
+            try:
+                manifest = json.loads(path.read_text())
+            except (OSError, ValueError):
+                manifest = {}
+
+            if isinstance(manifest, dict) and all(manifest.get(key) == value for key, value in header.items()):
+                return manifest | {"frames": dict(manifest.get("frames", {}))}
+
+        return header | {"frames": {}}
+
+    def _save_manifest(self, path: SPath, manifest: dict[str, Any]) -> None:
+        """Atomically write the export manifest."""
+
+        manifest["frames"] = dict(sorted(manifest["frames"].items(), key=lambda item: int(item[0])))
+
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=4))
+        tmp_path.replace(path)
+
+    def _encode_frames(
+        self,
+        clip: vs.VideoNode,
+        paths: list[SPath],
+        frames: list[int],
+        workers: int | None,
+        effort: int | None,
+        dedup: Literal["exact", "perceptual"] | None,
+        dedup_threshold: int,
+        func: FuncExceptT,
+        on_written: Callable[[int, SPath], None],
+        quality: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Encode the given frames with Pillow in a thread pool instead of the writer plugin."""
+
+        if kwargs:
+            raise CustomValueError(
+                "Only `quality` can be passed when encoding with `workers` or `effort`!", func, list(kwargs)
             )
 
+        write_images(
+            _splice_frames(clip, frames),
+            [paths[n] for n in frames],
+            workers,
+            effort,
+            quality,
+            on_written=lambda i, path: on_written(frames[i], path),
+            dedup=dedup,
+            dedup_threshold=dedup_threshold,
+            func_except=func,
+        )
+
+    def _write_frames(
+        self,
+        clip: vs.VideoNode,
+        out_file: SPath,
+        frames: list[int],
+        on_written: Callable[[int, SPath], None],
+        **kwargs: Any,
+    ) -> None:
+        """Write the given frames using the vsfpng plugin, or fallback to imwri.Write."""
+
         if self is ExportFrames.PNG and hasattr(core, "fpng"):
             writer = Lanczos().resample(clip, vs.RGB24).fpng.Write(out_file.to_str(), **kwargs)
         else:
             writer = clip.imwri.Write(self.value, out_file.to_str(), **kwargs)
 
-        clip_async_render(writer)
+        # The writers name every file after the number of the frame they were requested for,
+        # so only the missing frames are rendered and everything else is left untouched
+        clip_async_render(
+            _splice_frames(writer, frames),
+            None,
+            callback=lambda n, f: on_written(frames[n], SPath(out_file.to_str() % frames[n])),
+        )
+
+    def _stream_frames(
+        self,
+        clip: vs.VideoNode,
+        target: SPathLike | int | IO[bytes],
+        func: FuncExceptT,
+        prefetch: int = 0,
+        backlog: int = -1,
+        **kwargs: Any,
+    ) -> list[SPath]:
+        """Stream the frames in order into a single file, file descriptor, or file object."""
+
+        if kwargs:
+            raise CustomValueError("Only `prefetch` and `backlog` can be passed when streaming!", func, list(kwargs))
+
+        y4m = self is ExportFrames.Y4M
+
+        if y4m:
+            InvalidColorFamilyError.check(clip, (vs.YUV, vs.GRAY), func)
+
+        progress = f"Streaming {clip.num_frames} frames..."
+
+        if isinstance(target, int):
+            # Don't close a descriptor we don't own, only flush what was buffered on top of it
+            with os.fdopen(target, "wb", closefd=False) as stream:
+                clip_async_render(clip, stream, progress, prefetch=prefetch, backlog=backlog, y4m=y4m)
+
+            return []
+
+        if not isinstance(target, (str, os.PathLike)):
+            clip_async_render(clip, target, progress, prefetch=prefetch, backlog=backlog, y4m=y4m)
+            target.flush()
+
+            return []
+
+        sfile = SPath(target)
+
+        if "%d" in sfile.name:
+            raise CustomValueError("Streams are written to a single file, without frame number substitution!", func)
+
+        sfile.get_folder().mkdir(parents=True, exist_ok=True)
+
+        with sfile.open("wb") as stream:
+            clip_async_render(clip, stream, progress, prefetch=prefetch, backlog=backlog, y4m=y4m)
+
+        return [sfile]
+
+    def _render_frames(self, clip: vs.VideoNode, out_file: SPath, **kwargs: Any) -> list[SPath]:
+        """Export the frames to numpy arrays."""
+
+        return clip_to_npy(
+            clip,
+            out_file.parent.to_str(),
+            export_npz=self == ExportFrames.NPZ,
+            **kwargs,
+        )
+
+
+def _splice_frames(clip: vs.VideoNode, frames: list[int]) -> vs.VideoNode:
+    """Splice the given frames of a clip together, keeping contiguous runs as single trims."""
+
+    if len(frames) == clip.num_frames:
+        return clip
+
+    runs = list[tuple[int, int]]()
+
+    for n in frames:
+        if runs and runs[-1][1] == n - 1:
+            runs[-1] = (runs[-1][0], n)
+        else:
+            runs.append((n, n))
+
+    return core.std.Splice([clip[start : end + 1] for start, end in runs])
+
+
+def write_images(
+    clip: vs.VideoNode,
+    paths: Sequence[SPathLike],
+    workers: int | None = None,
+    effort: int | None = None,
+    quality: int | None = None,
+    kernel: KernelLike = Bilinear,
+    matrix: MatrixLike | None = None,
+    callback: Callable[[int, vs.VideoFrame], None] | None = None,
+    on_written: Callable[[int, SPath], None] | None = None,
+    dedup: Literal["exact", "perceptual"] | None = None,
+    dedup_threshold: int = 0,
+    func_except: FuncExceptT | None = None,
+) -> list[SPath]:
+    """
+    Render every frame of a clip and encode it as an image in a bounded thread pool.
+
+    Frames are rendered concurrently by VapourSynth, copied out as RGB24 NumPy arrays,
+    and handed to a pool of encoder threads. At most twice as many frames as there are workers
+    are kept in memory at once; rendering waits for the encoders when they fall behind.
+    The image format is picked per file from the suffix of its path.
+
+    Dependencies:
+
+        - Pillow (https://python-pillow.github.io/)
+
+    Args:
+        clip: Clip to render. Resampled to RGB24 if necessary.
+        paths: One output path per frame of ``clip``. Missing folders are created.
+        workers: Number of encoder threads. Default: The number of logical CPUs, capped at 8.
+        effort: Compression effort. Maps to ``compress_level`` (0–9) for PNG, ``method`` (0–6) for WebP,
+            and ``10 - speed`` (0–10) for AVIF. Ignored for other formats. Default: Encoder default.
+        quality: Lossy quality for JPEG, WebP, and AVIF. WebP is written losslessly when this is ``None``.
+            Default: Encoder default.
+        kernel: Kernel for resampling, if necessary. Default: Bilinear.
+        matrix: Color matrix of the input clip. Attempts to detect if ``None``.
+        callback: Called with every rendered frame before it is encoded, for example to collect frame props.
+        on_written: Called from the encoder threads with the frame number and path of every image
+            once it is written. Duplicate frames are reported with the path of their first occurrence,
+            once that is written.
+        dedup: Skip encoding frames that duplicate an earlier frame. ``"exact"`` only matches byte-identical
+            frames. ``"perceptual"`` compares 64-bit difference hashes of the luma, which also matches
+            near-identical frames, such as held frames with a little noise or dithering. Default: ``None``.
+        dedup_threshold: Maximum number of differing hash bits for ``"perceptual"`` deduplication. Default: 0.
+
+    Returns:
+        List of SPath objects pointing to the written images, in frame order.
+        Duplicate frames point to the image of their first occurrence.
+
+    Raises:
+        CustomValueError: The number of paths does not match the number of frames.
+        DependencyNotFoundError: Pillow is not installed.
+    """
+
+    func = func_except or write_images
+
+    if len(paths) != clip.num_frames:
+        raise CustomValueError(
+            "You must pass exactly one path per frame!", func, f"{len(paths)} != {clip.num_frames}"
+        )
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise DependencyNotFoundError(func, "pillow <https://python-pillow.github.io/>")
+
+    spaths = [SPath(path) for path in paths]
+
+    if not spaths:
+        return []
+
+    for folder in {path.get_folder() for path in spaths}:
+        folder.mkdir(parents=True, exist_ok=True)
+
+    if clip.format is None or clip.format.id != vs.RGB24:
+        clip = Kernel.ensure_obj(kernel, func).resample(
+            clip, vs.RGB24, matrix_in=Matrix.from_param_or_video(matrix, clip, False, func)
+        )
+
+    workers = max(workers or min(os.cpu_count() or 1, 8), 1)
+    in_flight = BoundedSemaphore(workers * 2)
+
+    deduplicator = _FrameDeduplicator(dedup, dedup_threshold, func) if dedup is not None else None
+    results = list(spaths)
+
+    # Duplicates are only reported as written once the image they point to is
+    written = set[int]()
+    waiting = dict[int, list[int]]()
+    written_lock = Lock()
+
+    def _encode(n: int, array: np.ndarray[Any, Any], path: SPath) -> None:
+        try:
+            Image.fromarray(array).save(path, **_encoder_params(path, effort, quality))
+        finally:
+            in_flight.release()
+
+        with written_lock:
+            written.add(n)
+            duplicates = waiting.pop(n, [])
+
+        if on_written is not None:
+            for m in (n, *duplicates):
+                on_written(m, path)
+
+    futures = list[Future[None]]()
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="lvsfunc_encoder") as pool:
+
+        def _queue(n: int, array: np.ndarray[Any, Any]) -> None:
+            if deduplicator is not None and (first := deduplicator.find(n, array, array.mean(axis=2))) is not None:
+                results[n] = spaths[first]
+
+                with written_lock:
+                    is_written = first in written
+
+                    if not is_written:
+                        waiting.setdefault(first, []).append(n)
+
+                if is_written and on_written is not None:
+                    on_written(n, spaths[first])
+
+                return
+
+            in_flight.acquire()
+            futures.append(pool.submit(_encode, n, array, spaths[n]))
+
+        # Deduplication has to see the frames in order, so the first occurrence is always the one that's kept
+        queue = _in_frame_order(_queue) if deduplicator is not None else _queue
+
+        def _submit(n: int, f: vs.VideoFrame) -> None:
+            if callback is not None:
+                callback(n, f)
+
+            queue(n, np.dstack([np.asarray(f[i]) for i in range(f.format.num_planes)]))
+
+        clip_async_render(clip, None, f"Encoding {len(spaths)} images...", _submit)
+
+        for future in futures:
+            future.result()
+
+    return results
+
+
+def _encoder_params(path: SPath, effort: int | None, quality: int | None) -> dict[str, Any]:
+    """Map the generic ``effort`` and ``quality`` settings to Pillow's per-format save parameters."""
+
+    params = dict[str, Any]()
+
+    match path.suffix.lower().lstrip("."):
+        case "png":
+            if effort is not None:
+                params["compress_level"] = max(0, min(effort, 9))
+        case "webp":
+            if effort is not None:
+                params["method"] = max(0, min(effort, 6))
+
+            if quality is None:
+                params["lossless"] = True
+            else:
+                params["quality"] = quality
+        case "avif":
+            if effort is not None:
+                params["speed"] = 10 - max(0, min(effort, 10))
+
+            if quality is not None:
+                params["quality"] = quality
+        case "jpg" | "jpeg":
+            if quality is not None:
+                params["quality"] = quality
 
-        return list(out_file.parent.glob("*.png"))
+    return params
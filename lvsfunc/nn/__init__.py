@@ -1,2 +1,4 @@
 from .func import *
+from .patches import *
+from .shards import *
 from .util import *
@@ -1,5 +1,6 @@
+import json
 import warnings
-from typing import Any
+from typing import Any, Literal
 
 import numpy as np
 from jetpytools import CustomValueError, FileWasNotFoundError, FuncExceptT, SPath, SPathLike
@@ -8,7 +9,9 @@ from vskernels import Kernel, KernelLike, Point
 from vstools import FunctionUtil, clip_async_render, core, vs
 
 from ..exceptions import NumpyArrayLoadError
-from .util import get_format_from_npy
+from ..util import _FrameDeduplicator, _in_frame_order
+from .shards import ShardReader
+from .util import _frame_to_npy, _prepare_npy_clip, get_format_from_npy
 
 __all__: list[str] = [
     "clip_to_npy",
@@ -16,12 +19,18 @@ __all__: list[str] = [
 ]
 
 
+_FRAME_MAP_NAME = "frame_map.json"
+"""Name of the file mapping frame numbers to the arrays they're stored as, written by deduplicated exports."""
+
+
 def clip_to_npy(
     src: vs.VideoNode,
     out_dir: SPathLike = "bin/",
     export_npz: bool = False,
     kernel: KernelLike = Point,
     func_except: FuncExceptT | None = None,
+    dedup: Literal["exact", "perceptual"] | None = None,
+    dedup_threshold: int = 0,
 ) -> list[SPath]:
     """
     Export frames from a VideoNode to numpy array files.
@@ -31,28 +40,35 @@ def clip_to_npy(
     Upsamples the clip to YUV444PS (or keeps GRAY) using the given kernel.
     Existing files are not overwritten; the next filename is incremented instead.
 
+    With ``dedup``, frames that duplicate an earlier frame are not exported again.
+    A ``frame_map.json`` in ``out_dir`` maps every frame number to the file (or ``.npz`` key) it is stored as,
+    so duplicates point to their first occurrence. :func:`npy_to_clip` reads it when loading ``out_dir``,
+    which restores the original length and timing. It only describes the latest deduplicated export,
+    so deduplicated exports should each get their own ``out_dir``.
+
     Args:
         src: The input video clip.
         out_dir: Directory for numpy arrays. Default: ``"bin/"``.
         export_npz: Export as a single ``.npz`` file. Default: ``False``.
         kernel: Resampling kernel when not YUV 4:4:4 or GRAY. Default: Point, which is
             lossless for integer up/downscaling.
+        dedup: Skip frames that duplicate an earlier frame. ``"exact"`` only matches identical arrays.
+            ``"perceptual"`` compares 64-bit difference hashes of the luma, which also matches near-identical frames.
+            Default: ``None``.
+        dedup_threshold: Maximum number of differing hash bits for ``"perceptual"`` deduplication. Default: 0.
 
     Returns:
         A list of paths to the exported numpy arrays, or a single path when ``export_npz`` is ``True``.
+        With ``dedup``, there is one path per frame in frame order, and duplicates point to the array
+        of their first occurrence.
 
     Note:
         Emits :class:`RuntimeWarning` when one or more frames fail to process.
     """
 
-    func = FunctionUtil(src, func_except or clip_to_npy, None, (vs.GRAY, vs.YUV), 32)
-
-    kernel = Kernel.ensure_obj(kernel, func.func)
+    func = func_except or clip_to_npy
 
-    proc_clip = (
-        kernel.resample(func.work_clip, vs.YUV444PS) if func.work_clip.format.color_family == vs.YUV else func.work_clip
-    )
-    proc_clip = norm_expr(proc_clip, "x 0.5 +", func.chroma_pplanes)
+    proc_clip = _prepare_npy_clip(src, Kernel.ensure_obj(kernel, func), func)
 
     out_dir = SPath(out_dir)
     out_dir.mkdir(511, True, True)
@@ -82,50 +98,77 @@ def clip_to_npy(
     exported_files = []
     frame_data_dict: dict[str, np.ndarray[Any, Any]] = {}
 
-    def _process_frame(n: int, frame: vs.VideoFrame) -> str | None:
+    deduplicator = _FrameDeduplicator(dedup, dedup_threshold, func) if dedup is not None else None
+    stored_as = dict[int, str]()
+    failed_frames = set[int]()
+
+    def _keep_frame(n: int, frame_data: np.ndarray[Any, Any] | None) -> None:
         nonlocal next_name
 
-        try:
-            cfamily = frame.format.color_family
+        if frame_data is None:
+            failed_frames.add(n)
+            return
 
-            frame_data = np.stack([np.asarray(frame[i]) for i in range(frame.format.num_planes)])
+        try:
+            luma = frame_data if frame_data.ndim == 2 else frame_data[0]
 
-            if cfamily == vs.GRAY:
-                frame_data = frame_data.squeeze(0)
+            if deduplicator is not None and (first := deduplicator.find(n, frame_data, luma)) is not None:
+                stored_as[n] = stored_as[first]
+                return
 
             filename = f"{next_name:06d}"
 
             if export_npz:
                 frame_data_dict[filename] = frame_data
+                stored_as[n] = filename
             else:
                 file_path = out_dir / f"{filename}.npy"
                 np.save(file_path, frame_data)
                 exported_files.append(file_path)
+                stored_as[n] = file_path.name
 
             next_name += 1
-            _update_progress()
-            return filename
 
+        except Exception as e:
+            print(f"Error saving frame {n}: {e}")
+            failed_frames.add(n)
+
+    # Deduplication has to see the frames in order, so the first occurrence is always the one that's kept
+    keep_frame = _in_frame_order(_keep_frame) if deduplicator is not None else _keep_frame
+
+    def _process_frame(n: int, frame: vs.VideoFrame) -> None:
+        frame_data = None
+
+        try:
+            frame_data = _frame_to_npy(frame)
         except Exception as e:
             print(f"Error processing frame {n}: {e}")
             print(f"Frame format: {frame.format}")
             print(f"Frame dimensions: {frame.width}x{frame.height}")
-            _update_progress()
 
-            return None
+        keep_frame(n, frame_data)
+        _update_progress()
 
-    proc_frames = clip_async_render(proc_clip, callback=_process_frame)
+    clip_async_render(proc_clip, callback=_process_frame)
 
     if pbar:
         pbar.close()
 
-    if failed_frames := [f for f in proc_frames if f is None]:
+    if failed_frames:
         warnings.warn(
             f"clip_to_npy: {len(failed_frames)} frames failed to process.",
             RuntimeWarning,
         )
 
+    if deduplicator is not None:
+        (out_dir / _FRAME_MAP_NAME).write_text(
+            json.dumps({"frames": {str(n): name for n, name in sorted(stored_as.items())}}, indent=4)
+        )
+
     if not export_npz:
+        if deduplicator is not None:
+            return [out_dir / name for _, name in sorted(stored_as.items())]
+
         return exported_files
 
     npz_path = out_dir / "frames.npz"
@@ -143,12 +186,17 @@ def npy_to_clip(
     """
     Load frames from numpy files (``.npy`` or ``.npz``) into a VapourSynth clip.
 
-    Assumes pairing with :func:`clip_to_npy`.
+    Assumes pairing with :func:`clip_to_npy`, or with :func:`clip_to_shards` exporting to ``npy``.
 
     Uses ``ModifyFrame`` so frames are read on demand rather than kept entirely in memory.
 
+    If the directory (or the directory of ``frames.npz``) holds the ``frame_map.json`` of a deduplicated
+    :func:`clip_to_npy` export, every frame is loaded from the array it was mapped to,
+    so duplicate frames are restored and the clip has its original length.
+
     Args:
-        file_paths: Directory of ``.npy`` files, a single ``.npz`` file, or a list of ``.npy`` paths.
+        file_paths: Directory of ``.npy`` files, a single ``.npz`` file, a list of ``.npy`` paths,
+            or a shard directory or its ``index.json``.
         ref: Optional reference clip for output format.
         kernel: Resampling kernel when ``ref`` is passed. Default: Point, which is lossless for
             integer up/downscaling.
@@ -168,11 +216,26 @@ def npy_to_clip(
     else:
         paths = [SPath(x) for x in file_paths]
     is_npz = False
+    shards: ShardReader | None = None
+    frame_map: list[str] | None = None
 
     if not paths:
         raise FileWasNotFoundError("No files provided!", func)
 
-    if paths[0].is_dir():
+    if paths[0].name == "index.json" or (paths[0] / "index.json").exists():
+        shards = ShardReader(paths[0], func)
+
+        if shards.format != "npy":
+            raise CustomValueError("Only shards exported to 'npy' can be loaded!", func, shards.format)
+    elif paths[0].is_dir() and (paths[0] / _FRAME_MAP_NAME).exists():
+        frame_map = _load_frame_map(paths[0] / _FRAME_MAP_NAME, func)
+
+        if all(name.endswith(".npy") for name in frame_map):
+            paths = [paths[0] / name for name in frame_map]
+        else:
+            paths = [paths[0] / "frames.npz"]
+            is_npz = True
+    elif paths[0].is_dir():
         if npy_files := list(paths[0].glob("*.npy")):
             paths = npy_files
         elif npz_files := list(paths[0].glob("*.npz")):
@@ -183,7 +246,11 @@ def npy_to_clip(
     elif paths[0].suffix == ".npz":
         is_npz = True
 
-    if not is_npz:
+        if paths[0].name == "frames.npz" and (paths[0].parent / _FRAME_MAP_NAME).exists():
+            frame_map = _load_frame_map(paths[0].parent / _FRAME_MAP_NAME, func)
+
+    # The frame map is already in frame order, and may point to the same file more than once
+    if not is_npz and shards is None and frame_map is None:
         try:
             paths = sorted(paths, key=lambda x: int(x.stem) if x.stem.isdigit() else float("inf"))
         except ValueError as e:
@@ -198,10 +265,12 @@ def npy_to_clip(
         except Exception as e:
             raise CustomValueError(f"Error sorting paths! {e!s}", func)
 
-    if is_npz:
+    if shards is not None:
+        first_frame = shards[0]
+    elif is_npz:
         npz_data = np.load(paths[0])
-        first_key = next(iter(npz_data.keys()))
-        first_frame = npz_data[first_key]
+        npz_keys = frame_map if frame_map is not None else list(npz_data.keys())
+        first_frame = npz_data[npz_keys[0]]
     else:
         first_frame = np.load(paths[0])
 
@@ -218,11 +287,14 @@ def npy_to_clip(
 
     fmt = get_format_from_npy(first_frame)
 
-    clip_length = len(npz_data.keys()) if is_npz else len(paths)
+    clip_length = len(shards) if shards is not None else len(npz_keys) if is_npz else len(paths)
     blank_clip = core.std.BlankClip(None, width, height, fmt, length=clip_length, keep=True)
 
     def _read_frame(n: int, f: vs.VideoFrame) -> vs.VideoFrame:
-        loaded_frame = npz_data[list(npz_data.keys())[n]] if is_npz else np.load(paths[n])
+        if shards is not None:
+            loaded_frame = shards[n]
+        else:
+            loaded_frame = npz_data[npz_keys[n]] if is_npz else np.load(paths[n])
 
         fout = f.copy()
 
@@ -261,3 +333,18 @@ def npy_to_clip(
         out = kernel.resample(out, ref)
 
     return out
+
+
+def _load_frame_map(path: SPath, func: FuncExceptT) -> list[str]:
+    """Read the files or ``.npz`` keys of every frame, in frame order, from a frame map."""
+
+    try:
+        frames = json.loads(path.read_text())["frames"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise CustomValueError(f"Invalid frame map! {e!s}", func, path)
+
+    if not frames:
+        raise FileWasNotFoundError("The frame map is empty!", func, path)
+
+    # Frames that failed to export have no entry, and are skipped the same way as without deduplication
+    return [frames[n] for n in sorted(frames, key=int)]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, Literal
+
+import numpy as np
+from jetpytools import CustomValueError, DependencyNotFoundError, FuncExceptT, SPath, SPathLike
+from vskernels import Bilinear, Kernel, KernelLike, Point
+from vstools import Matrix, MatrixLike, clip_async_render, core, get_prop, vs
+
+from .util import _frame_to_npy, _prepare_npy_clip
+
+__all__: list[str] = [
+    "export_patches",
+]
+
+
+def export_patches(
+    clips: Sequence[vs.VideoNode] | dict[str, vs.VideoNode],
+    out_dir: SPathLike = "bin/patches/",
+    patch_size: int | tuple[int, int] = 128,
+    per_frame: int = 8,
+    content: Literal["variance", "edges"] | None = None,
+    content_threshold: float = 0.0,
+    max_tries: int = 10,
+    fmt: str = "npy",
+    seed: int | None = None,
+    kernel: KernelLike | None = None,
+    matrix: MatrixLike | None = None,
+    func_except: FuncExceptT | None = None,
+) -> dict[str, list[SPath]]:
+    """
+    Export random patches from one or more aligned clips.
+
+    Training a model on small crops doesn't need full frames on disk.
+    This picks ``per_frame`` random patch positions for every frame,
+    and writes the exact same crop from every clip, so LQ/HQ patch pairs stay aligned.
+    All clips are rendered together in a single pass.
+
+    An optional content filter rejects flat patches, measured on the luma of the first clip:
+
+        - ``"variance"``: The variance of the patch, between 0 and 0.25.
+        - ``"edges"``: The average absolute difference between neighboring pixels, between 0 and 2.
+
+    Patch positions are drawn from a generator seeded with ``seed`` and the frame number,
+    so the same seed always produces the same patches, regardless of the order frames are rendered in.
+
+    Patches are written to ``{out_dir}/{name}/{frame:06d}_{patch:02d}.{fmt}``.
+    ``npy`` patches use the same layout as :func:`clip_to_npy`. Any other format is written as an RGB24 image.
+
+    Example usage:
+
+    .. code-block:: python
+
+        from lvsfunc import export_patches, get_paired_frames
+
+        hq_frames, lq_frames = get_paired_frames([hq, lq], interval=240)
+
+        export_patches({"hq": hq_frames, "lq": lq_frames}, "dataset/", content="edges", content_threshold=0.02)
+
+    Dependencies:
+
+        - Pillow (https://python-pillow.github.io/) (only for image formats)
+
+    Args:
+        clips: Aligned clips to export patches from. If given a dict, the keys are used as folder names.
+            Otherwise the ``Name`` prop of each clip is used, falling back to ``"clip{index}"``.
+            All clips must have the same dimensions and length.
+        out_dir: Directory to write the patches to. Default: ``"bin/patches/"``.
+        patch_size: Size of the patches, as a single int or a ``(width, height)`` tuple. Default: 128.
+        per_frame: Number of patches per frame. Default: 8.
+        content: Content filter to reject flat patches with. Default: ``None`` (disabled).
+        content_threshold: Minimum content score for a patch to be kept. Default: 0.
+        max_tries: Number of random positions tried per requested patch.
+            Frames where too few positions pass the content filter get fewer patches. Default: 10.
+        fmt: ``"npy"``, or an image format Pillow can write, such as ``"png"``. Default: ``"npy"``.
+        seed: Seed for the patch positions. Default: ``None``.
+        kernel: Kernel for resampling. Default: Point for ``npy``, which is lossless for integer up/downscaling,
+            and Bilinear for images.
+        matrix: Color matrix of the input clips, for image formats. Attempts to detect if ``None``.
+
+    Returns:
+        The paths to the patches of every clip, keyed by name, in the same order for every clip.
+
+    Raises:
+        CustomValueError: No clips were passed, the clips don't match, two clips would be written to the same folder,
+            or a size or count is invalid.
+        DependencyNotFoundError: An image format was requested and Pillow is not installed.
+    """
+
+    func = func_except or export_patches
+
+    if not clips:
+        raise CustomValueError("You must pass at least one clip!", func)
+
+    if isinstance(clips, dict):
+        names = list(clips.keys())
+        clip_list = list(clips.values())
+    else:
+        clip_list = list(clips)
+        names = [get_prop(c, "Name", str, default=f"clip{i}", func=func) for i, c in enumerate(clip_list, 1)]
+
+    if len({(c.width, c.height, c.num_frames) for c in clip_list}) > 1:
+        raise CustomValueError("All clips must have the same dimensions and length!", func)
+
+    patch_w, patch_h = (patch_size, patch_size) if isinstance(patch_size, int) else patch_size
+    width, height = clip_list[0].width, clip_list[0].height
+
+    if not (0 < patch_w <= width and 0 < patch_h <= height):
+        raise CustomValueError("The patch size must be positive and fit inside the clips!", func, patch_size)
+
+    if per_frame <= 0 or max_tries <= 0:
+        raise CustomValueError("'per_frame' and 'max_tries' must be greater than 0!", func)
+
+    fmt = fmt.lower().lstrip(".")
+    is_np = fmt == "npy"
+
+    if is_np:
+        prepared = [_prepare_npy_clip(c, Kernel.ensure_obj(kernel or Point, func), func) for c in clip_list]
+    else:
+        try:
+            from PIL import Image
+        except ImportError:
+            raise DependencyNotFoundError(func, "pillow <https://python-pillow.github.io/>")
+
+        from ..export import _encoder_params
+
+        scaler = Kernel.ensure_obj(kernel or Bilinear, func)
+
+        prepared = [
+            c
+            if c.format is not None and c.format.id == vs.RGB24
+            else scaler.resample(c, vs.RGB24, matrix_in=Matrix.from_param_or_video(matrix, c, False, func))
+            for c in clip_list
+        ]
+
+        params = _encoder_params(SPath(f"patch.{fmt}"), None, None)
+
+    if len({c.format.id for c in prepared}) > 1:
+        raise CustomValueError("All clips must be of the same color family!", func)
+
+    folders = [SPath(out_dir) / "".join(c if c.isalnum() or c in " -_." else "_" for c in name) for name in names]
+
+    # Compared case-insensitively, since that's how most filesystems on Windows and macOS compare them
+    if len({folder.name.casefold() for folder in folders}) != len(folders):
+        raise CustomValueError(
+            "Every clip must have a unique name, which must stay unique after sanitizing it for a folder name!",
+            func,
+            names,
+        )
+
+    for folder in folders:
+        folder.mkdir(parents=True, exist_ok=True)
+
+    def _extract(n: int, f: vs.VideoFrame) -> list[list[SPath]]:
+        if is_np:
+            stacked = _frame_to_npy(f)
+            frames = [stacked[..., i * height : (i + 1) * height, :] for i in range(len(prepared))]
+            luma = frames[0] if frames[0].ndim == 2 else frames[0][0]
+        else:
+            stacked = np.dstack([np.asarray(f[i]) for i in range(f.format.num_planes)])
+            frames = [stacked[i * height : (i + 1) * height] for i in range(len(prepared))]
+            luma = frames[0].mean(axis=2) / 255
+
+        rng = np.random.default_rng(None if seed is None else [seed, n])
+
+        positions = list[tuple[int, int]]()
+
+        for _ in range(per_frame * max_tries):
+            y = int(rng.integers(0, height - patch_h + 1))
+            x = int(rng.integers(0, width - patch_w + 1))
+
+            patch = luma[y : y + patch_h, x : x + patch_w]
+
+            if content is not None and _content_score(patch, content) < content_threshold:
+                continue
+
+            positions.append((y, x))
+
+            if len(positions) >= per_frame:
+                break
+
+        paths = [list[SPath]() for _ in prepared]
+
+        for i, (y, x) in enumerate(positions):
+            for frame, folder, clip_paths in zip(frames, folders, paths):
+                path = folder / f"{n:06d}_{i:02d}.{fmt}"
+
+                if is_np:
+                    np.save(path, np.ascontiguousarray(frame[..., y : y + patch_h, x : x + patch_w]))
+                else:
+                    Image.fromarray(np.ascontiguousarray(frame[y : y + patch_h, x : x + patch_w])).save(path, **params)
+
+                clip_paths.append(path)
+
+        return paths
+
+    results = clip_async_render(
+        core.std.StackVertical(prepared),
+        None,
+        f"Extracting patches from {len(prepared)} clips...",
+        _extract,
+    )
+
+    return {name: [path for paths in results for path in paths[i]] for i, name in enumerate(names)}
+
+
+def _content_score(patch: np.ndarray[Any, Any], content: Literal["variance", "edges"]) -> float:
+    """Measure how much detail a luma patch has."""
+
+    if content == "variance":
+        return float(patch.var())
+
+    return float(np.abs(np.diff(patch, axis=0)).mean() + np.abs(np.diff(patch, axis=1)).mean())
@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from collections.abc import Iterator
+from threading import Lock
+from types import TracebackType
+from typing import IO, Any
+
+import numpy as np
+from jetpytools import (
+    CustomIndexError,
+    CustomValueError,
+    DependencyNotFoundError,
+    FileWasNotFoundError,
+    FuncExceptT,
+    SPath,
+    SPathLike,
+)
+from vskernels import Bilinear, Kernel, KernelLike, Point
+from vstools import Matrix, MatrixLike, clip_async_render, vs
+
+from .util import _frame_to_npy, _prepare_npy_clip
+
+__all__: list[str] = [
+    "ShardReader",
+    "clip_to_shards",
+]
+
+
+_INDEX_NAME = "index.json"
+"""Name of the index file written next to the shards."""
+
+
+def clip_to_shards(
+    clip: vs.VideoNode,
+    out_dir: SPathLike = "bin/shards/",
+    fmt: str = "npy",
+    max_frames: int = 1000,
+    max_mb: float = 1024,
+    prefix: str = "shard",
+    effort: int | None = None,
+    quality: int | None = None,
+    kernel: KernelLike | None = None,
+    matrix: MatrixLike | None = None,
+    func_except: FuncExceptT | None = None,
+) -> SPath:
+    """
+    Export all frames of a clip into sharded tar archives.
+
+    Writing hundreds of thousands of individual files is slow on most filesystems.
+    This streams every frame into a sequence of uncompressed tar shards instead,
+    starting a new shard whenever ``max_frames`` or ``max_mb`` would be exceeded.
+    Every frame is stored as ``{frame:08d}.{fmt}``, the same layout WebDataset uses,
+    so the shards can also be read by other tools.
+
+    Frames are encoded concurrently while rendering, and written to the shards in frame order.
+    An ``index.json`` next to the shards records the format, the dimensions,
+    and the shard, offset, and size of every frame, for random access with :class:`ShardReader`.
+
+    ``npy`` shards hold the same arrays as :func:`clip_to_npy` and can be loaded with :func:`npy_to_clip`.
+    Any other format is encoded as an RGB24 image with Pillow.
+
+    Example usage:
+
+    .. code-block:: python
+
+        from lvsfunc import ShardReader, clip_to_shards
+
+        index = clip_to_shards(get_random_frames(src), "dataset/hq/", fmt="png", max_frames=5000)
+
+        for frame in ShardReader(index):
+            ...
+
+    Dependencies:
+
+        - Pillow (https://python-pillow.github.io/) (only for image formats)
+
+    Args:
+        clip: The input clip to export.
+        out_dir: Directory to write the shards and index to. Default: ``"bin/shards/"``.
+        fmt: ``"npy"``, or an image format Pillow can write, such as ``"png"`` or ``"webp"``. Default: ``"npy"``.
+        max_frames: Maximum number of frames per shard. Default: 1000.
+        max_mb: Maximum size of a shard in megabytes. A single frame larger than this gets its own shard.
+            Default: 1024.
+        prefix: File name prefix of the shards. Default: ``"shard"``.
+        effort: Compression effort for image formats. See :func:`lvsfunc.write_images`.
+            Default: Encoder default.
+        quality: Lossy quality for image formats. See :func:`lvsfunc.write_images`. Default: Encoder default.
+        kernel: Kernel for resampling. Default: Point for ``npy``, which is lossless for integer up/downscaling,
+            and Bilinear for images.
+        matrix: Color matrix of the input clip, for image formats. Attempts to detect if ``None``.
+
+    Returns:
+        Path to the written index file.
+
+    Raises:
+        CustomValueError: ``max_frames`` or ``max_mb`` is not positive.
+        DependencyNotFoundError: An image format was requested and Pillow is not installed.
+    """
+
+    func = func_except or clip_to_shards
+
+    if max_frames <= 0 or max_mb <= 0:
+        raise CustomValueError("'max_frames' and 'max_mb' must be greater than 0!", func)
+
+    fmt = fmt.lower().lstrip(".")
+
+    encode: Any
+
+    if fmt == "npy":
+        clip = _prepare_npy_clip(clip, Kernel.ensure_obj(kernel or Point, func), func)
+
+        def encode(f: vs.VideoFrame) -> bytes:
+            buffer = io.BytesIO()
+            np.save(buffer, _frame_to_npy(f))
+
+            return buffer.getvalue()
+    else:
+        try:
+            from PIL import Image
+        except ImportError:
+            raise DependencyNotFoundError(func, "pillow <https://python-pillow.github.io/>")
+
+        from ..export import _encoder_params
+
+        if clip.format is None or clip.format.id != vs.RGB24:
+            clip = Kernel.ensure_obj(kernel or Bilinear, func).resample(
+                clip, vs.RGB24, matrix_in=Matrix.from_param_or_video(matrix, clip, False, func)
+            )
+
+        params = _encoder_params(SPath(f"frame.{fmt}"), effort, quality)
+        pil_format = Image.registered_extensions().get(f".{fmt}", fmt.upper())
+
+        def encode(f: vs.VideoFrame) -> bytes:
+            buffer = io.BytesIO()
+            array = np.dstack([np.asarray(f[i]) for i in range(f.format.num_planes)])
+            Image.fromarray(array).save(buffer, pil_format, **params)
+
+            return buffer.getvalue()
+
+    out_dir = SPath(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    writer = _OrderedShardWriter(out_dir, prefix, fmt, max_frames, int(max_mb * 1024**2))
+
+    index_path = out_dir / _INDEX_NAME
+
+    try:
+        clip_async_render(
+            clip, None, f"Writing {clip.num_frames} frames to shards...", lambda n, f: writer.write(n, encode(f))
+        )
+    finally:
+        writer.close()
+
+        # Also written when interrupted, so every frame that made it into a shard stays readable
+        index_path.write_text(
+            json.dumps(
+                {
+                    "format": fmt,
+                    "width": clip.width,
+                    "height": clip.height,
+                    "shards": writer.shards,
+                    "frames": writer.frames,
+                }
+            )
+        )
+
+    return index_path
+
+
+class _OrderedShardWriter:
+    """Append encoded frames to tar shards in frame order, buffering only the frames that arrive ahead of it."""
+
+    def __init__(self, out_dir: SPath, prefix: str, ext: str, max_frames: int, max_bytes: int) -> None:
+        self._out_dir = out_dir
+        self._prefix = prefix
+        self._ext = ext
+        self._max_frames = max_frames
+        self._max_bytes = max_bytes
+
+        self.shards = list[str]()
+        """Names of the written shards."""
+
+        self.frames = list[tuple[int, int, int]]()
+        """``(shard, offset, size)`` of every written frame, in frame order."""
+
+        self._tar: tarfile.TarFile | None = None
+        self._count = 0
+
+        self._pending = dict[int, bytes]()
+        self._next = 0
+        self._lock = Lock()
+
+    def write(self, n: int, data: bytes) -> None:
+        with self._lock:
+            self._pending[n] = data
+
+            while self._next in self._pending:
+                self._append(self._next, self._pending.pop(self._next))
+                self._next += 1
+
+    def _append(self, n: int, data: bytes) -> None:
+        size = len(data)
+        padded = -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+
+        tar = self._tar
+
+        # A shard always gets at least one frame, even if that frame alone is larger than the limit
+        if tar is None or (
+            self._count >= self._max_frames or (self._count and self._closed_size(tar, padded) > self._max_bytes)
+        ):
+            tar = self._open_shard()
+
+        info = tarfile.TarInfo(f"{n:08d}.{self._ext}")
+        info.size = size
+
+        tar.addfile(info, io.BytesIO(data))
+        self._count += 1
+
+        # The data is the last thing written, padded to the next 512-byte block
+        self.frames.append((len(self.shards) - 1, tar.offset - padded, size))
+
+    @staticmethod
+    def _closed_size(tar: tarfile.TarFile, padded: int) -> int:
+        """Size of the shard once closed, if a member with ``padded`` bytes of data were added to it."""
+
+        # Header and data, then the two end-of-archive blocks, then padding to a whole record written on close
+        end = tar.offset + tarfile.BLOCKSIZE + padded + 2 * tarfile.BLOCKSIZE
+
+        return -(-end // tarfile.RECORDSIZE) * tarfile.RECORDSIZE
+
+    def _open_shard(self) -> tarfile.TarFile:
+        if self._tar is not None:
+            self._tar.close()
+
+        name = f"{self._prefix}-{len(self.shards):06d}.tar"
+
+        self._tar = tarfile.open(self._out_dir / name, "w", format=tarfile.USTAR_FORMAT)
+        self._count = 0
+
+        self.shards.append(name)
+
+        return self._tar
+
+    def close(self) -> None:
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+
+class ShardReader:
+    """Read frames from shards written by :func:`clip_to_shards`."""
+
+    format: str
+    """Format the frames are stored in, such as ``"npy"`` or ``"png"``."""
+
+    width: int
+    """Width of the stored frames."""
+
+    height: int
+    """Height of the stored frames."""
+
+    shards: list[SPath]
+    """Paths to the shards, in order."""
+
+    def __init__(self, path: SPathLike, func_except: FuncExceptT | None = None) -> None:
+        """
+        Open a sharded export for reading.
+
+        Iterating over the reader streams every shard from start to end, so a training loop
+        reads the whole dataset sequentially at disk bandwidth. Indexing the reader
+        seeks straight to a single frame using the index, which is what :func:`npy_to_clip` uses.
+
+        Decoded frames are NumPy arrays: ``(planes, height, width)`` or ``(height, width)`` for ``npy``,
+        and ``(height, width, 3)`` RGB for image formats. Use :meth:`read_bytes` to get the encoded data instead.
+
+        Args:
+            path: The shard directory, or the path to its ``index.json``.
+
+        Raises:
+            FileWasNotFoundError: No index file was found.
+        """
+
+        self._func_except = func_except or self.__class__.__name__
+
+        index_path = SPath(path)
+
+        if index_path.is_dir():
+            index_path = index_path / _INDEX_NAME
+
+        if not index_path.exists():
+            raise FileWasNotFoundError("No shard index found!", self._func_except, index_path)
+
+        index = json.loads(index_path.read_text())
+
+        self.format = index["format"]
+        self.width = index["width"]
+        self.height = index["height"]
+        self.shards = [index_path.parent / name for name in index["shards"]]
+
+        self._frames = [(shard, offset, size) for shard, offset, size in index["frames"]]
+        self._files = dict[int, IO[bytes]]()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, n: int) -> np.ndarray[Any, Any]:
+        return self.decode(self.read_bytes(n))
+
+    def __iter__(self) -> Iterator[np.ndarray[Any, Any]]:
+        for shard in self.shards:
+            with tarfile.open(shard, "r|") as tar:
+                for member in tar:
+                    if (file := tar.extractfile(member)) is not None:
+                        yield self.decode(file.read())
+
+    def __enter__(self) -> ShardReader:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def read_bytes(self, n: int) -> bytes:
+        """
+        Read the encoded data of a single frame.
+
+        Args:
+            n: Frame number.
+
+        Returns:
+            The encoded frame, as stored in the shard.
+
+        Raises:
+            CustomIndexError: The frame number is out of range.
+        """
+
+        if not 0 <= n < len(self._frames):
+            raise CustomIndexError("Frame number out of range!", self.read_bytes, f"0 <= {n} < {len(self._frames)}")
+
+        shard, offset, size = self._frames[n]
+
+        with self._lock:
+            if (file := self._files.get(shard)) is None:
+                file = self._files[shard] = self.shards[shard].open("rb")
+
+            file.seek(offset)
+
+            return file.read(size)
+
+    def decode(self, data: bytes) -> np.ndarray[Any, Any]:
+        """
+        Decode the data of a single frame.
+
+        Args:
+            data: Encoded frame, as returned by :meth:`read_bytes`.
+
+        Returns:
+            The decoded frame.
+
+        Raises:
+            DependencyNotFoundError: The frames are images and Pillow is not installed.
+        """
+
+        if self.format == "npy":
+            return np.load(io.BytesIO(data), allow_pickle=False)
+
+        try:
+            from PIL import Image
+        except ImportError:
+            raise DependencyNotFoundError(self._func_except, "pillow <https://python-pillow.github.io/>")
+
+        with Image.open(io.BytesIO(data)) as image:
+            return np.asarray(image.convert("RGB"))
+
+    def close(self) -> None:
+        """Close every open shard."""
+
+        with self._lock:
+            for file in self._files.values():
+                file.close()
+
+            self._files.clear()
@@ -2,7 +2,9 @@ from typing import Any
 
 import numpy as np
 from jetpytools import FuncExceptT
-from vstools import UnsupportedVideoFormatError, core, depth, get_video_format, vs
+from vsexprtools import norm_expr
+from vskernels import Kernel
+from vstools import FunctionUtil, UnsupportedVideoFormatError, core, depth, get_video_format, vs
 
 from ..exceptions import NumpyArrayLoadError
 
@@ -55,3 +57,28 @@ def get_format_from_npy(frame_data: np.ndarray[Any, Any], func_except: FuncExcep
         return get_video_format(depth(core.std.BlankClip(format=subsampling, keep=True), bit_depth))
     except AttributeError:
         raise UnsupportedVideoFormatError(f"Unsupported format: {subsampling=} {bit_depth=}", func)  # type: ignore
+
+
+def _prepare_npy_clip(src: vs.VideoNode, kernel: Kernel, func: FuncExceptT) -> vs.VideoNode:
+    """Upsample to YUV444PS (or keep GRAY) and shift chroma to 0-1, the layout the numpy exports use."""
+
+    func_util = FunctionUtil(src, func, None, (vs.GRAY, vs.YUV), 32)
+
+    proc_clip = (
+        kernel.resample(func_util.work_clip, vs.YUV444PS)
+        if func_util.work_clip.format.color_family == vs.YUV
+        else func_util.work_clip
+    )
+
+    return norm_expr(proc_clip, "x 0.5 +", func_util.chroma_pplanes)
+
+
+def _frame_to_npy(frame: vs.VideoFrame) -> np.ndarray[Any, Any]:
+    """Copy a frame into a ``(planes, height, width)`` array, or ``(height, width)`` for GRAY."""
+
+    frame_data = np.stack([np.asarray(frame[i]) for i in range(frame.format.num_planes)])
+
+    if frame.format.color_family == vs.GRAY:
+        frame_data = frame_data.squeeze(0)
+
+    return frame_data
@@ -1,18 +1,51 @@
+from __future__ import annotations
+
+import math
 import random
-from collections.abc import Callable
+import warnings
+from collections.abc import Callable, Sequence
 from typing import Any
 
-from jetpytools import CustomRuntimeError, CustomValueError
-from vstools import core, depth, get_prop, limiter, vs
+import numpy as np
+from jetpytools import CustomRuntimeError, CustomValueError, FuncExceptT, SPath, SPathLike
+from vskernels import Bilinear, Kernel, KernelLike
+from vstools import (
+    Keyframes,
+    Matrix,
+    clip_async_render,
+    core,
+    depth,
+    get_prop,
+    get_w,
+    limiter,
+    merge_clip_props,
+    plane,
+    vs,
+)
+
+from .util import clip_fingerprint
 
 __all__: list[str] = [
+    "FrameStats",
+    "get_diff_frame_nums",
+    "get_diverse_frame_nums",
+    "get_diverse_frames",
+    "get_frame_stats",
+    "get_paired_frame_nums",
+    "get_paired_frames",
     "get_random_frame_nums",
     "get_random_frames",
+    "get_scene_frame_nums",
+    "get_scene_frames",
     "get_smart_random_frame_nums",
     "get_smart_random_frames",
 ]
 
 
+_SHARPNESS_HEIGHT = 72
+"""Height the luma is scaled to before measuring sharpness, so every sampler measures it the same way."""
+
+
 def get_random_frame_nums(clip: vs.VideoNode, interval: int = 120, seed: int | None = None) -> list[int]:
     """
     Get a list of random frame numbers from a clip.
@@ -30,11 +63,10 @@ def get_random_frame_nums(clip: vs.VideoNode, interval: int = 120, seed: int | N
         A list of random frame numbers.
     """
 
-    if seed is not None:
-        random.seed(seed)
+    rng = random.Random(seed)
 
     return [
-        random.randint(i * interval, min((i + 1) * interval - 1, clip.num_frames - 1))
+        rng.randint(i * interval, min((i + 1) * interval - 1, clip.num_frames - 1))
         for i in range((clip.num_frames + interval - 1) // interval)
     ]
 
@@ -67,6 +99,9 @@ def get_smart_random_frame_nums(
     similarity_threshold: float = 0.02,
     strict: bool = False,
     seed: int | None = None,
+    stats: FrameStats | None = None,
+    sharpness_threshold: float = 0.0,
+    fade_threshold: float = 0.0,
 ) -> list[int]:
     """
     Get smart random frame numbers from a clip.
@@ -80,8 +115,27 @@ def get_smart_random_frame_nums(
 
         1. Avoids frames that are solid colors (determined by ``solid_threshold``).
         2. Avoids frames too similar to the previous frame (determined by ``similarity_threshold``).
-        3. Attempts to select a frame from each chunk.
-        4. If a suitable frame isn't found in a chunk after ``max_retries``, moves to the next.
+        3. Optionally avoids blurry frames (determined by ``sharpness_threshold``).
+        4. Optionally avoids frames in the middle of a fade (determined by ``fade_threshold``).
+        5. Attempts to select a frame from each chunk.
+        6. If a suitable frame isn't found in a chunk after ``max_retries``, moves to the next.
+
+    Sharpness is the average luma edge strength of a frame, measured with a Sobel filter
+    on the luma scaled down to 72 lines. The same measurement is stored by :func:`get_frame_stats`,
+    so a ``sharpness_threshold`` means the same with and without ``stats``.
+    Motion-blurred and out-of-focus frames have noticeably weaker edges than sharp frames of the same scene.
+    A frame is considered to be part of a fade if the average luma keeps rising or falling
+    by at least ``fade_threshold`` per frame across its previous and next frame.
+    Both are measured in the same pass as the other criteria.
+
+    Candidates are evaluated in batches rather than one at a time.
+    The first candidate of every chunk is rendered in a single concurrent pass,
+    and the retries of all chunks that still need one are evaluated together in the following passes.
+
+    If ``stats`` from :func:`get_frame_stats` are given, nothing is rendered at all.
+    Every measured frame in a chunk is considered at once instead of ``max_retries`` random candidates,
+    and the similarity to the previous frame is measured on the stored thumbnails.
+    This makes re-sampling with a different seed or thresholds essentially free.
 
     All values provided are assumed to be 8-bit values.
 
@@ -98,12 +152,20 @@ def get_smart_random_frame_nums(
         similarity_threshold: Maximum allowed frame similarity. Default: ``0.02``.
         strict: Whether to raise an error if a suitable frame cannot be found. Default: ``False``.
         seed: Seed for the random number generator. Default: ``None``.
+        stats: Precomputed frame statistics of ``clip`` to select from without rendering. Default: ``None``.
+        sharpness_threshold: Minimum average edge strength, between 0 and 255. Frames with weaker edges are
+            rejected as blurry. Values around 2-6 work for most live action and animation sources.
+            Default: 0 (disabled).
+        fade_threshold: Minimum change of the average luma per frame, between 0 and 255,
+            for a frame to be rejected as part of a fade. Values around 1-2 work for most sources.
+            Default: 0 (disabled).
 
     Returns:
         A list of intelligently selected random frame numbers from the input clip.
 
     Raises:
-        CustomValueError: ``interval`` is not positive, or ``max_retries`` is negative.
+        CustomValueError: ``interval`` is not positive, ``max_retries`` is negative,
+            or ``stats`` were measured on a different clip.
         CustomRuntimeError: ``strict`` is ``True`` and no suitable frame was found.
     """
 
@@ -118,9 +180,58 @@ def get_smart_random_frame_nums(
 
     solid_threshold = max(0, min(solid_threshold, 255))
     similarity_threshold = max(0, min(similarity_threshold, 1))
+    sharpness_threshold = max(0, min(sharpness_threshold, 255))
+    fade_threshold = max(0, min(fade_threshold, 255))
+
+    rng = random.Random(seed)
+
+    if stats is not None:
+        return _select_from_stats(
+            clip,
+            stats,
+            interval,
+            solid_threshold,
+            similarity_threshold,
+            sharpness_threshold,
+            fade_threshold,
+            strict,
+            rng,
+        )
+
+    return _select_batched(
+        [clip],
+        interval,
+        max_retries,
+        solid_threshold,
+        similarity_threshold,
+        sharpness_threshold,
+        fade_threshold,
+        strict,
+        rng,
+    )
 
-    if seed is not None:
-        random.seed(seed)
+
+def _select_batched(
+    clips: list[vs.VideoNode],
+    interval: int,
+    max_retries: int,
+    solid_threshold: float,
+    similarity_threshold: float,
+    sharpness_threshold: float,
+    fade_threshold: float,
+    strict: bool,
+    rng: random.Random,
+    alignment_threshold: float = 1.0,
+    height: int = 180,
+    kernel: KernelLike = Bilinear,
+    func: FuncExceptT = get_smart_random_frame_nums,
+) -> list[int]:
+    """
+    Select one frame per interval by evaluating candidates in batches.
+
+    Every criterion is checked in every clip. The similarity to the previous pick is measured on the first clip,
+    and every other clip is checked for alignment against the first one.
+    """
 
     def _check_solid_color(frame: vs.VideoNode) -> tuple[bool, int]:
         min_value = get_prop(frame, "PlaneStatsMin", int)
@@ -136,64 +247,179 @@ def get_smart_random_frame_nums(
 
         return diff_value <= similarity_threshold, diff_value
 
-    def _select_smart_frame(start: int, end: int, prev_frame: vs.VideoNode | None) -> int:
-        segment_length = end - start + 1
-        actual_retries = min(max_retries, segment_length)
-        tried_frames = set()
+    clips = [depth(c, 8) for c in clips]
+    clip = clips[0].std.PlaneStats()
 
-        for _ in range(actual_retries):
-            frame_num = random.randint(start, end)
+    scaler = Kernel.ensure_obj(kernel, func)
+    width = get_w(height, clip, mod=1)
 
-            while frame_num in tried_frames:
-                frame_num = random.randint(start, end)
+    num_intervals = (clip.num_frames + interval - 1) // interval
 
-            tried_frames.add(frame_num)
+    bounds = [
+        (start, min(start + interval - 1, clip.num_frames - 1))
+        for start in range(0, num_intervals * interval, interval)
+        if start < clip.num_frames
+    ]
 
-            frame = clip[frame_num]
+    # Every interval gets its own list of distinct candidates up front, tried in order
+    candidates = [rng.sample(range(start, end + 1), min(max_retries, end - start + 1)) for start, end in bounds]
+    positions = [0] * len(bounds)
+    picks: list[int | None] = [None] * len(bounds)
+    rejected = dict[int, str]()
 
-            is_solid, _ = _check_solid_color(frame)
-            is_valid_frame = not is_solid
-            is_similar_to_prev, _ = (False, 0.0) if prev_frame is None else _check_frame_similarity(prev_frame, frame)
+    while None in picks:
+        for i, (start, end) in enumerate(bounds):
+            if picks[i] is not None or positions[i] < len(candidates[i]):
+                continue
 
-            if is_valid_frame and not is_similar_to_prev:
-                return frame_num
+            prev_pick = None if not i else picks[i - 1]
 
-        if strict:
-            _raise_strict_error(
-                start,
-                end,
-                actual_retries,
-                tried_frames,
-                prev_frame,
-                clip,
-                _check_solid_color,
-                _check_frame_similarity,
-            )
+            if i and prev_pick is None:
+                continue
 
-        # If we couldn't find a suitable frame after max_retries, just return a random frame number
-        return random.randint(start, end)
+            if strict:
+                _raise_strict_error(
+                    start,
+                    end,
+                    len(candidates[i]),
+                    set(candidates[i]),
+                    None if prev_pick is None else limiter(clip[prev_pick], func=func),
+                    clip,
+                    _check_solid_color,
+                    _check_frame_similarity,
+                    rejected,
+                    func,
+                )
 
-    clip = depth(clip, 8).std.PlaneStats()
+            # If we couldn't find a suitable frame after max_retries, just return a random frame number
+            picks[i] = rng.randint(start, end)
 
-    frame_nums = []
+        # Candidates are compared to the previous interval's pick, or to its current candidate if it has none yet
+        batch = list[tuple[int, int, int | None]]()
 
-    num_intervals = (clip.num_frames + interval - 1) // interval
+        for i in range(len(bounds)):
+            if picks[i] is not None or positions[i] >= len(candidates[i]):
+                continue
 
-    prev_frame = None
+            prev = None if not i else picks[i - 1]
 
-    for interval_index in range(num_intervals):
-        interval_start = interval_index * interval
-        interval_end = min(interval_start + interval - 1, clip.num_frames - 1)
+            if i and prev is None:
+                if positions[i - 1] >= len(candidates[i - 1]):
+                    continue
 
-        if interval_start > interval_end:
+                prev = candidates[i - 1][positions[i - 1]]
+
+            batch.append((i, candidates[i][positions[i]], prev))
+
+        if not batch:
             continue
 
-        frame_num = _select_smart_frame(interval_start, interval_end, prev_frame)
-        frame_nums.append(frame_num)
+        props_clips = list[vs.VideoNode]()
 
-        prev_frame = limiter(clip[frame_num], func=get_smart_random_frame_nums)
+        def _small(src: vs.VideoNode) -> vs.VideoNode:
+            # Alignment is checked on downscaled luma, so clips of different resolutions can be compared
+            return scaler.scale(depth(plane(core.std.Splice([src[c] for _, c, _ in batch]), 0), 32), width, height)
+
+        ref_small = _small(clips[0]) if len(clips) > 1 else None
+
+        for k, src in enumerate(clips):
+            cand_clip = core.std.Splice([src[c] for _, c, _ in batch])
+
+            props_clips += [core.std.PlaneStats(cand_clip, prop=f"Smart{k}")]
+
+            if sharpness_threshold:
+                sharp_clip = scaler.scale(plane(cand_clip, 0), get_w(_SHARPNESS_HEIGHT, src, mod=1), _SHARPNESS_HEIGHT)
+                props_clips += [core.std.PlaneStats(core.std.Sobel(sharp_clip), prop=f"Smart{k}Sharp")]
+
+            if fade_threshold:
+                props_clips += [
+                    core.std.PlaneStats(
+                        core.std.Splice([src[min(max(c + offset, 0), src.num_frames - 1)] for _, c, _ in batch]),
+                        prop=f"Smart{k}{prop}",
+                    )
+                    for offset, prop in ((-1, "Prev"), (1, "Next"))
+                ]
+
+            if ref_small is not None and k:
+                props_clips += [core.std.PlaneStats(ref_small, _small(src), prop=f"Smart{k}Align")]
+
+        cand_clip = core.std.Splice([clips[0][c] for _, c, _ in batch])
+        prev_clip = core.std.Splice([clips[0][c if p is None else p] for _, c, p in batch])
+
+        props_clips += [core.std.PlaneStats(cand_clip, limiter(prev_clip, func=func), prop="SmartSim")]
+
+        def _evaluate(n: int, f: vs.VideoFrame) -> tuple[int, float, str | None]:
+            value_range = min(
+                get_prop(f, f"Smart{k}Max", int) - get_prop(f, f"Smart{k}Min", int) for k in range(len(clips))
+            )
+
+            for k in range(len(clips)):
+                issue = _frame_quality_issue(f, f"Smart{k}", sharpness_threshold, fade_threshold)
+
+                if issue is None and k:
+                    alignment = get_prop(f, f"Smart{k}AlignDiff", (float, int), default=0.0)
+
+                    if alignment > alignment_threshold:
+                        issue = f"Misaligned (diff: {alignment:.3f})"
+
+                if issue is not None:
+                    return value_range, 0.0, issue if len(clips) == 1 else f"{issue} in clip {k}"
+
+            return value_range, get_prop(f, "SmartSimDiff", (float, int), default=0), None
+
+        results = clip_async_render(
+            merge_clip_props(*props_clips), None, f"Evaluating {len(batch)} candidate frames...", _evaluate
+        )
+
+        for (i, cand, prev), (value_range, diff, issue) in zip(batch, results):
+            if value_range <= solid_threshold:
+                positions[i] += 1
+                continue
+
+            if issue is not None:
+                rejected[cand] = issue
+                positions[i] += 1
+                continue
+
+            if prev != (None if not i else picks[i - 1]):
+                # The previous interval picked a different frame, so the similarity check is stale
+                continue
+
+            if prev is None or diff > similarity_threshold:
+                picks[i] = cand
+            else:
+                positions[i] += 1
+
+    return [pick for pick in picks if pick is not None]
 
-    return frame_nums
+
+def _frame_quality_issue(
+    f: vs.VideoFrame, prefix: str, sharpness_threshold: float, fade_threshold: float
+) -> str | None:
+    """Check a candidate frame for blur and fades, returning why it was rejected, if it was."""
+
+    if sharpness_threshold:
+        sharpness = get_prop(f, f"{prefix}SharpAverage", (float, int), default=1.0) * 255
+
+        if sharpness < sharpness_threshold:
+            return f"Blurry (edge strength: {sharpness:.2f})"
+
+    if fade_threshold:
+        prev_mean, mean, next_mean = (
+            get_prop(f, f"{prefix}{suffix}Average", (float, int), default=0.0) * 255
+            for suffix in ("Prev", "", "Next")
+        )
+
+        if _is_fading(mean - prev_mean, next_mean - mean, fade_threshold):
+            return f"Fading (luma slope: {(next_mean - prev_mean) / 2:.2f})"
+
+    return None
+
+
+def _is_fading(before: Any, after: Any, threshold: float) -> Any:
+    """Whether the average luma keeps rising or falling by at least ``threshold`` per frame. Works on arrays too."""
+
+    return (before * after > 0) & (np.minimum(abs(before), abs(after)) >= threshold)
 
 
 def _raise_strict_error(
@@ -205,7 +431,11 @@ def _raise_strict_error(
     clip: vs.VideoNode,
     is_solid_color: Callable[[vs.VideoNode], tuple[bool, int]],
     frames_too_similar: Callable[[vs.VideoNode, vs.VideoNode], tuple[bool, float]],
+    rejected: dict[int, str] | None = None,
+    func: FuncExceptT = get_smart_random_frame_nums,
 ) -> None:
+    rejected = rejected or {}
+
     attempts = []
     for frame_num in tried_frames:
         frame = clip[frame_num]
@@ -219,7 +449,8 @@ def _raise_strict_error(
                 "similarity_value": similarity_value,
                 "is_solid": is_solid,
                 "is_similar": is_similar,
-                "status": "Failed" if is_solid or is_similar else "Succeeded",
+                "issue": rejected.get(frame_num),
+                "status": "Failed" if is_solid or is_similar or frame_num in rejected else "Succeeded",
             }
         )
 
@@ -228,11 +459,12 @@ def _raise_strict_error(
             f"Frame {a['frame_num']}: "
             f"{'Solid' if a['is_solid'] else 'Not solid'} (color diff: {a['solid_value']}), "
             f"{'Similar' if a['is_similar'] else 'Not similar'} (prev frame diff: {a['similarity_value']:.2f})"
+            + (f", {a['issue']}" if a["issue"] else "")
         )
 
     raise CustomRuntimeError(
         f"Could not find a suitable frame after {actual_retries} retries in the interval {start}-{end}!",
-        get_smart_random_frame_nums,
+        func,
         reason="\nReason:\n\nAttempts:\n" + "\n".join(f"  - {format_attempt(a)}" for a in attempts) + "\n\n",
     )
 
@@ -245,6 +477,9 @@ def get_smart_random_frames(
     similarity_threshold: float = 0.02,
     strict: bool = False,
     seed: int | None = None,
+    stats: FrameStats | None = None,
+    sharpness_threshold: float = 0.0,
+    fade_threshold: float = 0.0,
 ) -> vs.VideoNode:
     """
     Get smart random frames from a clip spliced together into a new clip.
@@ -260,17 +495,801 @@ def get_smart_random_frames(
         similarity_threshold: Threshold for determining if frames are too similar. Default: ``0.02``.
         strict: Whether to raise an error if a suitable frame cannot be found. Default: ``False``.
         seed: Seed for the random number generator. Default: ``None``.
+        stats: Precomputed frame statistics of ``clip``. See :func:`get_smart_random_frame_nums`.
+            Default: ``None``.
+        sharpness_threshold: Minimum average edge strength of a frame. Default: 0 (disabled).
+        fade_threshold: Minimum average luma change per frame to reject a frame as part of a fade.
+            Default: 0 (disabled).
 
     Returns:
         A clip with intelligently selected random frames from the input clip.
 
     Raises:
-        CustomValueError: ``interval`` is not positive, or ``max_retries`` is negative.
+        CustomValueError: ``interval`` is not positive, ``max_retries`` is negative,
+            or ``stats`` were measured on a different clip.
         CustomRuntimeError: ``strict`` is ``True`` and no suitable frame was found.
     """
 
     frame_nums = get_smart_random_frame_nums(
-        clip, interval, max_retries, solid_threshold, similarity_threshold, strict, seed
+        clip,
+        interval,
+        max_retries,
+        solid_threshold,
+        similarity_threshold,
+        strict,
+        seed,
+        stats,
+        sharpness_threshold,
+        fade_threshold,
+    )
+
+    return core.std.Splice([clip[num] for num in frame_nums])
+
+
+def get_paired_frame_nums(
+    clips: Sequence[vs.VideoNode],
+    interval: int = 120,
+    max_retries: int = 10,
+    solid_threshold: int = 2,
+    similarity_threshold: float = 0.02,
+    alignment_threshold: float = 0.05,
+    strict: bool = False,
+    seed: int | None = None,
+    sharpness_threshold: float = 0.0,
+    fade_threshold: float = 0.0,
+    height: int = 180,
+    kernel: KernelLike = Bilinear,
+) -> list[int]:
+    """
+    Get smart random frame numbers that are suitable in every one of several aligned clips.
+
+    This is meant for paired datasets, such as an HQ clip and one or more degraded LQ versions of it,
+    where the exact same frames have to be exported from every clip.
+    It uses the same criteria as :func:`get_smart_random_frame_nums`, but a frame is only picked
+    if it passes them in every clip. The similarity to the previously picked frame is measured on the first clip.
+
+    Every other clip is also compared to the first clip on the candidate frame itself,
+    after scaling both down to ``height``. Candidates that differ by more than ``alignment_threshold``
+    are rejected, so frames where the clips are out of sync don't end up in the dataset.
+
+    All clips are evaluated together in the same concurrent passes, so every candidate is requested only once.
+
+    Args:
+        clips: Clips to get the frame numbers from. The first clip is used as the reference.
+            The clips may differ in resolution and format.
+        interval: The amount of frames for each chunk. Default: 120 frames.
+        max_retries: Maximum number of retries before picking a random frame. Default: 10.
+        solid_threshold: Threshold for determining if a frame is a solid color. Default: 2.
+        similarity_threshold: Maximum allowed frame similarity. Default: ``0.02``.
+        alignment_threshold: Maximum allowed normalized luma difference between a clip and the first clip.
+            Default: ``0.05``.
+        strict: Whether to raise an error if a suitable frame cannot be found. Default: ``False``.
+        seed: Seed for the random number generator. Default: ``None``.
+        sharpness_threshold: Minimum average edge strength of a frame. Default: 0 (disabled).
+        fade_threshold: Minimum average luma change per frame to reject a frame as part of a fade.
+            Default: 0 (disabled).
+        height: Height to check the alignment at. Default: 180.
+        kernel: Kernel used to scale down the clips for the alignment check. Default: Bilinear.
+
+    Returns:
+        A list of frame numbers suitable in every clip.
+
+    Raises:
+        CustomValueError: No clips were passed, or ``interval``, ``max_retries``, or ``height`` is invalid.
+        CustomRuntimeError: ``strict`` is ``True`` and no suitable frame was found.
+    """
+
+    func = get_paired_frame_nums
+
+    if not clips:
+        raise CustomValueError("You must pass at least one clip!", func)
+
+    if interval <= 0 or height <= 0:
+        raise CustomValueError("'interval' and 'height' must be greater than 0!", func)
+
+    if max_retries < 0:
+        raise CustomValueError("'max_retries' must be greater than or equal to 0!", func)
+
+    num_frames = min(clip.num_frames for clip in clips)
+
+    if any(clip.num_frames != num_frames for clip in clips):
+        warnings.warn(
+            f"{func.__name__}: 'The number of frames of the clips don't match! "
+            f"({[clip.num_frames for clip in clips]})\n"
+            f"Only the first {num_frames} frames will be sampled, but your clips may be synced incorrectly!'"
+        )
+
+    return _select_batched(
+        [clip[:num_frames] for clip in clips],
+        interval,
+        max_retries,
+        max(0, min(solid_threshold, 255)),
+        max(0, min(similarity_threshold, 1)),
+        max(0, min(sharpness_threshold, 255)),
+        max(0, min(fade_threshold, 255)),
+        strict,
+        random.Random(seed),
+        max(0, min(alignment_threshold, 1)),
+        height,
+        kernel,
+        func,
+    )
+
+
+def get_paired_frames(
+    clips: Sequence[vs.VideoNode],
+    interval: int = 120,
+    max_retries: int = 10,
+    solid_threshold: int = 2,
+    similarity_threshold: float = 0.02,
+    alignment_threshold: float = 0.05,
+    strict: bool = False,
+    seed: int | None = None,
+    sharpness_threshold: float = 0.0,
+    fade_threshold: float = 0.0,
+    height: int = 180,
+    kernel: KernelLike = Bilinear,
+) -> list[vs.VideoNode]:
+    """
+    Get the same smart random frames from several aligned clips.
+
+    It uses the same criteria as :func:`get_paired_frame_nums` to select frames.
+
+    Example usage:
+
+    .. code-block:: python
+
+        from lvsfunc import get_paired_frames
+
+        hq_frames, lq_frames = get_paired_frames([hq, lq], interval=240, sharpness_threshold=4)
+
+    Args:
+        clips: Clips to get the frames from. The first clip is used as the reference.
+        interval: The amount of frames for each chunk. Default: 120 frames.
+        max_retries: Maximum number of retries before picking a random frame. Default: 10.
+        solid_threshold: Threshold for determining if a frame is a solid color. Default: 2.
+        similarity_threshold: Maximum allowed frame similarity. Default: ``0.02``.
+        alignment_threshold: Maximum allowed normalized luma difference between a clip and the first clip.
+            Default: ``0.05``.
+        strict: Whether to raise an error if a suitable frame cannot be found. Default: ``False``.
+        seed: Seed for the random number generator. Default: ``None``.
+        sharpness_threshold: Minimum average edge strength of a frame. Default: 0 (disabled).
+        fade_threshold: Minimum average luma change per frame to reject a frame as part of a fade.
+            Default: 0 (disabled).
+        height: Height to check the alignment at. Default: 180.
+        kernel: Kernel used to scale down the clips for the alignment check. Default: Bilinear.
+
+    Returns:
+        One clip per input clip, each holding the same selected frames.
+
+    Raises:
+        CustomValueError: No clips were passed, or ``interval``, ``max_retries``, or ``height`` is invalid.
+        CustomRuntimeError: ``strict`` is ``True`` and no suitable frame was found.
+    """
+
+    frame_nums = get_paired_frame_nums(
+        clips,
+        interval,
+        max_retries,
+        solid_threshold,
+        similarity_threshold,
+        alignment_threshold,
+        strict,
+        seed,
+        sharpness_threshold,
+        fade_threshold,
+        height,
+        kernel,
+    )
+
+    return [core.std.Splice([clip[num] for num in frame_nums]) for clip in clips]
+
+
+def get_diff_frame_nums(
+    clip_a: vs.VideoNode,
+    clip_b: vs.VideoNode,
+    amount: int = 10,
+    stride: int = 1,
+    min_spacing: int = 240,
+    height: int = 180,
+    kernel: KernelLike = Bilinear,
+) -> list[int]:
+    """
+    Get the frame numbers where two clips differ the most.
+
+    Both clips are scaled down to ``height`` and the normalized luma difference is measured on
+    every ``stride``-th frame in a single render, so the cost of the metric pass stays bounded.
+    Frames are then picked from most to least different, skipping any frame closer than
+    ``min_spacing`` frames to an already picked one, so the picks spread out over the clip
+    instead of clustering in a single scene.
+
+    Args:
+        clip_a: First clip.
+        clip_b: Second clip. Must be as long as ``clip_a``; extra frames are ignored.
+        amount: Number of frames to pick. Default: 10.
+        stride: Only measure every ``stride``-th frame. Default: 1.
+        min_spacing: Minimum distance in frames between picked frames. Default: 240.
+        height: Height to measure the difference at. Default: 180.
+        kernel: Kernel used to scale down the clips. Default: Bilinear.
+
+    Returns:
+        A sorted list of at most ``amount`` frame numbers.
+
+    Raises:
+        CustomValueError: ``amount``, ``stride``, or ``height`` is not positive, or ``min_spacing`` is negative.
+    """
+
+    func = get_diff_frame_nums
+
+    if amount <= 0 or stride <= 0 or height <= 0:
+        raise CustomValueError("'amount', 'stride', and 'height' must be greater than 0!", func)
+
+    if min_spacing < 0:
+        raise CustomValueError("'min_spacing' must be greater than or equal to 0!", func)
+
+    num_frames = min(clip_a.num_frames, clip_b.num_frames)
+
+    scaler = Kernel.ensure_obj(kernel, func)
+    width = get_w(height, clip_a, mod=1)
+
+    luma_a, luma_b = (
+        scaler.scale(depth(plane(clip[:num_frames:stride], 0), 32), width, height) for clip in (clip_a, clip_b)
+    )
+
+    diffs = clip_async_render(
+        core.std.PlaneStats(luma_a, luma_b),
+        None,
+        "Measuring frame differences...",
+        lambda n, f: get_prop(f, "PlaneStatsDiff", (float, int), default=0.0),
+    )
+
+    picked = list[int]()
+
+    for index in sorted(range(len(diffs)), key=lambda i: diffs[i], reverse=True):
+        frame = index * stride
+
+        if all(abs(frame - other) >= min_spacing for other in picked):
+            picked.append(frame)
+
+        if len(picked) >= amount:
+            break
+
+    return sorted(picked)
+
+
+class FrameStats:
+    """Downscaled per-frame luma statistics of a clip, for selecting frames without rendering them again."""
+
+    frames: np.ndarray[Any, Any]
+    """Frame numbers the statistics were measured on."""
+
+    luma_min: np.ndarray[Any, Any]
+    """Minimum 8-bit luma value of every measured frame."""
+
+    luma_max: np.ndarray[Any, Any]
+    """Maximum 8-bit luma value of every measured frame."""
+
+    luma_mean: np.ndarray[Any, Any]
+    """Average 8-bit luma value of every measured frame."""
+
+    neighbor_diff: np.ndarray[Any, Any]
+    """Normalized luma difference between every measured frame and the frame right before it."""
+
+    thumbs: np.ndarray[Any, Any]
+    """Tiny 8-bit luma thumbnail of every measured frame, as a ``(frames, height, width)`` array."""
+
+    sharpness: np.ndarray[Any, Any]
+    """Average 8-bit luma edge strength of every measured frame. ``NaN`` where it was not measured."""
+
+    def __init__(
+        self,
+        frames: np.ndarray[Any, Any],
+        luma_min: np.ndarray[Any, Any],
+        luma_max: np.ndarray[Any, Any],
+        luma_mean: np.ndarray[Any, Any],
+        neighbor_diff: np.ndarray[Any, Any],
+        thumbs: np.ndarray[Any, Any],
+        fingerprint: str = "",
+        sharpness: np.ndarray[Any, Any] | None = None,
+    ) -> None:
+        self.frames = frames
+        self.luma_min = luma_min
+        self.luma_max = luma_max
+        self.luma_mean = luma_mean
+        self.neighbor_diff = neighbor_diff
+        self.thumbs = thumbs
+        self.fingerprint = fingerprint
+        self.sharpness = np.full(len(frames), np.nan, np.float32) if sharpness is None else sharpness
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def thumb_diff(self, index: int, indices: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+        """
+        Get the normalized difference between the thumbnail at ``index`` and the thumbnails at ``indices``.
+
+        This approximates ``PlaneStatsDiff`` between the full frames.
+        """
+
+        diff = np.abs(self.thumbs[indices].astype(np.int16) - self.thumbs[index].astype(np.int16))
+
+        return diff.mean(axis=(1, 2)) / 255
+
+    def fading(self, threshold: float) -> np.ndarray[Any, Any]:
+        """
+        Get which measured frames are in the middle of a fade.
+
+        The average luma of a fading frame keeps rising or falling by at least ``threshold`` per frame
+        between its previous and its next measured frame.
+        """
+
+        fading = np.zeros(len(self), bool)
+
+        if len(self) >= 3:
+            slopes = np.diff(self.luma_mean.astype(np.float64)) / np.diff(self.frames)
+            fading[1:-1] = _is_fading(slopes[:-1], slopes[1:], threshold)
+
+        return fading
+
+    def save(self, path: SPathLike) -> SPath:
+        """
+        Save the statistics to an NPZ file.
+
+        Args:
+            path: File path to write.
+
+        Returns:
+            The written file path.
+        """
+
+        spath = SPath(path)
+        spath.get_folder().mkdir(parents=True, exist_ok=True)
+
+        with spath.open("wb") as file:
+            np.savez_compressed(
+                file,
+                frames=self.frames,
+                luma_min=self.luma_min,
+                luma_max=self.luma_max,
+                luma_mean=self.luma_mean,
+                neighbor_diff=self.neighbor_diff,
+                thumbs=self.thumbs,
+                fingerprint=np.array(self.fingerprint),
+                sharpness=self.sharpness,
+            )
+
+        return spath
+
+    @classmethod
+    def load(cls, path: SPathLike) -> FrameStats:
+        """
+        Load statistics saved with :meth:`save`.
+
+        Args:
+            path: File path to read.
+
+        Returns:
+            The loaded statistics.
+        """
+
+        with np.load(SPath(path)) as data:
+            return cls(
+                data["frames"],
+                data["luma_min"],
+                data["luma_max"],
+                data["luma_mean"],
+                data["neighbor_diff"],
+                data["thumbs"],
+                str(data["fingerprint"]),
+                data["sharpness"] if "sharpness" in data else None,
+            )
+
+
+def get_frame_stats(
+    clip: vs.VideoNode,
+    stride: int = 1,
+    height: int = 72,
+    thumb_size: tuple[int, int] = (16, 9),
+    cache_dir: SPathLike | None = None,
+    kernel: KernelLike = Bilinear,
+) -> FrameStats:
+    """
+    Measure downscaled luma statistics of every ``stride``-th frame of a clip in a single streaming pass.
+
+    The luma is scaled down to ``height`` to measure the minimum, maximum, average,
+    and the difference to the previous frame, and further down to ``thumb_size`` to store a tiny thumbnail.
+    The edge strength is always measured at 72 lines, the same as :func:`get_smart_random_frame_nums` does,
+    so its ``sharpness_threshold`` means the same with and without stats.
+    Every value is written straight into preallocated NumPy arrays while rendering.
+
+    The results can be passed to :func:`get_smart_random_frame_nums` and the other samplers
+    as many times as needed without rendering the clip again.
+
+    Args:
+        clip: Clip to measure.
+        stride: Only measure every ``stride``-th frame. Default: 1.
+        height: Height to measure the statistics at. Default: 72.
+        thumb_size: ``(width, height)`` of the stored thumbnails. Default: ``(16, 9)``.
+        cache_dir: Directory to cache the statistics in, keyed by :py:func:`lvsfunc.clip_fingerprint`,
+            ``stride``, and ``height``. Cached statistics are loaded instead of rendering the clip.
+            Default: ``None`` (no cache).
+        kernel: Kernel used to scale down the clip. Default: Bilinear.
+
+    Returns:
+        The measured statistics.
+
+    Raises:
+        CustomValueError: ``stride`` or ``height`` is not positive, or ``thumb_size`` is invalid.
+    """
+
+    func = get_frame_stats
+
+    if stride <= 0 or height <= 0:
+        raise CustomValueError("'stride' and 'height' must be greater than 0!", func)
+
+    if min(thumb_size) <= 0:
+        raise CustomValueError("'thumb_size' must be positive!", func, thumb_size)
+
+    fingerprint = clip_fingerprint(clip)
+
+    cache_path = None
+
+    if cache_dir is not None:
+        cache_path = SPath(cache_dir) / f"{fingerprint}_{stride}_{height}_{thumb_size[0]}x{thumb_size[1]}.npz"
+
+        if cache_path.exists():
+            return FrameStats.load(cache_path)
+
+    scaler = Kernel.ensure_obj(kernel, func)
+    width = get_w(height, clip, mod=1)
+
+    luma = depth(plane(clip, 0), 8)
+    prev = luma[0] + luma[:-1] if clip.num_frames > 1 else luma
+
+    small, small_prev = (scaler.scale(c[::stride], width, height) for c in (luma, prev))
+
+    sharp = (
+        small
+        if height == _SHARPNESS_HEIGHT
+        else scaler.scale(luma[::stride], get_w(_SHARPNESS_HEIGHT, clip, mod=1), _SHARPNESS_HEIGHT)
+    )
+
+    thumbs_clip = merge_clip_props(
+        scaler.scale(small, *thumb_size),
+        core.std.PlaneStats(small, small_prev),
+        core.std.PlaneStats(core.std.Sobel(sharp), prop="FrameStatsSharp"),
+    )
+
+    num_frames = thumbs_clip.num_frames
+
+    luma_min, luma_max, luma_mean, neighbor_diff, sharpness = (np.zeros(num_frames, np.float32) for _ in range(5))
+    thumbs = np.zeros((num_frames, thumb_size[1], thumb_size[0]), np.uint8)
+
+    def _measure(n: int, f: vs.VideoFrame) -> None:
+        luma_min[n] = get_prop(f, "PlaneStatsMin", (int, float))
+        luma_max[n] = get_prop(f, "PlaneStatsMax", (int, float))
+        luma_mean[n] = get_prop(f, "PlaneStatsAverage", (int, float)) * 255
+        neighbor_diff[n] = get_prop(f, "PlaneStatsDiff", (int, float), default=0)
+        sharpness[n] = get_prop(f, "FrameStatsSharpAverage", (int, float), default=math.nan) * 255
+        thumbs[n] = np.asarray(f[0])
+
+    clip_async_render(thumbs_clip, None, f"Measuring {num_frames} frames...", _measure)
+
+    stats = FrameStats(
+        np.arange(0, clip.num_frames, stride, dtype=np.int64),
+        luma_min,
+        luma_max,
+        luma_mean,
+        neighbor_diff,
+        thumbs,
+        fingerprint,
+        sharpness,
+    )
+
+    if cache_path is not None:
+        stats.save(cache_path)
+
+    return stats
+
+
+def _select_from_stats(
+    clip: vs.VideoNode,
+    stats: FrameStats,
+    interval: int,
+    solid_threshold: int,
+    similarity_threshold: float,
+    sharpness_threshold: float,
+    fade_threshold: float,
+    strict: bool,
+    rng: random.Random,
+) -> list[int]:
+    """Vectorized version of the smart frame selection, working on precomputed statistics only."""
+
+    # Stats built by hand have no fingerprint, so they can only be checked against the length of the clip
+    if (len(stats) and int(stats.frames[-1]) >= clip.num_frames) or (
+        stats.fingerprint and stats.fingerprint != clip_fingerprint(clip)
+    ):
+        raise CustomValueError(
+            "The given stats do not belong to this clip!", get_smart_random_frame_nums, stats.fingerprint
+        )
+
+    usable = (stats.luma_max - stats.luma_min) > solid_threshold
+
+    if sharpness_threshold:
+        # Frames without a measured sharpness are never rejected as blurry
+        usable &= ~(stats.sharpness < sharpness_threshold)
+
+    if fade_threshold:
+        usable &= ~stats.fading(fade_threshold)
+
+    frame_nums = list[int]()
+    prev_index: int | None = None
+
+    for start in range(0, clip.num_frames, interval):
+        end = min(start + interval - 1, clip.num_frames - 1)
+
+        lo, hi = np.searchsorted(stats.frames, [start, end + 1])
+        indices = np.arange(lo, hi)
+
+        indices = indices[usable[indices]]
+
+        if prev_index is not None and indices.size:
+            indices = indices[stats.thumb_diff(prev_index, indices) > similarity_threshold]
+
+        if indices.size:
+            prev_index = rng.choice(indices.tolist())
+            frame_nums.append(int(stats.frames[prev_index]))
+            continue
+
+        if strict:
+            raise CustomRuntimeError(
+                f"Could not find a suitable frame in the interval {start}-{end}!",
+                get_smart_random_frame_nums,
+                reason=(
+                    f"{hi - lo} measured frames were all solid, blurry, fading, or too similar to the previous frame"
+                ),
+            )
+
+        frame_num = rng.randint(start, end)
+        frame_nums.append(frame_num)
+
+        if len(stats):
+            prev_index = min(int(np.searchsorted(stats.frames, frame_num)), len(stats) - 1)
+
+    return frame_nums
+
+
+def get_diverse_frame_nums(
+    clip: vs.VideoNode,
+    amount: int,
+    stride: int = 24,
+    thumb_size: tuple[int, int] = (32, 18),
+    bins: int = 8,
+    solid_threshold: int = 2,
+    seed: int | None = None,
+    kernel: KernelLike = Bilinear,
+) -> list[int]:
+    """
+    Get frame numbers that are as different from each other as possible, for example for training sets.
+
+    Every ``stride``-th frame is scaled down to a tiny RGB thumbnail in a single render.
+    Each frame is described by a feature vector made of its luma thumbnail and a per-channel color histogram.
+    Frames are then picked by farthest-point (k-center) selection:
+    every next frame is the one furthest away from all frames picked so far.
+    This spreads the picks over all the different kinds of shots in a clip,
+    instead of drawing mostly from whatever shot type is most common.
+
+    Solid color frames are never picked.
+
+    Args:
+        clip: Clip to get the frame numbers from.
+        amount: Number of frames to pick.
+        stride: Only consider every ``stride``-th frame. Default: 24.
+        thumb_size: ``(width, height)`` of the thumbnails the features are computed from. Default: ``(32, 18)``.
+        bins: Number of histogram bins per color channel. Default: 8.
+        solid_threshold: Threshold for determining if a frame is a solid color, in 8-bit values. Default: 2.
+        seed: Seed for picking the first frame. If ``None``, the first frame is the one furthest from the average.
+            Default: ``None``.
+        kernel: Kernel used to scale down the clip. Default: Bilinear.
+
+    Returns:
+        A sorted list of at most ``amount`` frame numbers.
+
+    Raises:
+        CustomValueError: ``amount``, ``stride``, or ``bins`` is not positive, or ``thumb_size`` is invalid.
+    """
+
+    func = get_diverse_frame_nums
+
+    if amount <= 0 or stride <= 0 or bins <= 0:
+        raise CustomValueError("'amount', 'stride', and 'bins' must be greater than 0!", func)
+
+    if min(thumb_size) <= 0:
+        raise CustomValueError("'thumb_size' must be positive!", func, thumb_size)
+
+    scaler = Kernel.ensure_obj(kernel, func)
+
+    candidates = clip[::stride]
+
+    thumbs = scaler.resample(
+        scaler.scale(candidates, *thumb_size),
+        vs.RGB24,
+        matrix_in=Matrix.from_param_or_video(None, candidates, False, func),
     )
 
+    luma_weights = np.array([0.299, 0.587, 0.114], np.float32)
+
+    features = np.zeros((thumbs.num_frames, thumb_size[0] * thumb_size[1] + 3 * bins), np.float32)
+    solid = np.zeros(thumbs.num_frames, bool)
+
+    def _describe(n: int, f: vs.VideoFrame) -> None:
+        rgb = np.dstack([np.asarray(f[i]) for i in range(3)]).astype(np.float32)
+        luma = rgb @ luma_weights
+
+        hist = [np.histogram(rgb[..., i], bins, (0, 256))[0] for i in range(3)]
+
+        features[n, : luma.size] = luma.ravel() / 255
+        features[n, luma.size :] = np.concatenate(hist) / luma.size
+        solid[n] = luma.max() - luma.min() <= solid_threshold
+
+    clip_async_render(thumbs, None, f"Describing {thumbs.num_frames} frames...", _describe)
+
+    valid = np.flatnonzero(~solid)
+
+    if not valid.size:
+        return []
+
+    picks = _farthest_points(features[valid], min(amount, valid.size), seed)
+
+    return sorted(int(valid[i]) * stride for i in picks)
+
+
+def get_diverse_frames(
+    clip: vs.VideoNode,
+    amount: int,
+    stride: int = 24,
+    thumb_size: tuple[int, int] = (32, 18),
+    bins: int = 8,
+    solid_threshold: int = 2,
+    seed: int | None = None,
+    kernel: KernelLike = Bilinear,
+) -> vs.VideoNode:
+    """
+    Get frames that are as different from each other as possible spliced together into a new clip.
+
+    It uses the same criteria as :func:`get_diverse_frame_nums` to select frames.
+
+    Args:
+        clip: Clip to get the frames from.
+        amount: Number of frames to pick.
+        stride: Only consider every ``stride``-th frame. Default: 24.
+        thumb_size: ``(width, height)`` of the thumbnails the features are computed from. Default: ``(32, 18)``.
+        bins: Number of histogram bins per color channel. Default: 8.
+        solid_threshold: Threshold for determining if a frame is a solid color, in 8-bit values. Default: 2.
+        seed: Seed for picking the first frame. Default: ``None``.
+        kernel: Kernel used to scale down the clip. Default: Bilinear.
+
+    Returns:
+        A clip with the selected frames from the input clip.
+
+    Raises:
+        CustomValueError: ``amount``, ``stride``, or ``bins`` is not positive, or ``thumb_size`` is invalid.
+        CustomRuntimeError: Every considered frame is a solid color.
+    """
+
+    frame_nums = get_diverse_frame_nums(clip, amount, stride, thumb_size, bins, solid_threshold, seed, kernel)
+
+    if not frame_nums:
+        raise CustomRuntimeError("Every considered frame is a solid color!", get_diverse_frames)
+
     return core.std.Splice([clip[num] for num in frame_nums])
+
+
+def _farthest_points(features: np.ndarray[Any, Any], amount: int, seed: int | None) -> list[int]:
+    """Greedy k-center selection: repeatedly pick the row furthest from every row picked so far."""
+
+    if seed is None:
+        first = int(np.argmax(np.linalg.norm(features - features.mean(axis=0), axis=1)))
+    else:
+        first = random.Random(seed).randrange(len(features))
+
+    picks = [first]
+    distances = np.linalg.norm(features - features[first], axis=1)
+
+    while len(picks) < amount:
+        nxt = int(np.argmax(distances))
+
+        if distances[nxt] <= 0:
+            break
+
+        picks.append(nxt)
+        distances = np.minimum(distances, np.linalg.norm(features - features[nxt], axis=1))
+
+    return picks
+
+
+def get_scene_frame_nums(
+    clip: vs.VideoNode,
+    per_scene: int = 1,
+    keyframes: Sequence[int] | SPathLike | None = None,
+    min_length: int = 1,
+    seed: int | None = None,
+) -> list[int]:
+    """
+    Get random frame numbers from every scene of a clip.
+
+    Unlike :func:`get_random_frame_nums`, which splits the clip into fixed-size chunks,
+    this draws ``per_scene`` frames from every scene, so long scenes don't get oversampled
+    and short cuts don't get skipped.
+
+    If no keyframes are given, scene changes are detected with :py:meth:`vstools.Keyframes.unique`,
+    keyed by :py:func:`lvsfunc.clip_fingerprint`. The detected keyframes are cached on disk,
+    so every following call on the same clip reuses them without rendering anything.
+
+    Args:
+        clip: Clip to get the frame numbers from.
+        per_scene: Number of frames to draw from every scene. Shorter scenes give all of their frames.
+            Default: 1.
+        keyframes: Scene boundaries, such as a :py:class:`vstools.Keyframes` object,
+            or a path to a keyframes file readable by :py:meth:`vstools.Keyframes.from_file`.
+            Default: ``None`` (detect and cache).
+        min_length: Skip scenes shorter than this many frames. Default: 1.
+        seed: Seed for the random number generator. Default: ``None``.
+
+    Returns:
+        A sorted list of frame numbers.
+
+    Raises:
+        CustomValueError: ``per_scene`` or ``min_length`` is not positive.
+    """
+
+    if per_scene <= 0 or min_length <= 0:
+        raise CustomValueError("'per_scene' and 'min_length' must be greater than 0!", get_scene_frame_nums)
+
+    if keyframes is None:
+        keyframes = Keyframes.unique(clip, clip_fingerprint(clip))
+    elif not isinstance(keyframes, Sequence) or isinstance(keyframes, str):
+        keyframes = Keyframes.from_file(keyframes)
+
+    rng = random.Random(seed)
+
+    cuts = sorted({0, *(kf for kf in keyframes if 0 <= kf < clip.num_frames)})
+
+    frame_nums = list[int]()
+
+    for start, end in zip(cuts, [*cuts[1:], clip.num_frames]):
+        if end - start < min_length:
+            continue
+
+        frame_nums += rng.sample(range(start, end), min(per_scene, end - start))
+
+    return sorted(frame_nums)
+
+
+def get_scene_frames(
+    clip: vs.VideoNode,
+    per_scene: int = 1,
+    keyframes: Sequence[int] | SPathLike | None = None,
+    min_length: int = 1,
+    seed: int | None = None,
+) -> vs.VideoNode:
+    """
+    Get random frames from every scene of a clip spliced together into a new clip.
+
+    It uses the same criteria as :func:`get_scene_frame_nums` to select frames.
+
+    Args:
+        clip: Clip to get the frames from.
+        per_scene: Number of frames to draw from every scene. Default: 1.
+        keyframes: Scene boundaries. Default: ``None`` (detect and cache).
+        min_length: Skip scenes shorter than this many frames. Default: 1.
+        seed: Seed for the random number generator. Default: ``None``.
+
+    Returns:
+        A clip with random frames from every scene of the input clip.
+
+    Raises:
+        CustomValueError: ``per_scene`` or ``min_length`` is not positive.
+    """
+
+    return core.std.Splice([clip[num] for num in get_scene_frame_nums(clip, per_scene, keyframes, min_length, seed)])
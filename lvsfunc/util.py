@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import colorsys
+import hashlib
 import random
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
 from typing import TYPE_CHECKING, Any
 
-from jetpytools import CustomIndexError, CustomValueError
+import numpy as np
+from jetpytools import CustomIndexError, CustomValueError, FuncExceptT
 from psutil import cpu_count, virtual_memory
 from vsdenoise import DFTTest
 from vstools import core, vs
@@ -13,6 +18,8 @@ if TYPE_CHECKING:
     from matplotlib.figure import Figure
 
 __all__ = [
+    "cache_frames",
+    "clip_fingerprint",
     "colored_clips",
     "set_vs_affinity",
     "sloc_curve_to_graph",
@@ -55,6 +62,254 @@ def set_vs_affinity(*, threads: int = -1, cache_limit_mb: int = -1) -> None:
         core.set_affinity(range(0, min(threads, logical)), cache_limit_mb)
 
 
+def cache_frames(clip: vs.VideoNode, max_mb: float = 256, prefetch: int = 2) -> vs.VideoNode:
+    """
+    Keep recently rendered frames of a clip in a byte-size-aware LRU cache.
+
+    VapourSynth's own cache is shared by every node in the graph, and may evict expensive frames
+    long before a previewer seeks back to them. This cache belongs to the clip alone.
+    Frames are only requested from ``clip`` on a cache miss, so seeking back and forth between
+    recently viewed frames does not re-evaluate the upstream filter chain.
+
+    Every time a frame is requested, up to ``prefetch`` frames on either side of it
+    are requested asynchronously in the background and added to the cache once rendered.
+
+    Frames are never requested synchronously: cache misses are handed back to VapourSynth with ``FrameEval``,
+    so they are rendered like any other upstream frame without blocking a worker thread.
+
+    Args:
+        clip: Clip to cache. Must have a constant format and resolution.
+        max_mb: Maximum size of the cached frames in MiB. The least recently used frames are evicted first.
+            Default: 256.
+        prefetch: Number of frames on either side of the requested frame to render ahead. Default: 2.
+
+    Returns:
+        A clip returning the same frames as ``clip``.
+
+    Raises:
+        CustomValueError: ``max_mb`` is not positive, or ``prefetch`` is negative.
+    """
+
+    if max_mb <= 0:
+        raise CustomValueError("`max_mb` must be greater than 0!", cache_frames, max_mb)
+
+    if prefetch < 0:
+        raise CustomValueError("`prefetch` must be at least 0!", cache_frames, prefetch)
+
+    cache = _FrameCache(clip, int(max_mb * 1024**2), prefetch)
+
+    return cache.blank.std.FrameEval(cache.get)
+
+
+class _FrameCache:
+    """
+    Thread-safe LRU cache of rendered frames, bounded by their size in bytes.
+
+    Only the bookkeeping happens in Python. Frames are rendered by VapourSynth through :attr:`render`,
+    which adds every frame that passes through it to the cache.
+    """
+
+    def __init__(self, clip: vs.VideoNode, max_bytes: int, prefetch: int) -> None:
+        self.clip = clip
+        self.max_bytes = max_bytes
+        self.prefetch = prefetch
+
+        self.blank = core.std.BlankClip(clip, keep=True)
+        self.render = clip.std.ModifyFrame(clip, self._rendered)
+
+        self._frames = OrderedDict[int, tuple[vs.VideoFrame, int]]()
+        self._pending = set[int]()
+        self._size = 0
+        self._lock = Lock()
+
+    def get(self, n: int) -> vs.VideoNode:
+        """Get a node returning frame ``n``, either from the cache or rendered upstream."""
+
+        with self._lock:
+            cached = self._frames.get(n)
+
+            if cached is not None:
+                self._frames.move_to_end(n)
+
+        self._prefetch(n)
+
+        if cached is None:
+            return self.render
+
+        # Bind the frame itself, so it's still returned if it's evicted before the node is evaluated
+        frame = cached[0]
+
+        return self.blank.std.ModifyFrame(self.blank, lambda n, f: frame)
+
+    def _rendered(self, n: int, f: vs.VideoFrame) -> vs.VideoFrame:
+        self._store(n, f)
+
+        return f
+
+    def _store(self, n: int, frame: vs.VideoFrame) -> None:
+        size = sum(memoryview(frame[p]).nbytes for p in range(frame.format.num_planes))
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if n in self._frames:
+                return
+
+            self._frames[n] = (frame, size)
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self._size -= evicted
+
+    def _prefetch(self, n: int) -> None:
+        start, stop = max(0, n - self.prefetch), min(self.clip.num_frames, n + self.prefetch + 1)
+
+        with self._lock:
+            missing = [i for i in range(start, stop) if i not in self._frames and i not in self._pending]
+            self._pending.update(missing)
+
+        for i in missing:
+            self.render.get_frame_async(i).add_done_callback(lambda fut, i=i: self._prefetched(i))
+
+    def _prefetched(self, n: int) -> None:
+        with self._lock:
+            self._pending.discard(n)
+
+
+def clip_fingerprint(clip: vs.VideoNode, samples: int = 5) -> str:
+    """
+    Get a short fingerprint identifying a clip, for keying on-disk caches.
+
+    The fingerprint is a hash of the clip's length, frame rate, resolution, and format,
+    and of the pixel data of ``samples`` frames spread evenly over the clip.
+    Only those frames are rendered, so this is cheap even for long clips.
+
+    Args:
+        clip: Clip to fingerprint.
+        samples: Number of frames to hash the contents of. Default: 5.
+
+    Returns:
+        A 16 character hexadecimal string.
+
+    Raises:
+        CustomValueError: ``samples`` is smaller than 1.
+    """
+
+    if samples < 1:
+        raise CustomValueError("`samples` must be at least 1!", clip_fingerprint, samples)
+
+    fmt = clip.format.name if clip.format else None
+
+    digest = hashlib.sha256(f"{clip.num_frames}:{clip.fps}:{clip.width}x{clip.height}:{fmt}".encode())
+
+    step = (clip.num_frames - 1) / max(samples - 1, 1)
+
+    for n in sorted({round(i * step) for i in range(samples)}):
+        frame = clip.get_frame(n)
+
+        for p in range(frame.format.num_planes):
+            digest.update(np.ascontiguousarray(frame[p]).data)
+
+    return digest.hexdigest()[:16]
+
+
+class _FrameDeduplicator:
+    """
+    Find frames that are duplicates of an earlier frame, either byte-identical or by perceptual hash.
+
+    Frames must be fed in frame order, so the first occurrence of a frame is always the one that is kept.
+    """
+
+    def __init__(self, mode: str, threshold: int = 0, func: FuncExceptT | None = None) -> None:
+        if mode not in ("exact", "perceptual"):
+            raise CustomValueError("Unknown deduplication mode!", func or self.__class__.__name__, mode)
+
+        self.mode = mode
+        self.threshold = threshold
+
+        self._keys = dict[bytes | int, int]()
+        self._hashes = np.zeros(1024, np.uint64)
+        self._frames = list[int]()
+
+    def find(self, n: int, data: np.ndarray[Any, Any], luma: np.ndarray[Any, Any]) -> int | None:
+        """Return the frame ``n`` duplicates, or register it as a new unique frame and return ``None``."""
+
+        key: bytes | int
+
+        if self.mode == "exact":
+            key = hashlib.blake2b(np.ascontiguousarray(data).data, digest_size=16).digest()
+        else:
+            key = _dhash(luma)
+
+        # Identical hashes are looked up directly, so only near matches have to be compared against every hash
+        if (first := self._keys.get(key)) is not None:
+            return first
+
+        self._keys[key] = n
+
+        if self.mode == "exact" or not self.threshold:
+            return None
+
+        count = len(self._frames)
+
+        if count:
+            distances = np.bitwise_count(self._hashes[:count] ^ np.uint64(key))
+            best = int(distances.argmin())
+
+            if distances[best] <= self.threshold:
+                self._keys[key] = self._frames[best]
+
+                return self._frames[best]
+
+        if count == len(self._hashes):
+            self._hashes = np.concatenate([self._hashes, np.zeros(count, np.uint64)])
+
+        self._hashes[count] = key
+        self._frames.append(n)
+
+        return None
+
+
+def _dhash(luma: np.ndarray[Any, Any]) -> int:
+    """64-bit difference hash of a 2D luma array: whether each cell of a 9x8 grid is brighter than its left."""
+
+    height, width = luma.shape
+
+    rows = np.linspace(0, height, 9).astype(int)
+    cols = np.linspace(0, width, 10).astype(int)
+
+    sums = np.add.reduceat(np.add.reduceat(luma.astype(np.float64), rows[:-1], axis=0), cols[:-1], axis=1)
+    small = sums / np.outer(np.diff(rows), np.diff(cols))
+
+    return int(np.packbits(small[:, 1:] > small[:, :-1]).view(">u8")[0])
+
+
+def _in_frame_order(callback: Callable[[int, Any], None]) -> Callable[[int, Any], None]:
+    """
+    Wrap a callback so it is called in frame order, no matter in which order frames are rendered.
+
+    Items that arrive ahead of the next expected frame are held until every earlier frame has arrived.
+    """
+
+    pending = dict[int, Any]()
+    next_frame = 0
+    lock = Lock()
+
+    def _ordered(n: int, item: Any) -> None:
+        nonlocal next_frame
+
+        with lock:
+            pending[n] = item
+
+            while next_frame in pending:
+                callback(next_frame, pending.pop(next_frame))
+                next_frame += 1
+
+    return _ordered
+
+
 def colored_clips(
     amount: int,
     max_hue: int = 300,
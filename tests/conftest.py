@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Sequence
+from typing import Any
+
 import pytest
 from jetpytools import SPath
+from vstools import vs
+
+FakeRender = Callable[[str, Sequence[Any] | Callable[[vs.VideoNode], Sequence[Any]]], list[vs.VideoNode]]
 
 
 @pytest.fixture
@@ -10,3 +16,27 @@ def tmp_path(
     tmp_path_factory: pytest.TempPathFactory,
 ) -> SPath:
     return SPath(tmp_path_factory.mktemp(request.node.name, numbered=True))
+
+
+@pytest.fixture
+def fake_render(monkeypatch: pytest.MonkeyPatch) -> FakeRender:
+    """
+    Replace ``clip_async_render`` in a module with a fake that returns canned results without rendering.
+
+    Only meant for tests about how often and what is rendered. Call it with the module to patch and
+    the results, or a function of the rendered clip returning them. It returns the list of rendered clips.
+    """
+
+    def _patch(module: str, results: Sequence[Any] | Callable[[vs.VideoNode], Sequence[Any]]) -> list[vs.VideoNode]:
+        clips = list[vs.VideoNode]()
+
+        def render(clip: vs.VideoNode, *_args: object, **_kwargs: object) -> list[Any]:
+            clips.append(clip)
+
+            return list(results(clip) if callable(results) else results)
+
+        monkeypatch.setattr(f"{module}.clip_async_render", render)
+
+        return clips
+
+    return _patch
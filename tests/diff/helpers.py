@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from vstools import vs
+from vstools import get_prop, vs
 
 from lvsfunc.diff.strategies import DiffStrategy
 from lvsfunc.diff.types import CallbacksT
 
 __all__: list[str] = [
+    "PlaneDiffStrategy",
     "StubStrategy",
 ]
 
@@ -19,3 +20,13 @@ class StubStrategy(DiffStrategy):
     def process(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, CallbacksT]:
         del ref
         return src, []
+
+
+class PlaneDiffStrategy(DiffStrategy):
+    """Flag frames where the first plane differs at all, using only core filters."""
+
+    def __init__(self) -> None:
+        super().__init__(0)
+
+    def process(self, src: vs.VideoNode, ref: vs.VideoNode) -> tuple[vs.VideoNode, CallbacksT]:
+        return src.std.PlaneStats(ref), [lambda f: get_prop(f, "PlaneStatsDiff", float) > self.threshold]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+from jetpytools import CustomValueError
+from vstools import core, vs
+
+from lvsfunc.diff.duplicates import FindDuplicates
+
+from ..conftest import FakeRender
+from .helpers import PlaneDiffStrategy, StubStrategy
+
+
+def _gray_frames(colors: list[int]) -> vs.VideoNode:
+    return core.std.Splice([core.std.BlankClip(format=vs.GRAY8, length=1, color=color) for color in colors])
+
+
+def test_find_duplicates_rejects_single_frame_clip() -> None:
+    fd = FindDuplicates(StubStrategy(), pre_process=False)
+
+    with pytest.raises(CustomValueError):
+        fd.find_duplicates(core.std.BlankClip(length=1))
+
+
+@pytest.mark.parametrize(("drop_thr", "radius"), [(0.0, 12), (3.0, 0)])
+def test_find_duplicates_rejects_invalid_parameters(drop_thr: float, radius: int) -> None:
+    with pytest.raises(CustomValueError):
+        FindDuplicates(StubStrategy(), pre_process=False, drop_thr=drop_thr, radius=radius)
+
+
+def test_find_duplicates_builds_runs_and_repeated_frames() -> None:
+    # Frames: A A B B B C D -> pairs (0,1) and (2,3), (3,4) are duplicates
+    clip = _gray_frames([0, 0, 50, 50, 50, 100, 150])
+
+    fd = FindDuplicates(PlaneDiffStrategy(), pre_process=False)
+    fd.find_duplicates(clip)
+
+    assert fd.duplicate_ranges == [(0, 1), (2, 4)]
+    assert fd.diff_ranges == [(1, 1), (3, 4)]
+    assert fd.metrics == pytest.approx([0, 50 / 255, 0, 0, 50 / 255, 50 / 255])
+
+
+def test_find_duplicates_flags_difference_spikes_as_drops() -> None:
+    # A steady fade that suddenly jumps ahead between frames 10 and 11
+    clip = _gray_frames([5 * n + (50 if n > 10 else 0) for n in range(21)])
+
+    fd = FindDuplicates(PlaneDiffStrategy(), pre_process=False, radius=4)
+    fd.find_duplicates(clip)
+
+    assert fd.duplicate_ranges == []
+    assert fd.drop_ranges == [(11, 11)]
+
+
+def test_find_duplicates_ignores_duplicates_for_drop_baseline() -> None:
+    # Animation on twos: every other pair is a duplicate, which must not drag the median down
+    clip = _gray_frames([10 * ((n + 1) // 2) for n in range(21)])
+
+    fd = FindDuplicates(PlaneDiffStrategy(), pre_process=False)
+    fd.find_duplicates(clip)
+
+    assert fd.drop_ranges == []
+    assert len(fd.duplicate_ranges) == 10
+
+
+def test_find_duplicates_applies_exclusion_ranges() -> None:
+    fd = FindDuplicates(PlaneDiffStrategy(), pre_process=False, exclusion_ranges=[(4, 6)])
+    fd.find_duplicates(core.std.BlankClip(format=vs.GRAY8, length=10))
+
+    assert fd.diff_ranges == [(1, 3), (7, 9)]
+
+
+def test_find_duplicates_reuses_cached_result_unless_forced(fake_render: FakeRender) -> None:
+    renders = fake_render("lvsfunc.diff.duplicates", [(True, 0.1)] * 4)
+
+    clip = core.std.BlankClip(length=5)
+
+    fd = FindDuplicates(StubStrategy(), pre_process=False)
+    fd.find_duplicates(clip)
+    fd.find_duplicates(clip)
+
+    assert len(renders) == 1
+
+    fd.find_duplicates(clip, force=True)
+
+    assert len(renders) == 2
+
+
+def _stamp(clip: vs.VideoNode, x: int, y: int, size: int = 16) -> vs.VideoNode:
+    mask = core.std.BlankClip(clip, size, size, color=255).std.AddBorders(
+        x, clip.width - size - x, y, clip.height - size - y
+    )
+
+    return clip.std.MaskedMerge(core.std.BlankClip(clip, color=255), mask)
+
+
+def test_find_duplicates_renders_a_small_roi_with_default_pre_process() -> None:
+    base = core.std.BlankClip(width=320, height=240, format=vs.GRAY8, length=1)
+    changed = _stamp(base, 100, 100)
+
+    # The last frame only changes outside of the ROI, so it is still a duplicate
+    clip = base + base + changed + _stamp(changed, 10, 10)
+
+    fd = FindDuplicates(PlaneDiffStrategy(), roi=(100, 100, 16, 16)).find_duplicates(clip)
+
+    assert fd.duplicate_ranges == [(0, 1), (2, 3)]
+    assert fd.diff_ranges == [(1, 1), (3, 3)]
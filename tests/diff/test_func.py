@@ -4,12 +4,14 @@ from collections.abc import Iterable
 
 import pytest
 from jetpytools import CustomValueError, FileIsADirectoryError, FilePermissionError, FileWasNotFoundError, SPath
-from vstools import core
+from vstools import core, vs
 
+from lvsfunc.diff.enum import ChunkFormat
 from lvsfunc.diff.exceptions import NoDifferencesFoundError
-from lvsfunc.diff.func import FindDiff, remove_isolated_frames
+from lvsfunc.diff.func import FindDiff, remove_isolated_frames, snap_ranges_to_keyframes
 
-from .helpers import StubStrategy
+from ..conftest import FakeRender
+from .helpers import PlaneDiffStrategy, StubStrategy
 
 
 @pytest.mark.parametrize(
@@ -272,3 +274,212 @@ def test_from_file_rejects_missing_file(tmp_path: SPath) -> None:
 
     with pytest.raises(FileWasNotFoundError):
         finder.from_file(tmp_path / "missing.txt")
+
+
+@pytest.mark.parametrize(
+    ("ranges", "keyframes", "min_gap", "expected"),
+    [
+        # Snapped outwards to the surrounding keyframes
+        ([(10, 20)], [0, 48, 96], 0, [(0, 47)]),
+        ([(50, 60)], [0, 48, 96], 0, [(48, 95)]),
+        # Last chunk is closed by the clip length
+        ([(100, 110)], [0, 48, 96], 0, [(96, 143)]),
+        # Range spanning a keyframe covers both GOPs
+        ([(40, 50)], [0, 48, 96], 0, [(0, 95)]),
+        # Adjacent chunks are always merged
+        ([(10, 20), (50, 60)], [0, 48, 96], 0, [(0, 95)]),
+        # Chunks closer than min_gap are merged
+        ([(10, 20), (100, 110)], [0, 48, 96], 49, [(0, 143)]),
+        ([(10, 20), (100, 110)], [0, 48, 96], 48, [(0, 47), (96, 143)]),
+        # Frame 0 is always a keyframe and out-of-range keyframes are ignored
+        ([(5, 6)], [24, 500], 0, [(0, 23)]),
+    ],
+)
+def test_snap_ranges_to_keyframes(
+    ranges: list[tuple[int, int]],
+    keyframes: list[int],
+    min_gap: int,
+    expected: list[tuple[int, int]],
+) -> None:
+    assert snap_ranges_to_keyframes(ranges, keyframes, 144, min_gap) == expected
+
+
+def test_snap_ranges_to_keyframes_rejects_negative_gap() -> None:
+    with pytest.raises(CustomValueError):
+        snap_ranges_to_keyframes([(1, 2)], [0], 10, -1)
+
+
+@pytest.mark.parametrize(
+    ("fmt", "expected"),
+    [
+        (ChunkFormat.RANGES, "0-47\n96-143"),
+        (ChunkFormat.ZONES, "0,47,b=1.0/96,143,b=1.0"),
+    ],
+)
+def test_to_chunks_writes_snapped_ranges(tmp_path: SPath, fmt: ChunkFormat, expected: str) -> None:
+    fd = FindDiff(StubStrategy(), pre_process=False)
+    fd.diff_ranges = [(10, 20), (100, 110)]
+
+    path = fd.to_chunks(tmp_path / "chunks.txt", [0, 48, 96], num_frames=144, fmt=fmt)
+
+    assert path.read_text() == expected
+
+
+def test_to_chunks_requires_num_frames_without_processed_clip(tmp_path: SPath) -> None:
+    fd = FindDiff(StubStrategy(), pre_process=False)
+    fd.diff_ranges = [(10, 20)]
+
+    with pytest.raises(CustomValueError):
+        fd.to_chunks(tmp_path / "chunks.txt", [0, 48])
+
+
+@pytest.mark.parametrize(
+    ("roi", "expected"),
+    [
+        ((100, 50, 200, 100), (200, 100)),
+        ([(0, 0, 10, 10), (30, 20, 10, 10)], (40, 30)),
+        # Aligned outwards to the chroma subsampling
+        ((101, 51, 20, 20), (22, 22)),
+    ],
+)
+def test_find_diff_crops_to_roi_bounding_box(
+    fake_render: FakeRender,
+    roi: tuple[int, int, int, int] | list[tuple[int, int, int, int]],
+    expected: tuple[int, int],
+) -> None:
+    clip = core.std.BlankClip(width=640, height=360, format=vs.YUV420P8, length=5)
+    renders = fake_render("lvsfunc.diff.func", [1, 2])
+
+    FindDiff(StubStrategy(), pre_process=False, roi=roi).find_diff(clip, clip, frames_post_process=None)
+
+    assert [(node.width, node.height) for node in renders] == [expected]
+
+
+def test_find_diff_crops_to_static_mask_bounding_box(fake_render: FakeRender) -> None:
+    clip = core.std.BlankClip(width=640, height=360, format=vs.YUV444P8, length=5)
+    mask = core.std.BlankClip(width=64, height=32, format=vs.GRAY8, color=255, length=1).std.AddBorders(
+        10, 640 - 64 - 10, 20, 360 - 32 - 20
+    )
+    renders = fake_render("lvsfunc.diff.func", [1, 2])
+
+    FindDiff(StubStrategy(), pre_process=False, roi=mask).find_diff(clip, clip, frames_post_process=None)
+
+    assert [(node.width, node.height) for node in renders] == [(64, 32)]
+
+
+@pytest.mark.parametrize("roi", [(600, 0, 100, 100), (0, 0, 0, 10), (-2, 0, 10, 10)])
+def test_find_diff_rejects_invalid_roi(roi: tuple[int, int, int, int]) -> None:
+    clip = core.std.BlankClip(width=640, height=360, length=5)
+
+    with pytest.raises(CustomValueError):
+        FindDiff(StubStrategy(), pre_process=False, roi=roi).find_diff(clip, clip)
+
+
+def test_get_heatmap_keeps_width_compatible_with_subsampling() -> None:
+    # 642x360 scaled to 180 lines would be 321 pixels wide, which 4:2:0 can't hold
+    src = core.std.BlankClip(width=642, height=360, format=vs.YUV420P8, length=20)
+    ref = src[:3] + core.std.BlankClip(src, color=[235, 128, 128])[3:5] + src[5:]
+
+    heatmap = FindDiff(PlaneDiffStrategy(), pre_process=False).get_heatmap(src, ref, height=180)
+
+    assert heatmap.width % 2 == 0
+    assert heatmap.height == 180
+
+
+def test_get_heatmap_rejects_height_incompatible_with_subsampling() -> None:
+    src = core.std.BlankClip(width=640, height=360, format=vs.YUV420P8, length=20)
+    ref = src[:3] + core.std.BlankClip(src, color=[235, 128, 128])[3:5] + src[5:]
+
+    with pytest.raises(CustomValueError):
+        FindDiff(PlaneDiffStrategy(), pre_process=False).get_heatmap(src, ref, height=181)
+
+
+def test_find_diff_rejects_per_frame_mask_of_wrong_length() -> None:
+    clip = core.std.BlankClip(width=640, height=360, length=5)
+    mask = core.std.BlankClip(width=640, height=360, format=vs.GRAY8, color=255, length=3)
+
+    with pytest.raises(CustomValueError):
+        FindDiff(StubStrategy(), pre_process=False, roi=mask).find_diff(clip, clip)
+
+
+def test_find_diff_uses_reassigned_mask(fake_render: FakeRender) -> None:
+    clip = core.std.BlankClip(width=640, height=360, format=vs.YUV444P8, length=5)
+    renders = fake_render("lvsfunc.diff.func", [1, 2])
+
+    def box(width: int, height: int) -> vs.VideoNode:
+        return core.std.BlankClip(width=width, height=height, format=vs.GRAY8, color=255, length=1).std.AddBorders(
+            0, 640 - width, 0, 360 - height
+        )
+
+    finder = FindDiff(StubStrategy(), pre_process=False, roi=box(64, 32))
+    finder.find_diff(clip, clip, frames_post_process=None)
+
+    finder.roi = box(128, 64)
+    finder.find_diff(clip, clip, force=True, frames_post_process=None)
+
+    assert [(node.width, node.height) for node in renders] == [(64, 32), (128, 64)]
+
+
+def _with_changes(src: vs.VideoNode) -> vs.VideoNode:
+    # Differs from the source on frames 3-5 and 12-13
+    white = core.std.BlankClip(src, color=[235, 128, 128])
+
+    return src[:3] + white[3:6] + src[6:12] + white[12:14] + src[14:]
+
+
+def test_get_heatmap_only_covers_differing_frames() -> None:
+    src = core.std.BlankClip(width=640, height=360, format=vs.YUV420P8, length=20)
+
+    finder = FindDiff(PlaneDiffStrategy(), pre_process=False)
+    heatmap = finder.get_heatmap(src, _with_changes(src), height=180, grid=16)
+
+    assert heatmap.num_frames == 5
+    assert (heatmap.width, heatmap.height) == (320, 180)
+    assert heatmap.format.id == vs.RGB24
+
+
+@pytest.mark.parametrize(("amplify", "grid"), [(0.0, None), (8.0, 1)])
+def test_get_heatmap_rejects_invalid_parameters(amplify: float, grid: int | None) -> None:
+    clip = core.std.BlankClip(length=5)
+
+    with pytest.raises(CustomValueError):
+        FindDiff(StubStrategy(), pre_process=False).get_heatmap(clip, clip, amplify=amplify, grid=grid)
+
+
+def test_to_report_writes_one_thumbnail_per_range(tmp_path: SPath) -> None:
+    image = pytest.importorskip("PIL.Image")
+
+    src = core.std.BlankClip(width=640, height=360, format=vs.YUV420P8, length=20)
+
+    report = FindDiff(PlaneDiffStrategy(), pre_process=False).to_report(src, _with_changes(src), tmp_path / "report")
+
+    thumbs = sorted((report.parent / "thumbs").iterdir())
+
+    assert [path.name for path in thumbs] == ["000003-000005.webp", "000012-000013.webp"]
+
+    for path in thumbs:
+        with image.open(path) as img:
+            assert img.size == (320 * 3, 180)
+
+    content = report.read_text()
+
+    assert report.name == "index.html"
+    assert "3-5" in content and "12-13" in content
+    assert 'src="thumbs/000012-000013.webp"' in content
+
+
+@pytest.mark.parametrize(
+    ("fmt", "height"),
+    [
+        ("jpg", 180),
+        ("png", 0),
+        # Not a multiple of the vertical chroma subsampling
+        ("png", 181),
+    ],
+)
+def test_to_report_rejects_invalid_parameters(tmp_path: SPath, fmt: str, height: int) -> None:
+    clip = core.std.BlankClip(format=vs.YUV420P8, length=5)
+    finder = FindDiff(StubStrategy(), pre_process=False)
+
+    with pytest.raises(CustomValueError):
+        finder.to_report(clip, clip, tmp_path, height, fmt)  # type: ignore[arg-type]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from jetpytools import CustomValueError
+from vstools import core, vs
+
+from lvsfunc.diff.exceptions import NoDifferencesFoundError
+from lvsfunc.diff.func import FindDiff
+from lvsfunc.diff.multi import FindDiffMulti
+
+from ..conftest import FakeRender
+from .helpers import PlaneDiffStrategy, StubStrategy
+
+
+def _changed(src: vs.VideoNode, frames: set[int]) -> vs.VideoNode:
+    white = core.std.BlankClip(src, color=255)
+
+    return core.std.Splice([white[n] if n in frames else src[n] for n in range(src.num_frames)])
+
+
+def test_find_diff_multi_requires_references() -> None:
+    fd = FindDiffMulti(StubStrategy(), pre_process=False)
+
+    with pytest.raises(CustomValueError):
+        fd.find_diff_multi(core.std.BlankClip(length=5), [])
+
+
+def test_find_diff_multi_builds_per_reference_ranges() -> None:
+    src = core.std.BlankClip(format=vs.GRAY8, length=6)
+
+    fd = FindDiffMulti(PlaneDiffStrategy(), pre_process=False)
+    fd.find_diff_multi(src, {"bd": _changed(src, {1, 2}), "web": _changed(src, {2, 3})}, frames_post_process=None)
+
+    assert fd.ref_names == ["bd", "web"]
+    assert fd.ref_ranges == {"bd": [(1, 2)], "web": [(2, 3)]}
+    assert fd.diff_ranges == [(1, 3)]
+    assert fd.diff_matrix.shape == (6, 2)
+
+
+def test_find_diff_multi_agreement_matrix(fake_render: FakeRender) -> None:
+    clip = core.std.BlankClip(length=4)
+
+    fake_render("lvsfunc.diff.multi", [[1, 1, 0], [1, 0, 0], [0, 0, 0], [0, 1, 1]])
+
+    fd = FindDiffMulti(StubStrategy(), pre_process=False)
+    fd.find_diff_multi(clip, [clip, clip, clip], frames_post_process=None)
+
+    agreement = fd.agreement()
+
+    assert agreement.shape == (3, 3)
+    assert np.allclose(np.diag(agreement), 1.0)
+    assert agreement[0, 1] == pytest.approx(0.5)
+    assert agreement[1, 2] == pytest.approx(0.75)
+
+
+def test_find_diff_multi_applies_exclusion_ranges() -> None:
+    src = core.std.BlankClip(format=vs.GRAY8, length=5)
+
+    fd = FindDiffMulti(PlaneDiffStrategy(), pre_process=False, exclusion_ranges=[(1, 2)])
+    fd.find_diff_multi(src, [_changed(src, set(range(5)))], frames_post_process=None)
+
+    assert fd.diff_ranges == [(0, 0), (3, 4)]
+
+
+def test_find_diff_multi_raises_when_no_differences() -> None:
+    src = core.std.BlankClip(format=vs.GRAY8, length=3)
+
+    fd = FindDiffMulti(PlaneDiffStrategy(), pre_process=False)
+
+    with pytest.raises(NoDifferencesFoundError):
+        fd.find_diff_multi(src, [src, src], frames_post_process=None)
+
+
+def test_agreement_requires_find_diff_multi() -> None:
+    fd = FindDiffMulti(StubStrategy(), pre_process=False)
+
+    with pytest.raises(NoDifferencesFoundError):
+        fd.agreement()
+
+
+def test_find_diff_multi_renders_a_single_reference() -> None:
+    src = core.std.BlankClip(format=vs.GRAY8, length=6)
+    ref = src[:2] + core.std.BlankClip(src, color=255)[:2] + src[:2]
+
+    fd = FindDiffMulti(PlaneDiffStrategy(), pre_process=False)
+    fd.find_diff_multi(src, [ref], frames_post_process=None)
+
+    assert fd.ref_ranges == {"Ref 1": [(2, 3)]}
+    assert fd.diff_matrix.shape == (6, 1)
+
+
+@pytest.mark.parametrize("roi", [None, (96, 96, 48, 48)])
+def test_find_diff_multi_matches_find_diff_with_default_pre_process(roi: tuple[int, int, int, int] | None) -> None:
+    src = core.std.BlankClip(width=320, height=240, format=vs.GRAY8, length=8)
+
+    def stamp(x: int, y: int, size: int) -> vs.VideoNode:
+        mask = core.std.BlankClip(src, size, size, color=255).std.AddBorders(
+            x, src.width - size - x, y, src.height - size - y
+        )
+
+        return src.std.MaskedMerge(core.std.BlankClip(src, color=255), mask)
+
+    # Frames 2-3 change in the middle, frames 5-6 only within the border the default pre-process crops off
+    ref = src[:2] + stamp(100, 100, 32)[:2] + src[:1] + stamp(0, 0, 4)[:2] + src[:1]
+
+    single = FindDiff(PlaneDiffStrategy(), roi=roi).find_diff(src, ref, frames_post_process=None)
+    multi = FindDiffMulti(PlaneDiffStrategy(), roi=roi).find_diff_multi(src, [ref], frames_post_process=None)
+
+    assert single.diff_ranges == [(2, 3)]
+    assert multi.ref_ranges == {"Ref 1": single.diff_ranges}
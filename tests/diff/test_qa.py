@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from jetpytools import CustomRuntimeError, CustomValueError, SPath
+from vstools import core, vs
+
+from lvsfunc.diff.enum import VMAFFeature
+from lvsfunc.diff.qa import EncodeQA
+
+
+def _clips(length: int = 10) -> tuple[vs.VideoNode, vs.VideoNode]:
+    src = core.std.BlankClip(format=vs.YUV420P8, length=length, color=[128, 128, 128])
+    enc = core.std.BlankClip(src, color=[138, 128, 128])
+
+    return src, enc
+
+
+def test_encode_qa_measures_psnr() -> None:
+    qa = EncodeQA().run(*_clips())
+
+    assert qa.metric_names == ["psnr"]
+    assert qa.frame_metrics.shape == (10, 1)
+    assert np.allclose(qa.frame_metrics[:, 0], 20 * np.log10(255 / 10))
+
+
+def test_encode_qa_caps_psnr_of_identical_frames() -> None:
+    src, _ = _clips()
+
+    qa = EncodeQA().run(src, src)
+
+    assert np.all(qa.frame_metrics[:, 0] == 100.0)
+
+
+def test_encode_qa_aggregates_per_keyframe_scene() -> None:
+    qa = EncodeQA(percentiles=[5]).run(*_clips(), keyframes=[0, 4])
+
+    assert qa.scenes == [(0, 3), (4, 9)]
+    assert set(qa.scene_stats) == {"psnr_min", "psnr_mean", "psnr_p5"}
+    assert qa.scene_stats["psnr_mean"].shape == (2,)
+
+
+def test_encode_qa_detects_scenes_without_keyframes() -> None:
+    src, enc = _clips()
+
+    qa = EncodeQA().run(src, enc)
+
+    assert qa.scenes == [(0, 9)]
+
+
+def test_encode_qa_streams_csv_and_npz(tmp_path: SPath) -> None:
+    csv_path, npz_path = tmp_path / "qa.csv", tmp_path / "qa.npz"
+
+    EncodeQA().run(*_clips(), csv_path=csv_path, npz_path=npz_path)
+
+    lines = csv_path.read_text().splitlines()
+
+    assert lines[0] == "frame,psnr"
+    assert [int(line.split(",")[0]) for line in lines[1:]] == list(range(10))
+
+    with np.load(npz_path) as data:
+        assert data["frame_metrics"].shape == (10, 1)
+        assert data["scenes"].tolist() == [[0, 9]]
+
+
+def test_worst_scenes_ranks_lowest_first() -> None:
+    src, enc = _clips()
+
+    qa = EncodeQA().run(src, core.std.Splice([enc[:5], src[5:]]), keyframes=[0, 5])
+
+    assert qa.worst_scenes(fraction=0.5) == [(0, 4)]
+    assert qa.worst_scenes(fraction=1.0) == [(0, 4), (5, 9)]
+
+
+def test_worst_scenes_requires_run() -> None:
+    with pytest.raises(CustomRuntimeError):
+        EncodeQA().worst_scenes()
+
+
+@pytest.mark.parametrize(("percentiles", "scene_thr"), [([101], 0.1), ([5], 0.0)])
+def test_encode_qa_rejects_invalid_parameters(percentiles: list[float], scene_thr: float) -> None:
+    with pytest.raises(CustomValueError):
+        EncodeQA(percentiles=percentiles, scene_thr=scene_thr)
+
+
+def test_encode_qa_rejects_mismatched_clips() -> None:
+    src, enc = _clips()
+
+    with pytest.raises(CustomValueError):
+        EncodeQA().run(src, enc[:5])
+
+
+def test_encode_qa_rejects_rgb_for_vmaf() -> None:
+    if not hasattr(core, "vmaf"):
+        pytest.skip("VMAF is not installed")
+
+    clip = core.std.BlankClip(format=vs.RGB24, length=5)
+
+    with pytest.raises(CustomValueError):
+        EncodeQA(VMAFFeature.SSIM).run(clip, clip)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+from jetpytools import SPath
+from vstools import core, vs
+
+from lvsfunc.nn import clip_to_npy, npy_to_clip
+
+
+def _held_clip() -> vs.VideoNode:
+    return core.std.Splice(
+        [core.std.BlankClip(format=vs.GRAYS, width=16, height=8, length=1, color=c) for c in (0.1, 0.1, 0.5, 0.1)]
+    )
+
+
+@pytest.mark.parametrize("export_npz", [False, True])
+def test_clip_to_npy_dedup_round_trips(tmp_path: SPath, export_npz: bool) -> None:
+    out_dir = SPath(tmp_path)
+
+    clip_to_npy(_held_clip(), out_dir, export_npz=export_npz, dedup="exact")
+
+    frame_map = json.loads((out_dir / "frame_map.json").read_text())["frames"]
+
+    assert len(frame_map) == 4
+    assert len(set(frame_map.values())) == 2
+    assert frame_map["0"] == frame_map["1"] == frame_map["3"]
+
+    if not export_npz:
+        assert len(list(out_dir.glob("*.npy"))) == 2
+
+    clip = npy_to_clip(out_dir / "frames.npz" if export_npz else out_dir)
+
+    assert clip.num_frames == 4
+
+    for n, color in enumerate((0.1, 0.1, 0.5, 0.1)):
+        assert np.allclose(np.asarray(clip.get_frame(n)[0]), color)
+
+
+def test_clip_to_npy_dedup_returns_one_path_per_frame(tmp_path: SPath) -> None:
+    out_dir = SPath(tmp_path)
+
+    paths = clip_to_npy(_held_clip(), out_dir, dedup="exact")
+
+    assert len(paths) == 4
+    assert paths[0] == paths[1] == paths[3] != paths[2]
+    assert all(path.exists() for path in paths)
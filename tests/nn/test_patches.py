@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from jetpytools import CustomValueError, SPath
+from vstools import core, vs
+
+from lvsfunc.nn import export_patches
+
+
+def _striped_clip(length: int = 2) -> vs.VideoNode:
+    stripes = [
+        core.std.BlankClip(format=vs.GRAYS, width=8, height=32, length=length, color=n / 8) for n in range(8)
+    ]
+
+    return core.std.StackHorizontal(stripes)
+
+
+def test_export_patches_writes_aligned_pairs(tmp_path: SPath) -> None:
+    hq = core.std.BlankClip(format=vs.GRAYS, width=64, height=32, length=2, color=0.75)
+    lq = core.std.BlankClip(format=vs.GRAYS, width=64, height=32, length=2, color=0.25)
+
+    patches = export_patches({"hq": hq, "lq": lq}, tmp_path, patch_size=(16, 8), per_frame=3, seed=1)
+
+    assert list(patches) == ["hq", "lq"]
+    assert [path.name for path in patches["hq"]] == [path.name for path in patches["lq"]]
+    assert len(patches["hq"]) == 6
+
+    hq_patch, lq_patch = (np.load(paths[0]) for paths in patches.values())
+
+    assert hq_patch.shape == lq_patch.shape == (8, 16)
+    assert np.allclose(hq_patch, 0.75)
+    assert np.allclose(lq_patch, 0.25)
+
+
+def test_export_patches_is_deterministic(tmp_path: SPath) -> None:
+    clip = _striped_clip()
+
+    first = export_patches([clip], SPath(tmp_path) / "a", patch_size=8, per_frame=2, seed=3)["clip1"]
+    second = export_patches([clip], SPath(tmp_path) / "b", patch_size=8, per_frame=2, seed=3)["clip1"]
+
+    assert len(first) == len(second) == 4
+
+    for a, b in zip(first, second):
+        assert np.array_equal(np.load(a), np.load(b))
+
+
+def test_export_patches_content_filter_rejects_flat_patches(tmp_path: SPath) -> None:
+    flat = core.std.BlankClip(format=vs.GRAYS, width=64, height=32, length=2, color=0.5)
+
+    patches = export_patches([flat], tmp_path, patch_size=8, content="variance", content_threshold=0.01)
+
+    assert patches == {"clip1": []}
+
+
+@pytest.mark.parametrize("kwargs", [{"patch_size": 128}, {"per_frame": 0}, {"max_tries": 0}])
+def test_export_patches_rejects_invalid_parameters(tmp_path: SPath, kwargs: dict[str, int]) -> None:
+    with pytest.raises(CustomValueError):
+        export_patches([core.std.BlankClip(width=64, height=32)], tmp_path, **kwargs)  # type: ignore[arg-type]
+
+
+def test_export_patches_rejects_mismatched_clips(tmp_path: SPath) -> None:
+    clips = [core.std.BlankClip(width=64, height=32), core.std.BlankClip(width=32, height=32)]
+
+    with pytest.raises(CustomValueError):
+        export_patches(clips, tmp_path)
+
+
+def test_export_patches_rejects_colliding_names(tmp_path: SPath) -> None:
+    clip = _striped_clip()
+
+    with pytest.raises(CustomValueError):
+        export_patches({"hq/1": clip, "hq:1": clip}, tmp_path)
+
+    with pytest.raises(CustomValueError):
+        export_patches([clip.std.SetFrameProps(Name="src"), clip.std.SetFrameProps(Name="src")], tmp_path)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import tarfile
+
+import numpy as np
+import pytest
+from jetpytools import CustomValueError, SPath
+from vstools import core, vs
+
+from lvsfunc.nn import ShardReader, clip_to_shards, npy_to_clip
+
+
+def _gray_clip(length: int = 5) -> vs.VideoNode:
+    return core.std.Splice(
+        [core.std.BlankClip(format=vs.GRAYS, width=16, height=8, length=1, color=n / 10) for n in range(length)]
+    )
+
+
+def test_clip_to_shards_splits_by_frame_count(tmp_path: SPath) -> None:
+    index = clip_to_shards(_gray_clip(), tmp_path, max_frames=2)
+
+    reader = ShardReader(index)
+
+    assert len(reader) == 5
+    assert [shard.name for shard in reader.shards] == ["shard-000000.tar", "shard-000001.tar", "shard-000002.tar"]
+
+    with tarfile.open(reader.shards[1]) as tar:
+        assert tar.getnames() == ["00000002.npy", "00000003.npy"]
+
+
+def test_clip_to_shards_keeps_shards_within_size_limit(tmp_path: SPath) -> None:
+    max_bytes = 2 * tarfile.RECORDSIZE
+
+    reader = ShardReader(clip_to_shards(_gray_clip(30), tmp_path, max_mb=max_bytes / 1024**2))
+
+    assert len(reader) == 30
+    assert len(reader.shards) > 1
+    assert all(shard.stat().st_size <= max_bytes for shard in reader.shards)
+
+
+def test_shard_reader_random_access_matches_sequential_reads(tmp_path: SPath) -> None:
+    with ShardReader(clip_to_shards(_gray_clip(), tmp_path, max_frames=2)) as reader:
+        frames = list(reader)
+
+        assert len(frames) == 5
+
+        for n, frame in enumerate(frames):
+            assert frame.shape == (8, 16)
+            assert np.allclose(frame, n / 10)
+            assert np.array_equal(reader[n], frame)
+
+
+def test_npy_to_clip_reads_shards(tmp_path: SPath) -> None:
+    clip = npy_to_clip(clip_to_shards(_gray_clip(), tmp_path, max_frames=2).parent)
+
+    assert clip.num_frames == 5
+    assert (clip.width, clip.height) == (16, 8)
+
+
+def test_clip_to_shards_writes_images(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    clip = core.std.BlankClip(format=vs.RGB24, width=16, height=8, length=3, color=[255, 0, 0])
+
+    reader = ShardReader(clip_to_shards(clip, tmp_path, fmt="png"))
+
+    assert reader.format == "png"
+    assert reader[2].shape == (8, 16, 3)
+    assert reader[2][0, 0].tolist() == [255, 0, 0]
+
+
+def test_npy_to_clip_rejects_image_shards(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    clip_to_shards(core.std.BlankClip(format=vs.RGB24, length=2), tmp_path, fmt="png")
+
+    with pytest.raises(CustomValueError):
+        npy_to_clip(tmp_path)
+
+
+def test_clip_to_shards_rejects_invalid_limits(tmp_path: SPath) -> None:
+    with pytest.raises(CustomValueError):
+        clip_to_shards(_gray_clip(), tmp_path, max_frames=0)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import pytest
-from jetpytools import CustomTypeError, CustomValueError
+from jetpytools import CustomTypeError, CustomValueError, SPath
 from vstools import FormatsMismatchError, MismatchRefError, core, get_w, vs
 
 from lvsfunc.comparison import (
@@ -12,6 +12,7 @@ from lvsfunc.comparison import (
     Tile,
     compare,
     comparison_shots,
+    contact_sheet,
     diff_between_clips_stack,
     stack_compare,
 )
@@ -188,6 +189,39 @@ def test_tile_auto_arrangement_creates_a_large_enough_grid(count: int) -> None:
     assert sum(map(sum, tile.arrangement)) == count
 
 
+def test_tile_fits_mosaic_into_canvas() -> None:
+    clips = {str(i): core.std.BlankClip(width=1920, height=1080, format=vs.YUV420P8) for i in range(9)}
+
+    result = Tile(clips, canvas=(1920, 1080)).clip
+
+    assert (result.width, result.height) == (1920, 1080)
+
+
+def test_tile_canvas_keeps_chroma_subsampling() -> None:
+    clip = core.std.BlankClip(width=1920, height=1080, format=vs.YUV411P8, length=1)
+
+    # 505 pixels wide would be needed for the 1010 pixel canvas, which 4:1:1 can't hold
+    result = Tile([clip] * 4, canvas=(1010, 1010)).clip
+
+    assert (result.width, result.height) == (2 * 504, 2 * 284)
+    assert result.get_frame(0)
+
+
+def test_tile_canvas_never_upscales() -> None:
+    clip = core.std.BlankClip(width=320, height=180)
+
+    result = Tile([clip] * 4, canvas=(3840, 2160)).clip
+
+    assert (result.width, result.height) == (640, 360)
+
+
+def test_tile_rejects_too_small_canvas() -> None:
+    clip = core.std.BlankClip(width=320, height=180)
+
+    with pytest.raises(CustomValueError, match="too small"):
+        Tile([clip] * 4, canvas=(2, 2))
+
+
 def test_tile_pads_custom_arrangement_and_sets_dimensions() -> None:
     clip = core.std.BlankClip(width=320, height=180)
     tile = Tile([clip, clip, clip], arrangement=[[1, 0, 1], [1]])
@@ -280,6 +314,54 @@ def test_interleave_frame_count() -> None:
     assert (result.width, result.height) == (320, 180)
 
 
+def test_comparer_frame_cache_keeps_output_shape() -> None:
+    clip = core.std.BlankClip(width=320, height=180, length=5)
+
+    result = Stack({"a": clip, "b": clip}, cache_mb=16).clip
+
+    assert result.num_frames == 5
+    assert (result.width, result.height) == (640, 180)
+
+    result.get_frame(3)
+
+
+def test_comparer_export_names_and_skips_existing(tmp_path: SPath) -> None:
+    image = pytest.importorskip("PIL.Image")
+
+    clip = core.std.BlankClip(width=320, height=180, format=vs.RGB24, length=20)
+
+    (tmp_path / "000002_BD.png").touch()
+
+    paths = Stack({"BD": clip, "WEB/CR": clip}).export([2, 7], tmp_path)
+
+    assert [path.name for path in paths] == ["000002_BD.png", "000002_WEB_CR.png", "000007_BD.png", "000007_WEB_CR.png"]
+
+    # The existing screenshot is left alone
+    assert paths[0].stat().st_size == 0
+
+    for path in paths[1:]:
+        with image.open(path) as img:
+            assert img.size == (320, 180)
+
+
+def test_comparer_export_suffixes_colliding_names(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    clip = core.std.BlankClip(width=320, height=180, format=vs.RGB24, length=5)
+
+    paths = Stack({"WEB/CR": clip, "WEB:CR": clip, "web_cr": clip}).export([1], tmp_path)
+
+    assert [path.name for path in paths] == ["000001_WEB_CR.png", "000001_WEB_CR_2.png", "000001_web_cr_3.png"]
+    assert all(path.exists() for path in paths)
+
+
+def test_comparer_export_rejects_out_of_range_frames(tmp_path: SPath) -> None:
+    clip = core.std.BlankClip(width=320, height=180, length=5)
+
+    with pytest.raises(CustomValueError):
+        Interleave([clip, clip]).export([5], tmp_path)
+
+
 def test_compare_interleaves_only_requested_frames() -> None:
     clip_a = core.std.BlankClip(width=320, height=180, length=20)
     clip_b = core.std.BlankClip(width=320, height=180, length=20)
@@ -349,6 +431,23 @@ def test_compare_uses_auto_rand_total_for_short_clips(monkeypatch: pytest.Monkey
     assert result.num_frames == 4
 
 
+def test_compare_diff_select_picks_most_different_frames(monkeypatch: pytest.MonkeyPatch) -> None:
+    clip = core.std.BlankClip(length=200)
+    observed: list[tuple[int, int]] = []
+
+    def get_diff_frame_nums(_a: vs.VideoNode, _b: vs.VideoNode, amount: int, min_spacing: int) -> list[int]:
+        observed.append((amount, min_spacing))
+
+        return [40, 150]
+
+    monkeypatch.setattr("lvsfunc.comparison.get_diff_frame_nums", get_diff_frame_nums)
+
+    result = compare(clip, clip, force_resample=False, print_frame=False, diff_select=True)
+
+    assert observed == [(2, 50)]
+    assert result.num_frames == 4
+
+
 def test_stack_compare_rejects_wrong_positional_clip_count() -> None:
     clip = core.std.BlankClip(width=640, height=360)
 
@@ -421,6 +520,42 @@ def test_comparison_shots_named_clips_crop_and_scale() -> None:
     assert result.width % 2 == 0
 
 
+def test_comparison_shots_roi_zoom_crops_then_point_scales() -> None:
+    clip = core.std.BlankClip(width=3840, height=2160, format=vs.YUV420P8)
+
+    result = comparison_shots(a=clip, b=clip, roi=(1000, 500, 200, 200), zoom=3)
+
+    assert (result.width, result.height) == (1200, 600)
+
+
+def test_comparison_shots_rejects_roi_with_crops() -> None:
+    clip = core.std.BlankClip(width=640, height=360)
+
+    with pytest.raises(CustomValueError):
+        comparison_shots(clip, clip, left=2, roi=(0, 0, 100, 100))
+
+
+def test_stack_compare_roi_crops_before_diff() -> None:
+    clip = core.std.BlankClip(width=3840, height=2160, format=vs.YUV420P8)
+
+    result = stack_compare(clip, clip, roi=(1000, 500, 200, 200), zoom=2)
+
+    assert (result.width, result.height) == (800, 400 + 800)
+
+
+@pytest.mark.parametrize(
+    "roi", [(1001, 500, 200, 200), (1000, 500, 201, 200), (1000, 501, 200, 200), (3800, 0, 100, 10)]
+)
+def test_roi_must_fit_the_clip_and_its_subsampling(roi: tuple[int, int, int, int]) -> None:
+    clip = core.std.BlankClip(width=3840, height=2160, format=vs.YUV420P8)
+
+    with pytest.raises(CustomValueError):
+        stack_compare(clip, clip, roi=roi)
+
+    with pytest.raises(CustomValueError):
+        comparison_shots(clip, clip, roi=roi, zoom=2)
+
+
 def test_comparison_shots_rejects_mixed_positional_and_named_clips() -> None:
     clip = core.std.BlankClip(width=320, height=180)
 
@@ -463,3 +598,36 @@ def test_stack_compare_caps_requested_height() -> None:
         result = stack_compare(clip, clip, height=300)
 
     assert result.height == 540
+
+
+def test_contact_sheet_tiles_thumbnails_into_one_frame(tmp_path: SPath) -> None:
+    image = pytest.importorskip("PIL.Image")
+
+    clip = core.std.BlankClip(width=1920, height=1080, length=1000)
+
+    path = contact_sheet(clip, tmp_path / "sheet.png", amount=9, height=180)
+
+    assert path.name == "sheet.png"
+
+    with image.open(path) as img:
+        assert img.size == (320 * 3, 180 * 3)
+
+
+def test_contact_sheet_shows_every_scene(tmp_path: SPath) -> None:
+    image = pytest.importorskip("PIL.Image")
+
+    clip = core.std.BlankClip(width=640, height=360, length=100)
+
+    # The short scenes at the start get a thumbnail too, and ``amount`` doesn't apply
+    path = contact_sheet(clip, tmp_path / "sheet.png", amount=2, mode="scenes", keyframes=[0, 10, 20, 60], columns=2)
+
+    with image.open(path) as img:
+        assert img.size == (320 * 2, 180 * 2)
+
+
+def test_contact_sheet_rejects_invalid_amount(tmp_path: SPath) -> None:
+    clip = core.std.BlankClip(length=5)
+
+    with pytest.raises(CustomValueError):
+        contact_sheet(clip, tmp_path / "sheet.png", amount=6)
+
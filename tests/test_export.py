@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+from typing import Any
+
+import pytest
+from jetpytools import CustomTypeError, CustomValueError, SPath
+from vstools import InvalidColorFamilyError, core, vs
+
+from lvsfunc.export import ExportFrames, write_images
+
+
+def _rgb_clip(length: int, color: list[int] | None = None) -> vs.VideoNode:
+    return core.std.BlankClip(width=32, height=16, format=vs.RGB24, length=length, color=color or [255, 0, 0])
+
+
+def test_export_frames_encodes_with_pool(tmp_path: SPath) -> None:
+    image = pytest.importorskip("PIL.Image")
+
+    paths = ExportFrames.WEBP(_rgb_clip(3), SPath(tmp_path) / "%d.png", workers=2, effort=4, quality=90)
+
+    assert [path.name for path in paths] == ["0.webp", "1.webp", "2.webp"]
+
+    for path in paths:
+        with image.open(path) as img:
+            assert img.format == "WEBP"
+
+
+def test_export_frames_pool_rejects_writer_arguments(tmp_path: SPath) -> None:
+    with pytest.raises(CustomValueError):
+        ExportFrames.PNG(_rgb_clip(3), SPath(tmp_path) / "%d.png", workers=2, dpi=72)
+
+
+def test_export_frames_resumes_from_manifest(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    clip = _rgb_clip(4)
+    pattern = SPath(tmp_path) / "%d.png"
+
+    paths = ExportFrames.PNG(clip, pattern, workers=2)
+
+    manifest = json.loads((SPath(tmp_path) / "#.png.manifest.json").read_text())
+
+    assert manifest["format"] == "png"
+    assert manifest["pattern"] == "%d.png"
+    assert manifest["frames"] == {str(n): f"{n}.png" for n in range(4)}
+
+    # Frames that are already exported are left alone, so they keep the marker
+    for path in paths:
+        path.write_bytes(b"exported")
+
+    paths[2].unlink()
+
+    assert ExportFrames.PNG(clip, pattern, workers=2) == paths
+    assert [path.read_bytes() == b"exported" for path in paths] == [True, True, False, True]
+
+
+def test_export_frames_restarts_for_a_different_clip(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    pattern = SPath(tmp_path) / "%d.png"
+
+    paths = ExportFrames.PNG(_rgb_clip(4), pattern, workers=2)
+
+    for path in paths:
+        path.write_bytes(b"exported")
+
+    ExportFrames.PNG(_rgb_clip(4, [0, 0, 255]), pattern, workers=2)
+
+    assert not any(path.read_bytes() == b"exported" for path in paths)
+
+
+def test_export_frames_keeps_a_manifest_per_pattern(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    clip = _rgb_clip(4)
+
+    hq = ExportFrames.PNG(clip, SPath(tmp_path) / "hq_%d.png", workers=2)
+    lq = ExportFrames.PNG(clip, SPath(tmp_path) / "lq_%d.png", workers=2)
+
+    assert [path.name for path in lq] == [f"lq_{n}.png" for n in range(4)]
+    assert all(path.exists() for path in hq + lq)
+
+    for path in hq + lq:
+        path.write_bytes(b"exported")
+
+    # Both exports can still be resumed, without writing anything
+    assert ExportFrames.PNG(clip, SPath(tmp_path) / "hq_%d.png", workers=2) == hq
+    assert ExportFrames.PNG(clip, SPath(tmp_path) / "lq_%d.png", workers=2) == lq
+    assert all(path.read_bytes() == b"exported" for path in hq + lq)
+
+
+def _yuv_clip(length: int = 3) -> vs.VideoNode:
+    return core.std.BlankClip(width=16, height=8, format=vs.YUV420P8, length=length, color=[16, 128, 128])
+
+
+def test_export_frames_streams_y4m_to_a_file(tmp_path: SPath) -> None:
+    paths = ExportFrames.Y4M(_yuv_clip(), SPath(tmp_path) / "out.y4m", prefetch=4, backlog=8)
+
+    assert paths == [SPath(tmp_path) / "out.y4m"]
+
+    header, *frames = paths[0].read_bytes().split(b"FRAME\n")
+
+    assert header.startswith(b"YUV4MPEG2 W16 H8")
+    assert [len(frame) for frame in frames] == [16 * 8 * 3 // 2] * 3
+
+
+def test_export_frames_forwards_stream_limits(monkeypatch: pytest.MonkeyPatch, tmp_path: SPath) -> None:
+    calls = dict[str, Any]()
+
+    monkeypatch.setattr("lvsfunc.export.clip_async_render", lambda *_args, **kwargs: calls.update(kwargs))
+
+    ExportFrames.Y4M(_yuv_clip(), SPath(tmp_path) / "out.y4m", prefetch=4, backlog=8)
+
+    assert (calls["y4m"], calls["prefetch"], calls["backlog"]) == (True, 4, 8)
+
+
+def test_export_frames_streams_raw_to_a_file_object() -> None:
+    stream = io.BytesIO()
+
+    assert ExportFrames.RAW(_yuv_clip(), stream) == []
+    assert stream.getvalue() == bytes([16] * 16 * 8 + [128] * 16 * 8 // 2) * 3
+
+
+def test_export_frames_streams_to_a_file_descriptor(tmp_path: SPath) -> None:
+    path = SPath(tmp_path) / "out.raw"
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT)
+
+    try:
+        ExportFrames.RAW(_yuv_clip(), fd)
+
+        # The descriptor is left open for the caller
+        os.write(fd, b"!")
+    finally:
+        os.close(fd)
+
+    assert path.read_bytes() == bytes([16] * 16 * 8 + [128] * 16 * 8 // 2) * 3 + b"!"
+
+
+def test_export_frames_y4m_rejects_rgb() -> None:
+    with pytest.raises(InvalidColorFamilyError):
+        ExportFrames.Y4M(core.std.BlankClip(format=vs.RGB24, length=3), io.BytesIO())
+
+
+def test_export_frames_images_reject_file_objects() -> None:
+    with pytest.raises(CustomTypeError):
+        ExportFrames.PNG(core.std.BlankClip(format=vs.RGB24, length=3), io.BytesIO())
+
+
+@pytest.mark.parametrize("fmt", ["png", "webp"])
+def test_write_images_encodes_every_frame(tmp_path: SPath, fmt: str) -> None:
+    image = pytest.importorskip("PIL.Image")
+
+    clip = core.std.BlankClip(width=32, height=16, format=vs.RGB24, length=5, color=[255, 0, 0])
+    paths = [SPath(tmp_path) / "out" / f"{n}.{fmt}" for n in range(clip.num_frames)]
+    written = list[int]()
+
+    # A single worker forces the renderer to wait for the encoder
+    result = write_images(clip, paths, workers=1, effort=1, on_written=lambda n, _path: written.append(n))
+
+    assert result == paths
+    assert sorted(written) == list(range(5))
+
+    for path in paths:
+        with image.open(path) as img:
+            assert img.format == fmt.upper()
+            assert img.size == (32, 16)
+            assert img.convert("RGB").getpixel((0, 0)) == (255, 0, 0)
+
+
+def test_export_frames_dedup_writes_each_image_once(tmp_path: SPath) -> None:
+    pytest.importorskip("PIL")
+
+    def frame(color: list[int]) -> vs.VideoNode:
+        return core.std.BlankClip(width=32, height=16, format=vs.RGB24, length=1, color=color)
+
+    red, blue = [255, 0, 0], [0, 0, 255]
+    clip = frame(red) + frame(red) + frame(blue) + frame(red)
+
+    paths = ExportFrames.PNG(clip, SPath(tmp_path) / "%d.png", dedup="exact")
+
+    assert [path.name for path in paths] == ["0.png", "0.png", "2.png", "0.png"]
+    assert sorted(path.name for path in SPath(tmp_path).glob("*.png")) == ["0.png", "2.png"]
+
+    manifest = json.loads((SPath(tmp_path) / "#.png.manifest.json").read_text())
+
+    assert manifest["frames"] == {"0": "0.png", "1": "0.png", "2": "2.png", "3": "0.png"}
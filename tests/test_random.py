@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+from jetpytools import CustomRuntimeError, CustomValueError, SPath
+from vstools import Keyframes, core, vs
+
+from lvsfunc.random import (
+    FrameStats,
+    get_diff_frame_nums,
+    get_diverse_frame_nums,
+    get_frame_stats,
+    get_paired_frame_nums,
+    get_paired_frames,
+    get_random_frame_nums,
+    get_scene_frame_nums,
+    get_smart_random_frame_nums,
+)
+
+from .conftest import FakeRender
+
+
+def _gray_frames(colors: list[int]) -> vs.VideoNode:
+    return core.std.Splice(
+        [core.std.BlankClip(width=64, height=36, format=vs.GRAY8, length=1, color=color) for color in colors]
+    )
+
+
+def test_get_diff_frame_nums_respects_min_spacing() -> None:
+    clip_a = _gray_frames([0] * 10)
+    clip_b = _gray_frames([0, 128, 230, 204, 0, 0, 0, 77, 0, 0])
+
+    assert get_diff_frame_nums(clip_a, clip_b, amount=3, min_spacing=3, height=36) == [2, 7]
+    assert get_diff_frame_nums(clip_a, clip_b, amount=3, min_spacing=0, height=36) == [1, 2, 3]
+
+
+def test_get_diff_frame_nums_maps_strided_indices() -> None:
+    colors = [0] * 20
+    colors[4], colors[12] = 30, 180
+    # Frame 13 differs the most, but is skipped by the stride
+    colors[13] = 255
+
+    assert get_diff_frame_nums(_gray_frames([0] * 20), _gray_frames(colors), amount=1, stride=4, height=36) == [12]
+
+
+@pytest.mark.parametrize(("amount", "stride", "min_spacing"), [(0, 1, 0), (1, 0, 0), (1, 1, -1)])
+def test_get_diff_frame_nums_rejects_invalid_parameters(amount: int, stride: int, min_spacing: int) -> None:
+    clip = core.std.BlankClip(length=10)
+
+    with pytest.raises(CustomValueError):
+        get_diff_frame_nums(clip, clip, amount, stride, min_spacing)
+
+
+def test_get_smart_random_frame_nums_evaluates_first_candidates_in_one_batch(fake_render: FakeRender) -> None:
+    clips = fake_render("lvsfunc.random", lambda clip: [(200, 0.5, None)] * clip.num_frames)
+
+    frames = get_smart_random_frame_nums(core.std.BlankClip(length=100), interval=10, seed=1)
+
+    assert [clip.num_frames for clip in clips] == [10]
+    assert [frame // 10 for frame in frames] == list(range(10))
+
+
+def test_get_smart_random_frame_nums_falls_back_after_batched_retries(fake_render: FakeRender) -> None:
+    clips = fake_render("lvsfunc.random", lambda clip: [(0, 0.0, None)] * clip.num_frames)
+
+    frames = get_smart_random_frame_nums(core.std.BlankClip(length=100), interval=25, max_retries=3, seed=1)
+
+    assert [clip.num_frames for clip in clips] == [4, 4, 4]
+    assert [frame // 25 for frame in frames] == list(range(4))
+
+
+def test_get_smart_random_frame_nums_strict_raises() -> None:
+    with pytest.raises(CustomRuntimeError):
+        get_smart_random_frame_nums(core.std.BlankClip(length=20), interval=10, max_retries=2, strict=True, seed=1)
+
+
+def _halves(left: int, right: int, length: int, width: int = 64, height: int = 36) -> vs.VideoNode:
+    halves = [
+        core.std.BlankClip(width=width // 2, height=height, format=vs.YUV420P8, length=length, color=[c, 128, 128])
+        for c in (left, right)
+    ]
+
+    return core.std.StackHorizontal(halves)
+
+
+def test_get_smart_random_frame_nums_renders_candidates() -> None:
+    # Frames 0-4 are solid, 5-9 and 10-19 are two different non-solid shots
+    clip = _halves(128, 128, 5) + _halves(16, 235, 5) + _halves(235, 16, 10)
+
+    frames = get_smart_random_frame_nums(clip, interval=10, strict=True, seed=1)
+
+    assert len(frames) == 2
+    assert 5 <= frames[0] < 10
+    assert 10 <= frames[1] < 20
+
+
+def test_get_smart_random_frame_nums_retries_blurry_candidates() -> None:
+    # The first 7 frames of every interval have much weaker edges than the last 3
+    clip = _halves(100, 140, 7) + _halves(16, 235, 3) + _halves(140, 100, 7) + _halves(235, 16, 3)
+
+    sharpness = get_frame_stats(clip).sharpness
+    threshold = float(sharpness[0] + sharpness[7]) / 2
+
+    frames = get_smart_random_frame_nums(clip, interval=10, strict=True, seed=1, sharpness_threshold=threshold)
+
+    assert len(frames) == 2
+    assert 7 <= frames[0] < 10
+    assert 17 <= frames[1] < 20
+
+
+def test_get_paired_frame_nums_evaluates_all_clips_in_one_batch(fake_render: FakeRender) -> None:
+    clips = fake_render("lvsfunc.random", lambda clip: [(200, 0.5, None)] * clip.num_frames)
+
+    hq = core.std.BlankClip(width=1920, height=1080, length=100)
+    lq = core.std.BlankClip(width=640, height=360, length=100)
+
+    frames = get_paired_frame_nums([hq, lq], interval=10, seed=1)
+
+    assert [clip.num_frames for clip in clips] == [10]
+    assert [frame // 10 for frame in frames] == list(range(10))
+
+
+def test_get_paired_frames_returns_the_same_frames_per_clip() -> None:
+    hq = (_halves(16, 235, 25) + _halves(235, 16, 25)) * 2
+    lq = core.resize.Bilinear(hq, 32, 18)
+
+    out_hq, out_lq = get_paired_frames([hq, lq], interval=25, strict=True, seed=1, height=18)
+
+    assert out_hq.num_frames == out_lq.num_frames == 4
+    assert (out_lq.width, out_lq.height) == (32, 18)
+
+    diff = core.std.PlaneStats(core.resize.Bilinear(out_hq, 32, 18), out_lq)
+
+    assert all(f.props["PlaneStatsDiff"] == 0 for f in diff.frames())
+
+
+def test_get_paired_frame_nums_renders_and_rejects_misaligned_frames() -> None:
+    hq = _halves(128, 128, 5) + _halves(16, 235, 5) + _halves(235, 16, 10)
+    # Frames 10-14 of the LQ clip show the previous shot, as if it were out of sync
+    lq = core.resize.Bilinear(hq[:10] + _halves(16, 235, 5) + hq[15:], 32, 18)
+
+    frames = get_paired_frame_nums([hq, lq], interval=10, strict=True, seed=1, height=18)
+
+    assert len(frames) == 2
+    assert 5 <= frames[0] < 10
+    assert 15 <= frames[1] < 20
+
+
+def test_get_paired_frame_nums_rejects_empty_input() -> None:
+    with pytest.raises(CustomValueError):
+        get_paired_frame_nums([])
+
+
+def _stats(
+    num_frames: int, solid: frozenset[int] | set[int] = frozenset(), values: list[int] | None = None
+) -> FrameStats:
+    values = values or [(n * 37) % 256 for n in range(num_frames)]
+
+    luma_min = np.zeros(num_frames, np.float32)
+    luma_max = np.array([0 if n in solid else 200 for n in range(num_frames)], np.float32)
+    thumbs = np.array([np.full((9, 16), v, np.uint8) for v in values])
+
+    return FrameStats(
+        np.arange(num_frames), luma_min, luma_max, luma_max / 2, np.zeros(num_frames, np.float32), thumbs
+    )
+
+
+def test_get_smart_random_frame_nums_from_stats_skips_solid_frames(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("lvsfunc.random.clip_async_render", pytest.fail)
+
+    stats = _stats(20, solid={n for n in range(20) if n % 10 != 7})
+
+    frames = get_smart_random_frame_nums(core.std.BlankClip(length=20), interval=10, seed=3, stats=stats)
+
+    assert frames == [7, 17]
+
+
+def test_get_smart_random_frame_nums_from_stats_rejects_similar_frames() -> None:
+    # Frames 10-19 all look like frame 5, except frame 12
+    values = [0] * 5 + [100] + [0] * 4 + [100] * 10
+    values[12] = 250
+
+    stats = _stats(20, solid=set(range(5)) | set(range(6, 10)), values=values)
+
+    frames = get_smart_random_frame_nums(core.std.BlankClip(length=20), interval=10, seed=3, stats=stats)
+
+    assert frames == [5, 12]
+
+
+def test_get_smart_random_frame_nums_from_stats_strict_raises() -> None:
+    stats = _stats(10, solid=set(range(10)))
+
+    with pytest.raises(CustomRuntimeError):
+        get_smart_random_frame_nums(core.std.BlankClip(length=10), interval=5, strict=True, stats=stats)
+
+
+def test_get_smart_random_frame_nums_rejects_stats_of_another_clip() -> None:
+    stats = _stats(20)
+    stats.fingerprint = "0123456789abcdef"
+
+    with pytest.raises(CustomValueError):
+        get_smart_random_frame_nums(core.std.BlankClip(length=20), interval=10, stats=stats)
+
+
+def test_frame_stats_round_trip(tmp_path: SPath) -> None:
+    stats = _stats(6)
+    stats.fingerprint = "abc"
+
+    loaded = FrameStats.load(stats.save(tmp_path / "stats.npz"))
+
+    assert loaded.fingerprint == "abc"
+    assert np.array_equal(loaded.thumbs, stats.thumbs)
+    assert np.array_equal(loaded.frames, stats.frames)
+
+
+def test_get_diverse_frame_nums_picks_one_frame_per_shot() -> None:
+    def shot(left: list[int], right: list[int]) -> vs.VideoNode:
+        halves = [core.std.BlankClip(width=32, height=32, format=vs.RGB24, length=10, color=c) for c in (left, right)]
+
+        return core.std.StackHorizontal(halves)
+
+    clip = shot([255, 0, 0], [0, 0, 255]) + shot([0, 255, 0], [255, 255, 255]) + shot([0, 0, 0], [128, 128, 128])
+    clip = clip + core.std.BlankClip(clip, length=10)
+
+    frames = get_diverse_frame_nums(clip, amount=3, stride=1)
+
+    assert sorted(frame // 10 for frame in frames) == [0, 1, 2]
+
+
+def test_get_diverse_frame_nums_rejects_invalid_parameters() -> None:
+    with pytest.raises(CustomValueError):
+        get_diverse_frame_nums(core.std.BlankClip(length=10), amount=0)
+
+
+def test_get_random_frame_nums_does_not_reseed_global_rng() -> None:
+    clip = core.std.BlankClip(length=1000)
+
+    random.seed(1)
+    expected = random.random()
+
+    random.seed(1)
+    first = get_random_frame_nums(clip, seed=42)
+
+    assert random.random() == expected
+    assert get_random_frame_nums(clip, seed=42) == first
+
+
+def test_get_scene_frame_nums_draws_from_every_scene() -> None:
+    clip = core.std.BlankClip(length=100)
+
+    frames = get_scene_frame_nums(clip, per_scene=2, keyframes=[0, 10, 12, 60], seed=1)
+
+    assert len(frames) == 8
+    scenes = ((0, 10), (10, 12), (12, 60), (60, 100))
+
+    assert [sum(start <= f < end for f in frames) for start, end in scenes] == [2, 2, 2, 2]
+    assert get_scene_frame_nums(clip, per_scene=2, keyframes=[0, 10, 12, 60], seed=1) == frames
+
+
+def test_get_scene_frame_nums_skips_short_scenes() -> None:
+    clip = core.std.BlankClip(length=100)
+
+    frames = get_scene_frame_nums(clip, keyframes=[0, 10, 12, 60], min_length=5, seed=1)
+
+    assert not any(10 <= f < 12 for f in frames)
+    assert len(frames) == 3
+
+
+def test_get_scene_frame_nums_reads_keyframes_file(tmp_path: SPath) -> None:
+    path = SPath(tmp_path) / "keyframes.txt"
+    Keyframes([0, 50]).to_file(path)
+
+    frames = get_scene_frame_nums(core.std.BlankClip(length=100), keyframes=path, seed=1)
+
+    assert len(frames) == 2
+    assert frames[0] < 50 <= frames[1]
+
+
+def test_get_smart_random_frame_nums_from_stats_rejects_blurry_frames() -> None:
+    stats = _stats(20)
+    stats.sharpness = np.array([1.0 if n % 10 != 4 else 8.0 for n in range(20)], np.float32)
+
+    frames = get_smart_random_frame_nums(
+        core.std.BlankClip(length=20), interval=10, seed=3, stats=stats, sharpness_threshold=4
+    )
+
+    assert frames == [4, 14]
+
+
+def test_frame_stats_fading_ignores_cuts() -> None:
+    stats = _stats(8)
+    # A fade from 0 to 100 over frames 0-4, then a hard cut to a darker shot
+    stats.luma_mean = np.array([0, 25, 50, 75, 100, 10, 10, 10], np.float32)
+
+    assert stats.fading(2).tolist() == [False, True, True, True, False, False, False, False]
+
+
+@pytest.mark.parametrize("offset", [-0.5, 0.5])
+def test_sharpness_threshold_means_the_same_with_and_without_stats(offset: float) -> None:
+    clip = _halves(16, 235, 10, width=256, height=144)
+    threshold = float(get_frame_stats(clip).sharpness[0]) + offset
+
+    for stats in (None, get_frame_stats(clip)):
+        if offset < 0:
+            get_smart_random_frame_nums(clip, interval=10, strict=True, stats=stats, sharpness_threshold=threshold)
+        else:
+            with pytest.raises(CustomRuntimeError):
+                get_smart_random_frame_nums(clip, interval=10, strict=True, stats=stats, sharpness_threshold=threshold)
@@ -2,11 +2,20 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 from jetpytools import CustomIndexError, CustomValueError
-from vstools import vs
-
-from lvsfunc.util import colored_clips, set_vs_affinity, sloc_curve_to_graph
+from vstools import core, get_prop, vs
+
+from lvsfunc.util import (
+    _FrameDeduplicator,
+    _in_frame_order,
+    cache_frames,
+    clip_fingerprint,
+    colored_clips,
+    set_vs_affinity,
+    sloc_curve_to_graph,
+)
 
 
 def _mock_cpu_count(monkeypatch: pytest.MonkeyPatch, logical_count: int, physical_count: int) -> None:
@@ -172,3 +181,94 @@ def test_set_vs_affinity_uses_explicit_cache_limit(
     set_vs_affinity(cache_limit_mb=4096)
 
     assert set_affinity_calls[0][1] == 4096
+
+
+def test_cache_frames_returns_upstream_frames() -> None:
+    clip = core.std.BlankClip(width=64, height=64, format=vs.RGB24, length=10, color=[10, 20, 30])
+    clip = clip.std.SetFrameProps(Name="cached")
+
+    cached = cache_frames(clip, max_mb=1, prefetch=1)
+
+    assert (cached.width, cached.height, cached.num_frames) == (64, 64, 10)
+
+    for n in (0, 5, 0, 9):
+        frame = cached.get_frame(n)
+
+        assert bytes(frame[0]) == bytes(clip.get_frame(n)[0])
+        assert get_prop(frame, "Name", str) == "cached"
+
+
+def test_cache_frames_serves_repeated_requests_from_the_cache() -> None:
+    clip = core.std.BlankClip(width=64, height=64, format=vs.RGB24, length=10)
+    requested = list[int]()
+
+    def _count(n: int, f: vs.VideoFrame) -> vs.VideoFrame:
+        requested.append(n)
+        return f
+
+    cached = cache_frames(clip.std.ModifyFrame(clip, _count), max_mb=1, prefetch=0)
+
+    for _ in range(3):
+        cached.get_frame(4)
+
+    assert requested == [4]
+
+
+@pytest.mark.parametrize(("max_mb", "prefetch"), [(0, 2), (-1, 2), (256, -1)])
+def test_cache_frames_rejects_invalid_parameters(max_mb: float, prefetch: int) -> None:
+    with pytest.raises(CustomValueError):
+        cache_frames(core.std.BlankClip(), max_mb=max_mb, prefetch=prefetch)
+
+
+def test_clip_fingerprint_depends_on_contents() -> None:
+    clip = core.std.BlankClip(length=50, color=[10, 20, 30])
+
+    assert clip_fingerprint(clip) == clip_fingerprint(core.std.BlankClip(length=50, color=[10, 20, 30]))
+    assert clip_fingerprint(clip) != clip_fingerprint(core.std.BlankClip(length=50, color=[10, 20, 31]))
+    assert clip_fingerprint(clip) != clip_fingerprint(clip[:49])
+
+
+def test_frame_deduplicator_exact_matches_identical_frames() -> None:
+    dedup = _FrameDeduplicator("exact")
+    frame = np.arange(64, dtype=np.float32).reshape(8, 8)
+
+    assert dedup.find(0, frame, frame) is None
+    assert dedup.find(1, frame + 1, frame + 1) is None
+    assert dedup.find(2, frame.copy(), frame) == 0
+
+
+def test_frame_deduplicator_perceptual_matches_near_identical_frames() -> None:
+    dedup = _FrameDeduplicator("perceptual", threshold=2)
+    gradient = np.tile(np.linspace(0, 1, 72, dtype=np.float32), (64, 1))
+
+    assert dedup.find(0, gradient, gradient) is None
+    assert dedup.find(1, gradient[:, ::-1], gradient[:, ::-1]) is None
+    assert dedup.find(2, gradient + 0.01, gradient + 0.01) == 0
+
+
+@pytest.mark.parametrize(("threshold", "expected"), [(0, None), (1, 0)])
+def test_frame_deduplicator_perceptual_respects_threshold(threshold: int, expected: int | None) -> None:
+    dedup = _FrameDeduplicator("perceptual", threshold=threshold)
+    gradient = np.tile(np.linspace(0, 1, 72, dtype=np.float32), (64, 1))
+
+    # Darkening the last cell of the top row flips a single bit of the hash
+    near = gradient.copy()
+    near[:8, 64:] = 0
+
+    assert dedup.find(0, gradient, gradient) is None
+    assert dedup.find(1, near, near) == expected
+
+
+def test_frame_deduplicator_rejects_unknown_mode() -> None:
+    with pytest.raises(CustomValueError):
+        _FrameDeduplicator("fuzzy")
+
+
+def test_in_frame_order_reorders_out_of_order_frames() -> None:
+    seen = list[tuple[int, str]]()
+    ordered = _in_frame_order(lambda n, item: seen.append((n, item)))
+
+    for n in (2, 0, 3, 1):
+        ordered(n, str(n))
+
+    assert seen == [(0, "0"), (1, "1"), (2, "2"), (3, "3")]